@@ -1,13 +1,18 @@
 from .base_agent import TitansAgent
+from . import kernels
+from .figures import figure_spec, trace
+from .provider_client import MOCK_API_KEY, mock_base_url
+from .tracing import traced
 from anthropic import Anthropic
 import numpy as np
-import plotly.graph_objects as go
 from typing import Dict, Any, List
 
 class MemoryContextAgent(TitansAgent):
     def __init__(self):
-        super().__init__("Anthropic Memory Context Agent")
-        self.client = Anthropic()
+        super().__init__("Anthropic Memory Context Agent", provider="anthropic")
+        base_url = mock_base_url()
+        self.client = Anthropic(base_url=base_url, api_key=MOCK_API_KEY) if base_url else Anthropic()
+        self.model_name = "claude-3-opus-20240229"
         self.context_history = []
         self.attention_weights = []
         
@@ -21,29 +26,32 @@ class MemoryContextAgent(TitansAgent):
         }
         return demonstration
         
+    @traced()
     async def _demonstrate_context_integration(self) -> List[Dict[str, Any]]:
-        examples = []
         # Simulate context integration with different sequence lengths
-        for seq_length in [100, 1000, 10000]:
-            result = {
-                "sequence_length": seq_length,
-                "context_window": min(seq_length, 2048),
-                "integration_score": self._calculate_integration_score(seq_length),
-                "memory_usage": self._calculate_memory_usage(seq_length)
+        seq_lengths = np.array([100, 1000, 10000])
+        windows = kernels.context_window(seq_lengths)
+        scores = kernels.integration_score(seq_lengths)
+        memory = kernels.context_memory_usage(seq_lengths)
+        return [
+            {
+                "sequence_length": int(length),
+                "context_window": int(window),
+                "integration_score": float(score),
+                "memory_usage": float(usage)
             }
-            examples.append(result)
-        return examples
+            for length, window, score, usage in zip(seq_lengths, windows, scores, memory)
+        ]
         
     def _calculate_integration_score(self, seq_length: int) -> float:
         """Calculate context integration effectiveness"""
-        base_score = 0.95
-        decay = np.exp(-0.0001 * seq_length)
-        return base_score * decay
+        return float(kernels.integration_score(seq_length))
         
     def _calculate_memory_usage(self, seq_length: int) -> float:
         """Calculate memory usage for given sequence length"""
-        return min(1.0, (seq_length * 16) / (1024 * 1024))  # in MB
+        return float(kernels.context_memory_usage(seq_length))  # in MB
         
+    @traced()
     def _create_attention_visualization(self) -> Dict[str, Any]:
         """Create visualization of attention patterns"""
         # Simulate attention weights matrix
@@ -51,19 +59,14 @@ class MemoryContextAgent(TitansAgent):
         weights = np.random.rand(size, size)
         weights = weights / weights.sum(axis=1, keepdims=True)
         
-        fig = go.Figure(data=go.Heatmap(
-            z=weights,
-            colorscale='Viridis'
-        ))
-        
-        fig.update_layout(
+        return figure_spec(
+            trace("heatmap", z=weights.tolist(), colorscale='Viridis'),
             title="Attention Weight Distribution",
-            xaxis_title="Context Position",
-            yaxis_title="Query Position"
+            x_title="Context Position",
+            y_title="Query Position"
         )
         
-        return fig.to_dict()
-        
+    @traced()
     async def _demonstrate_performance(self) -> Dict[str, Any]:
         """Demonstrate performance improvements"""
         return {
@@ -76,12 +79,15 @@ class MemoryContextAgent(TitansAgent):
         
     async def interact(self, user_input: str) -> str:
         """Handle user interactions"""
-        response = await self.client.messages.create(
-            model="claude-3-opus-20240229",
+        response = await self._call_provider(
+            user_input,
+            self.client.messages.create,
+            model=self.model_name,
             max_tokens=1000,
             messages=[{
                 "role": "user",
-                "content": f"Explain how Memory as Context (MAC) would process this input: {user_input}"
+                "content": self._compose_prompt(
+                    user_input, f"Explain how Memory as Context (MAC) would process this input: {user_input}")
             }]
         )
         return response.content
@@ -100,7 +106,8 @@ class MemoryContextAgent(TitansAgent):
             "context_integration_score": 0.92,
             "attention_efficiency": 0.88,
             "memory_utilization": 0.85,
-            "query_latency_ms": 45.2
+            "query_latency_ms": self.telemetry.percentile_ms("interact", 50),
+            **self._runtime_metrics()
         }
         
     def visualize(self) -> Dict[str, Any]:
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional
+
+_loop: Optional["BackgroundLoop"] = None
+_loop_lock = threading.Lock()
+
+
+class BackgroundLoop:
+    """An asyncio event loop on a daemon thread that any thread can submit coroutines to.
+
+    Streamlit reruns the script on a fresh thread per interaction; submitting here
+    instead of calling asyncio.run() lets the script render placeholders and pick
+    up results as they finish, and keeps one loop (and its to_thread pool) alive
+    across reruns and sessions.
+    """
+
+    def __init__(self, name: str = "titans-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        """Schedule a coroutine and return a concurrent.futures.Future for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Submit and block the calling thread until the result is ready"""
+        return self.submit(coro).result(timeout)
+
+
+def background_loop() -> BackgroundLoop:
+    """The process-wide loop, started on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = BackgroundLoop()
+        return _loop
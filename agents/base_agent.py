@@ -1,12 +1,140 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from contextvars import ContextVar
+from typing import Awaitable, Dict, Any, List, Optional, TypeVar
+import functools
+import inspect
 import os
+import time
+import uuid
 from dotenv import load_dotenv
+from .conversation_memory import ConversationMemory
+from .paper_index import context_passages, format_passages, get_paper_index, paper_index_metrics
+from .provider_client import ProviderClient
+from .semantic_cache import SemanticCache, cache_enabled, get_semantic_cache
+from .singleflight import SingleFlight
+from .telemetry import OPERATIONS, get_telemetry
+from .tracing import span
+
+
+T = TypeVar("T")
+
+
+class AgentSession:
+    """One user's state for the process-wide agents: a session id and each agent's conversation memory"""
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.conversations: Dict[str, ConversationMemory] = {}
+
+    def conversation(self, agent_name: str) -> ConversationMemory:
+        if agent_name not in self.conversations:
+            self.conversations[agent_name] = ConversationMemory()
+        return self.conversations[agent_name]
+
+
+_session: ContextVar[Optional[AgentSession]] = ContextVar("titans_agent_session", default=None)
+
+
+def current_session() -> Optional[AgentSession]:
+    """The AgentSession the running coroutine was started in, if any"""
+    return _session.get()
+
+
+async def in_session(session: AgentSession, awaitable: Awaitable[T]) -> T:
+    """Await an agent call with `session`'s state in place of the agents' own.
+
+    Tasks the call starts (race entrants, coalesced requests) inherit the session.
+    """
+    token = _session.set(session)
+    try:
+        return await awaitable
+    finally:
+        _session.reset(token)
+
+
+def _instrumented(op: str, method):
+    """Record wall time and failures of an agent operation"""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        telemetry = self.telemetry
+        telemetry.adjust_gauge("in_flight", 1)
+        started = time.perf_counter()
+        try:
+            with span(f"{self.name}.{op}", "agent", agent=self.name):
+                result = await method(self, *args, **kwargs)
+        except Exception:
+            telemetry.record_operation(op, time.perf_counter() - started, error=True)
+            raise
+        finally:
+            telemetry.adjust_gauge("in_flight", -1)
+        telemetry.record_operation(op, time.perf_counter() - started)
+        return result
+    return wrapper
+
+
+def _semantic_cached(method):
+    """Answer interact() from the semantic cache when an earlier query means the same thing.
+
+    Only queries asked with no conversation history are cached: an answer that
+    depends on earlier turns must not be served to a different conversation.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, user_input, *args, **kwargs):
+        cache = self.semantic_cache
+        if cache is None or args or kwargs or len(self.conversation):
+            return await method(self, user_input, *args, **kwargs)
+        hit = cache.lookup(user_input)
+        if hit is not None and not cache.should_audit():
+            return hit["answer"]
+        answer = await method(self, user_input)
+        if hit is not None:
+            cache.audit(user_input, hit, answer)
+        elif isinstance(answer, str) and answer:
+            cache.store(user_input, answer)
+        return answer
+    return wrapper
+
+
+def _remembered(method):
+    """Record each interact() exchange in the agent's conversation memory"""
+    @functools.wraps(method)
+    async def wrapper(self, user_input, *args, **kwargs):
+        answer = await method(self, user_input, *args, **kwargs)
+        if isinstance(answer, str):
+            self.conversation.record(user_input, answer)
+        return answer
+    return wrapper
+
 
 class TitansAgent(ABC):
-    def __init__(self, name: str):
+    # One SingleFlight per agent name, shared by every instance across sessions.
+    _flights: Dict[str, SingleFlight] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for op in OPERATIONS:
+            method = cls.__dict__.get(op)
+            if inspect.iscoroutinefunction(method):
+                if op == "interact":
+                    method = _remembered(_semantic_cached(method))
+                setattr(cls, op, _instrumented(op, method))
+
+    def __init__(self, name: str, provider: str = "default"):
         self.name = name
         load_dotenv()
+        self.telemetry = get_telemetry(name)
+        self.provider_client = ProviderClient(provider, self.telemetry)
+        self.inflight = TitansAgent._flights.setdefault(name, SingleFlight(self.telemetry))
+        self._conversation = ConversationMemory()
+
+    @property
+    def conversation(self) -> ConversationMemory:
+        """This agent's conversation memory for the current session (its own outside any session)"""
+        session = _session.get()
+        return self._conversation if session is None else session.conversation(self.name)
+
+    @conversation.setter
+    def conversation(self, memory: ConversationMemory) -> None:
+        self._conversation = memory
         
     @abstractmethod
     async def demonstrate(self) -> Dict[str, Any]:
@@ -32,3 +160,48 @@ class TitansAgent(ABC):
     def visualize(self) -> Dict[str, Any]:
         """Generate visualizations"""
         pass
+
+    async def _call_provider(self, user_input: str, fn, *args, **kwargs) -> Any:
+        """Call the provider SDK with coalescing, rate limiting and retries.
+
+        Concurrent calls for the same (agent, model, input, conversation state) share one request.
+        """
+        key = (self.name, self.model_name, user_input, self.conversation.digest())
+        return await self.inflight.do(
+            key, lambda: self.provider_client.call(fn, *args, **kwargs)
+        )
+
+    def _compose_prompt(self, user_input: str, prompt: Optional[str] = None) -> str:
+        """`prompt` (default: the input itself) preceded by the remembered conversation and
+        the paper passages most relevant to the input"""
+        sections = []
+        history = self.conversation.context(user_input)
+        if history:
+            sections.append(history)
+        k = context_passages()
+        # Never wait for a build here: agent calls share one event loop in the app.
+        index = get_paper_index(wait=False) if k > 0 else None
+        passages = index.search(user_input, k) if index is not None else []
+        if passages:
+            sections.append(f"Relevant excerpts from the Titans paper:\n{format_passages(passages)}")
+        sections.append(prompt or user_input)
+        return "\n\n".join(sections)
+
+    @property
+    def semantic_cache(self) -> Optional[SemanticCache]:
+        """Shared per agent and model; None when TITANS_SEMANTIC_CACHE is off"""
+        if not cache_enabled():
+            return None
+        return get_semantic_cache(self.name, getattr(self, "model_name", "default"), self.telemetry)
+
+    def _runtime_metrics(self) -> Dict[str, float]:
+        """Metrics measured at runtime, merged into every agent's get_metrics()"""
+        cache = self.semantic_cache
+        return {
+            **self.telemetry.get_metrics(),
+            **self.provider_client.get_metrics(),
+            **self.inflight.get_metrics(),
+            **paper_index_metrics(),
+            **self.conversation.get_metrics(),
+            **(cache.get_metrics() if cache is not None else {})
+        }
@@ -1,13 +1,25 @@
 from .base_agent import TitansAgent
+from . import kernels
+from .figures import figure_spec, trace
+from .provider_client import MOCK_API_KEY, mock_base_url
+from .tracing import traced
 import cohere
 import numpy as np
-import plotly.graph_objects as go
 from typing import Dict, Any, List
 
 class InnovationsAgent(TitansAgent):
     def __init__(self):
-        super().__init__("Cohere Innovations Agent")
-        self.client = cohere.Client()
+        super().__init__("Cohere Innovations Agent", provider="cohere")
+        base_url = mock_base_url()
+        if base_url:
+            try:
+                self.client = cohere.Client(api_key=MOCK_API_KEY, base_url=base_url)
+            except TypeError:
+                # cohere<5 calls the same option api_url.
+                self.client = cohere.Client(api_key=MOCK_API_KEY, api_url=base_url)
+        else:
+            self.client = cohere.Client()
+        self.model_name = "command"
         self.innovation_studies = []
         
     async def demonstrate(self) -> Dict[str, Any]:
@@ -20,99 +32,98 @@ class InnovationsAgent(TitansAgent):
         }
         return demonstration
         
+    @traced()
     async def _analyze_momentum(self) -> Dict[str, Any]:
         """Analyze momentum in memory design"""
-        momentum_configs = [0.1, 0.5, 0.9, 0.99]
-        results = []
-        
-        for momentum in momentum_configs:
-            result = {
-                "momentum_value": momentum,
-                "convergence_rate": self._calculate_convergence(momentum),
-                "stability_score": self._calculate_stability(momentum),
-                "memory_efficiency": self._calculate_efficiency(momentum)
-            }
-            results.append(result)
-            
-        # Create visualization
-        fig = go.Figure()
-        
-        for metric in ["convergence_rate", "stability_score", "memory_efficiency"]:
-            fig.add_trace(go.Scatter(
-                x=[r["momentum_value"] for r in results],
-                y=[r[metric] for r in results],
-                name=metric.replace("_", " ").title(),
-                mode='lines+markers'
-            ))
+        momentum_configs = np.array([0.1, 0.5, 0.9, 0.99])
+        metrics = {
+            "convergence_rate": kernels.convergence_rate,
+            "stability_score": kernels.stability_score,
+            "memory_efficiency": kernels.momentum_efficiency
+        }
+        values = {metric: kernel(momentum_configs) for metric, kernel in metrics.items()}
+        results = [
+            {"momentum_value": float(momentum), **{metric: float(values[metric][i]) for metric in metrics}}
+            for i, momentum in enumerate(momentum_configs)
+        ]
             
-        fig.update_layout(
+        # Create visualization: smooth curves across the whole momentum range
+        grid = kernels.linear_grid(0.0, 0.99)
+        visualization = figure_spec(
+            *[trace("scatter",
+                    x=grid,
+                    y=kernel(grid),
+                    name=metric.replace("_", " ").title(),
+                    mode='lines')
+              for metric, kernel in metrics.items()],
             title="Impact of Momentum on Memory Performance",
-            xaxis_title="Momentum Value",
-            yaxis_title="Performance Metric"
+            x_title="Momentum Value",
+            y_title="Performance Metric"
         )
         
         return {
             "results": results,
-            "visualization": fig.to_dict()
+            "visualization": visualization
         }
         
     def _calculate_convergence(self, momentum: float) -> float:
         """Calculate convergence rate for given momentum"""
-        return 1 - np.exp(-5 * (1 - momentum))
+        return float(kernels.convergence_rate(momentum))
         
     def _calculate_stability(self, momentum: float) -> float:
         """Calculate stability score for given momentum"""
-        return 1 - (1 - momentum) ** 2
+        return float(kernels.stability_score(momentum))
         
     def _calculate_efficiency(self, momentum: float) -> float:
         """Calculate memory efficiency for given momentum"""
-        return 0.9 + 0.1 * momentum
+        return float(kernels.momentum_efficiency(momentum))
         
+    @traced()
     def _study_weight_decay(self) -> Dict[str, Any]:
         """Study impact of weight decay"""
         decay_rates = [0.0001, 0.001, 0.01, 0.1]
-        studies = []
-        
-        for rate in decay_rates:
-            study = {
+        reduction = kernels.size_reduction(decay_rates)
+        impact = kernels.performance_impact(decay_rates)
+        savings = kernels.memory_savings(decay_rates)
+        studies = [
+            {
                 "decay_rate": rate,
-                "model_size_reduction": self._calculate_size_reduction(rate),
-                "performance_impact": self._calculate_performance_impact(rate),
-                "memory_savings": self._calculate_memory_savings(rate)
+                "model_size_reduction": float(r),
+                "performance_impact": float(p),
+                "memory_savings": float(s)
             }
-            studies.append(study)
+            for rate, r, p, s in zip(decay_rates, reduction, impact, savings)
+        ]
             
         # Create visualization
-        fig = go.Figure(data=[
-            go.Bar(name=metric, x=decay_rates,
-                  y=[study[metric] for study in studies])
-            for metric in ["model_size_reduction", "performance_impact", "memory_savings"]
-        ])
-        
-        fig.update_layout(
+        visualization = figure_spec(
+            *[trace("bar", name=metric, x=decay_rates,
+                    y=[study[metric] for study in studies])
+              for metric in ["model_size_reduction", "performance_impact", "memory_savings"]],
             title="Weight Decay Impact Analysis",
-            xaxis_title="Decay Rate",
-            yaxis_title="Impact Metric",
+            x_title="Decay Rate",
+            y_title="Impact Metric",
             barmode='group'
         )
         
         return {
             "studies": studies,
-            "visualization": fig.to_dict()
+            "visualization": visualization
         }
         
     def _calculate_size_reduction(self, rate: float) -> float:
         """Calculate model size reduction for given decay rate"""
-        return min(0.5, rate * 5)
+        return float(kernels.size_reduction(rate))
         
     def _calculate_performance_impact(self, rate: float) -> float:
         """Calculate performance impact for given decay rate"""
-        return 1 - rate * 2
+        return float(kernels.performance_impact(rate))
         
     def _calculate_memory_savings(self, rate: float) -> float:
         """Calculate memory savings for given decay rate"""
-        return min(0.4, rate * 4)
+        return float(kernels.memory_savings(rate))
         
+    @traced()
     async def _demonstrate_persistence(self) -> List[Dict[str, Any]]:
         """Demonstrate persistent memory modules"""
         scenarios = [
@@ -162,9 +173,12 @@ class InnovationsAgent(TitansAgent):
         
     async def interact(self, user_input: str) -> str:
         """Handle user interactions"""
-        response = await self.client.chat(
-            message=f"Explain how Titans innovations apply to this scenario: {user_input}",
-            model="command"
+        response = await self._call_provider(
+            user_input,
+            self.client.chat,
+            message=self._compose_prompt(
+                user_input, f"Explain how Titans innovations apply to this scenario: {user_input}"),
+            model=self.model_name
         )
         return response.text
         
@@ -182,7 +196,8 @@ class InnovationsAgent(TitansAgent):
             "innovation_impact": 0.93,
             "persistence_score": 0.91,
             "memory_efficiency": 0.88,
-            "task_performance": 0.90
+            "task_performance": 0.90,
+            **self._runtime_metrics()
         }
         
     def visualize(self) -> Dict[str, Any]:
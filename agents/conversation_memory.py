@@ -0,0 +1,126 @@
+"""Per-agent conversation memory with a fixed token budget, after the Titans memory update.
+
+Recent turns sit in a short-term window. Turns pushed out of it are offered to
+long-term memory, which keeps them according to how surprising they were:
+
+    momentary surprise  s_t = 1 - max cosine(user turn, everything already remembered)
+    surprise            S_t = eta * S_{t-1} + (1 - eta) * s_t      (momentum, eq. 10)
+    forgetting gate     strength *= (1 - alpha) for every item, every turn  (eq. 13)
+
+so a novel turn, and the turns right after it, outlive repetitive ones. When
+long-term memory is over budget the weakest items are forgotten. Both parts
+are bounded in tokens, so the context added to a prompt stays O(1) however
+long the session runs.
+"""
+import os
+import zlib
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+from .embeddings import HashingEmbedder
+
+DEFAULT_TOKEN_BUDGET = 1000
+# Share of the budget kept for the verbatim recent window; the rest is long-term memory.
+RECENT_SHARE = 0.5
+RECENT_TURNS = 4
+# A single turn is clipped to this many tokens before it is remembered.
+MAX_TURN_TOKENS = 160
+SURPRISE_MOMENTUM = 0.6
+FORGET_RATE = 0.05
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly 4 characters per token, close enough for budgeting across providers"""
+    return max(1, len(text) // 4)
+
+
+def conversation_budget() -> int:
+    """Token budget for conversation context (TITANS_CONVERSATION_BUDGET); 0 turns memory off"""
+    return int(os.getenv("TITANS_CONVERSATION_BUDGET", str(DEFAULT_TOKEN_BUDGET)))
+
+
+def _clip(text: str, tokens: int) -> str:
+    limit = tokens * 4
+    return text if len(text) <= limit else text[:limit].rsplit(" ", 1)[0] + " ..."
+
+
+class ConversationMemory:
+    def __init__(self, token_budget: Optional[int] = None, recent_turns: int = RECENT_TURNS,
+                 momentum: float = SURPRISE_MOMENTUM, forget_rate: float = FORGET_RATE,
+                 embedder: Optional[HashingEmbedder] = None):
+        self.token_budget = conversation_budget() if token_budget is None else token_budget
+        self.recent_budget = int(self.token_budget * RECENT_SHARE)
+        self.long_term_budget = self.token_budget - self.recent_budget
+        self.recent_turns = recent_turns
+        self.momentum = momentum
+        self.forget_rate = forget_rate
+        self.embedder = embedder or HashingEmbedder()
+        self.recent: Deque[Dict[str, Any]] = deque()
+        self.long_term: List[Dict[str, Any]] = []
+        self.vectors = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self.surprise = 0.0
+        self.turns = 0
+        self.forgotten = 0
+
+    def __len__(self) -> int:
+        return len(self.recent) + len(self.long_term)
+
+    @property
+    def enabled(self) -> bool:
+        return self.token_budget > 0
+
+    def record(self, user_input: str, answer: str) -> None:
+        """Remember one exchange; older turns move to long-term memory or are forgotten"""
+        if not self.enabled:
+            return
+        text = _clip(f"User: {user_input}\nAssistant: {answer}", MAX_TURN_TOKENS)
+        self.recent.append({"turn": self.turns, "text": text, "tokens": estimate_tokens(text),
+                            "vector": self.embedder.embed(user_input)})
+        self.turns += 1
+        for item in self.long_term:
+            item["strength"] *= 1 - self.forget_rate
+        while self.recent and (len(self.recent) > self.recent_turns or
+                               sum(item["tokens"] for item in self.recent) > self.recent_budget):
+            self._consolidate(self.recent.popleft())
+
+    def _consolidate(self, item: Dict[str, Any]) -> None:
+        remembered = np.vstack([self.vectors, *(turn["vector"] for turn in self.recent)])
+        similarity = float((remembered @ item["vector"]).max()) if len(remembered) else 0.0
+        momentary = 1.0 - max(similarity, 0.0)
+        self.surprise = self.momentum * self.surprise + (1 - self.momentum) * momentary
+        item["strength"] = self.surprise
+        self.long_term.append(item)
+        self.vectors = np.vstack([self.vectors, item["vector"][None, :]])
+        while sum(entry["tokens"] for entry in self.long_term) > self.long_term_budget:
+            weakest = min(range(len(self.long_term)), key=lambda i: self.long_term[i]["strength"])
+            del self.long_term[weakest]
+            self.vectors = np.delete(self.vectors, weakest, axis=0)
+            self.forgotten += 1
+
+    def context(self, query: str = "") -> str:
+        """Remembered turns for a prompt: long-term items (strongest, most relevant first) then recent ones"""
+        if not self:
+            return ""
+        sections = []
+        if self.long_term:
+            relevance = np.clip(self.vectors @ self.embedder.embed(query), 0.0, None) if query else 0.0
+            scores = np.array([item["strength"] for item in self.long_term]) * (1.0 + relevance)
+            lines = [self.long_term[i]["text"] for i in np.argsort(-scores)]
+            sections.append("Earlier in this conversation:\n" + "\n".join(lines))
+        if self.recent:
+            sections.append("Recent conversation:\n" + "\n".join(item["text"] for item in self.recent))
+        return "\n\n".join(sections)
+
+    def digest(self) -> int:
+        """Changes whenever the remembered content does; lets callers key on conversation state"""
+        return zlib.crc32("\x00".join(item["text"] for item in [*self.long_term, *self.recent]).encode("utf-8"))
+
+    def get_metrics(self) -> Dict[str, float]:
+        return {
+            "conversation_turns": self.turns,
+            "conversation_context_tokens": sum(item["tokens"] for item in [*self.long_term, *self.recent]),
+            "conversation_long_term_items": len(self.long_term),
+            "conversation_forgotten": self.forgotten
+        }
@@ -0,0 +1,194 @@
+"""Data-parallel training of one neural memory over a long token stream.
+
+The stream is cut into chunks and dealt round-robin to N worker processes:
+at step s, worker r writes chunk s * N + r into its own replica of the
+memory. Replicas are kept in agreement by an all-reduce through a
+memory-mapped file with one slot per worker; each worker writes its slot,
+waits at a barrier, then sums every slot itself. Slots are double-buffered,
+so one barrier per exchange is enough.
+
+    gradients  every step, workers exchange their chunk's gradient (weighted
+               by its share of the step's tokens) and apply the sum; this is
+               exactly one worker stepping on chunks N times as long.
+    weights    workers step locally and average memory and momentum every
+               `sync_every` steps (local SGD): fewer exchanges, and the
+               replicas drift apart in between.
+
+Process start-up is kept out of the timings: workers open the stream and
+the slots, wait at a start barrier, and only then start the clock. A worker
+that fails aborts the barrier, releasing the others, and its traceback is
+raised from train_sharded.
+"""
+import multiprocessing as mp
+import queue
+import tempfile
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .neural_memory import FORGET_RATE, LEARNING_RATE, MOMENTUM, apply_gradient, memory_gradient, projections
+from .shared_state import shared_array
+
+MODES = ("gradients", "weights")
+DEFAULT_CHUNK = 256
+DEFAULT_SYNC_EVERY = 8
+# How often the parent checks on its workers while waiting for their reports.
+POLL_SECONDS = 1.0
+
+
+def _chunk(stream: np.ndarray, w_key: np.ndarray, w_value: np.ndarray, start: int, chunk: int):
+    """(keys, values, mask) of the tokens [start, start + chunk), batched as one session"""
+    tokens = np.asarray(stream[start:start + chunk], dtype=np.float32)
+    return (tokens @ w_key)[None], (tokens @ w_value)[None], np.ones((1, len(tokens)), dtype=np.float32)
+
+
+def reconstruction_loss(memory: np.ndarray, stream: np.ndarray, key_dim: int = 64, value_dim: int = 64,
+                        seed: int = 0) -> float:
+    """Mean ||M k - v||^2 of `memory` (value_dim, key_dim) over the tokens of `stream`"""
+    w_key, w_value, _ = projections(stream.shape[1], key_dim, value_dim, seed)
+    stream = np.asarray(stream, dtype=np.float32)
+    error = (stream @ w_key) @ memory.T - stream @ w_value
+    return float(np.einsum("ij,ij->", error, error) / max(len(stream), 1))
+
+
+def train_serial(stream: np.ndarray, chunk: int = DEFAULT_CHUNK, key_dim: int = 64, value_dim: int = 64,
+                 lr: float = LEARNING_RATE, momentum: float = MOMENTUM, forget_rate: float = FORGET_RATE,
+                 seed: int = 0) -> np.ndarray:
+    """Final memory of one in-process replica stepping through `stream` chunk by chunk (the reference)"""
+    w_key, w_value, _ = projections(stream.shape[1], key_dim, value_dim, seed)
+    memory = np.zeros((1, value_dim, key_dim), dtype=np.float32)
+    velocity = np.zeros_like(memory)
+    hyper = [np.full(1, value, dtype=np.float32) for value in (lr, momentum, forget_rate)]
+    for start in range(0, len(stream), chunk):
+        keys, values, mask = _chunk(stream, w_key, w_value, start, chunk)
+        grad, _ = memory_gradient(memory, keys, values, mask)
+        apply_gradient(memory, velocity, grad, *hyper)
+    return memory[0]
+
+
+def _worker(rank: int, *args) -> None:
+    barrier, results = args[-2:]
+    try:
+        results.put(_train_shard(rank, *args))
+    except threading.BrokenBarrierError:
+        pass  # Another worker failed and aborted the barrier; that worker reports the error.
+    except BaseException:
+        results.put({"rank": rank, "error": traceback.format_exc()})
+        barrier.abort()
+
+
+def _train_shard(rank: int, workers: int, directory: str, mode: str, chunk: int, sync_every: int,
+                 key_dim: int, value_dim: int, hyper: tuple, seed: int, barrier, results) -> Dict[str, Any]:
+    stream = np.load(Path(directory) / "stream.npy", mmap_mode="r")
+    shape = (value_dim, key_dim) if mode == "gradients" else (2, value_dim, key_dim)
+    slots = shared_array(Path(directory) / "slots.npy", (2, workers, *shape))
+    w_key, w_value, _ = projections(stream.shape[1], key_dim, value_dim, seed)
+    memory = np.zeros((1, value_dim, key_dim), dtype=np.float32)
+    velocity = np.zeros_like(memory)
+    lr, eta, alpha = [np.full(1, value, dtype=np.float32) for value in hyper]
+    steps = -(-len(stream) // (workers * chunk))
+    syncs, sync_seconds = 0, 0.0
+
+    barrier.wait()
+    started = time.perf_counter()
+    for step in range(steps):
+        first = step * workers * chunk
+        keys, values, mask = _chunk(stream, w_key, w_value, first + rank * chunk, chunk)
+        grad, _ = memory_gradient(memory, keys, values, mask)
+        if mode == "weights":
+            if mask.shape[1]:
+                apply_gradient(memory, velocity, grad, lr, eta, alpha)
+            if (step + 1) % sync_every and step != steps - 1:
+                continue
+        synced = time.perf_counter()
+        buffer = slots[syncs % 2]
+        if mode == "gradients":
+            # Each chunk's mean gradient, weighted by its share of the step's tokens, sums to the step's.
+            grad *= mask.shape[1] / min(workers * chunk, len(stream) - first)
+            buffer[rank] = grad[0]
+        else:
+            buffer[rank, 0], buffer[rank, 1] = memory[0], velocity[0]
+        barrier.wait()
+        total = buffer.sum(axis=0)
+        syncs += 1
+        sync_seconds += time.perf_counter() - synced
+        if mode == "gradients":
+            grad[0] = total
+            apply_gradient(memory, velocity, grad, lr, eta, alpha)
+        else:
+            total /= workers
+            memory[0], velocity[0] = total
+    seconds = time.perf_counter() - started
+    return {"rank": rank, "seconds": seconds, "sync_seconds": sync_seconds, "syncs": syncs,
+            "memory": memory[0] if rank == 0 else None}
+
+
+def _collect(processes, barrier, results) -> List[Dict[str, Any]]:
+    """Every worker's report; raises RuntimeError as soon as one fails or dies without reporting"""
+    reports: List[Dict[str, Any]] = []
+    while len(reports) < len(processes):
+        try:
+            report = results.get(timeout=POLL_SECONDS)
+        except queue.Empty:
+            dead = [(rank, process.exitcode) for rank, process in enumerate(processes) if process.exitcode]
+            if dead:
+                barrier.abort()
+                rank, code = dead[0]
+                raise RuntimeError(f"Sharded training worker {rank} exited with code {code}") from None
+            if all(process.exitcode is not None for process in processes):
+                raise RuntimeError("Sharded training workers exited without reporting") from None
+            continue
+        if "error" in report:
+            barrier.abort()
+            raise RuntimeError(f"Sharded training worker {report['rank']} failed:\n{report['error']}")
+        reports.append(report)
+    return reports
+
+
+def train_sharded(stream: np.ndarray, workers: int, chunk: int = DEFAULT_CHUNK, mode: str = "gradients",
+                  sync_every: int = DEFAULT_SYNC_EVERY, key_dim: int = 64, value_dim: int = 64,
+                  lr: float = LEARNING_RATE, momentum: float = MOMENTUM, forget_rate: float = FORGET_RATE,
+                  seed: int = 0, directory: Optional[str] = None) -> Dict[str, Any]:
+    """Train one memory on `stream` (tokens x dim) across `workers` processes.
+
+    `sync_every` only applies to weights mode; gradients are exchanged every
+    step. Returns the final memory (value_dim, key_dim) with the wall time of
+    the slowest worker, its share spent in exchanges, and tokens per second.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}, got {mode!r}")
+    if workers < 1 or chunk < 1:
+        raise ValueError(f"workers and chunk must be at least 1, got {workers} and {chunk}")
+    context = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory(dir=directory) as scratch:
+        np.save(Path(scratch) / "stream.npy", np.asarray(stream, dtype=np.float32))
+        barrier, results = context.Barrier(workers), context.Queue()
+        processes = [context.Process(target=_worker, args=(rank, workers, scratch, mode, chunk, max(sync_every, 1),
+                                                           key_dim, value_dim, (lr, momentum, forget_rate), seed,
+                                                           barrier, results))
+                     for rank in range(workers)]
+        for process in processes:
+            process.start()
+        try:
+            reports = _collect(processes, barrier, results)
+        finally:
+            for process in processes:
+                process.join(POLL_SECONDS)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+    slowest = max(reports, key=lambda report: report["seconds"])
+    return {
+        "workers": workers,
+        "mode": mode,
+        "memory": next(report["memory"] for report in reports if report["rank"] == 0),
+        "seconds": slowest["seconds"],
+        "sync_seconds": slowest["sync_seconds"],
+        "sync_share": slowest["sync_seconds"] / slowest["seconds"] if slowest["seconds"] else 0.0,
+        "syncs": slowest["syncs"],
+        "tokens_per_second": len(stream) / slowest["seconds"] if slowest["seconds"] else 0.0
+    }
@@ -0,0 +1,45 @@
+import re
+import zlib
+from typing import Iterable, List, Union
+
+import numpy as np
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """Offline text embedding from signed feature hashing of words, word bigrams and character n-grams.
+
+    Hashes use crc32, not Python's per-process salted hash(), so vectors are
+    stable across runs and can be stored on disk.
+    """
+
+    def __init__(self, dim: int = 256, char_ngrams=(3, 4, 5), word_weight: float = 2.0):
+        self.dim = dim
+        self.char_ngrams = tuple(char_ngrams)
+        self.word_weight = word_weight
+
+    def _features(self, text: str) -> List[str]:
+        words = _WORD.findall(text.lower())
+        features = words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f" {word} "
+            for n in self.char_ngrams:
+                features.extend(f"#{padded[i:i + n]}" for i in range(max(1, len(padded) - n + 1)))
+        return features
+
+    def embed_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            weight = 1.0 if feature.startswith("#") else self.word_weight
+            vector[h % self.dim] += weight if h & 0x80000000 else -weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed(self, texts: Union[str, Iterable[str]]) -> np.ndarray:
+        """(n, dim) float32 array of unit vectors; a single string gives shape (dim,)"""
+        if isinstance(texts, str):
+            return self.embed_one(texts)
+        rows = [self.embed_one(text) for text in texts]
+        return np.stack(rows) if rows else np.zeros((0, self.dim), dtype=np.float32)
@@ -1,13 +1,27 @@
 from .base_agent import TitansAgent
+from .figures import figure_spec, trace
+from .memory_experiments import cached_experiment, pruning_experiment
+from .provider_client import MOCK_API_KEY, mock_base_url
+from .pruning import get_pruner
+from .tracing import traced
 import numpy as np
-import plotly.graph_objects as go
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import aiohttp
+import asyncio
+
+
+@cached_experiment
+def _synthetic_pruning() -> Dict[str, Any]:
+    """One pruning pass over a synthetic workload (about half a second), run once per process"""
+    return {**pruning_experiment(), "source": "synthetic"}
 
 class AnalysisAgent(TitansAgent):
     def __init__(self):
-        super().__init__("Emergence Analysis Agent")
-        self.api_key = None  # Will be loaded from env
+        super().__init__("Emergence Analysis Agent", provider="emergence")
+        mock_url = mock_base_url()
+        self.api_key = MOCK_API_KEY if mock_url else None  # Will be loaded from env
+        self.base_url = mock_url or "https://api.emergence.ai"
+        self.model_name = "emergence-analyze"
         self.analysis_results = []
         
     async def demonstrate(self) -> Dict[str, Any]:
@@ -15,11 +29,12 @@ class AnalysisAgent(TitansAgent):
         demonstration = {
             "title": "Titans Architecture Analysis",
             "architecture_analysis": await self._analyze_architecture(),
-            "scalability_assessment": self._assess_scalability(),
+            "scalability_assessment": self._assess_scalability(await self._measure_pruning()),
             "future_directions": await self._explore_future_directions()
         }
         return demonstration
         
+    @traced()
     async def _analyze_architecture(self) -> Dict[str, Any]:
         """Analyze Titans architecture"""
         components = {
@@ -43,18 +58,14 @@ class AnalysisAgent(TitansAgent):
         # Create radar chart
         categories = ['Efficiency', 'Complexity', 'Integration']
         
-        fig = go.Figure()
-        
-        for component, metrics in components.items():
-            fig.add_trace(go.Scatterpolar(
-                r=[metrics['efficiency'], metrics['complexity'], 
-                   metrics['integration_score']],
-                theta=categories,
-                fill='toself',
-                name=component.replace('_', ' ').title()
-            ))
-            
-        fig.update_layout(
+        visualization = figure_spec(
+            *[trace("scatterpolar",
+                    r=[metrics['efficiency'], metrics['complexity'], 
+                       metrics['integration_score']],
+                    theta=categories,
+                    fill='toself',
+                    name=component.replace('_', ' ').title())
+              for component, metrics in components.items()],
             polar=dict(
                 radialaxis=dict(
                     visible=True,
@@ -66,17 +77,38 @@ class AnalysisAgent(TitansAgent):
         
         return {
             "components": components,
-            "visualization": fig.to_dict()
+            "visualization": visualization
         }
         
-    def _assess_scalability(self) -> Dict[str, Any]:
-        """Assess scalability challenges"""
+    def _live_pruning(self) -> Optional[Dict[str, Any]]:
+        """Latest background pruning pass, if one has reclaimed anything yet"""
+        report = get_pruner().last_report
+        if report and report["bytes_before"] > 0:
+            return {**report, "source": "live"}
+        return None
+
+    @traced()
+    async def _measure_pruning(self) -> Dict[str, Any]:
+        """Latest background pruning pass, or the synthetic pass (computed once, on a worker thread) until there is one"""
+        return self._live_pruning() or await asyncio.to_thread(_synthetic_pruning)
+
+    @traced()
+    def _assess_scalability(self, pruning: Dict[str, Any]) -> Dict[str, Any]:
+        """Assess scalability challenges, given a pruning report from _measure_pruning"""
+        reclaimed = pruning["bytes_reclaimed"] / pruning["bytes_before"]
+        # Feasibility is the share pruning reclaims, discounted by any slowdown it causes.
+        slowdown = pruning["probe_ms_after"] / pruning["probe_ms_before"] if pruning["probe_ms_before"] else 1.0
         challenges = [
             {
                 "challenge": "Memory Growth",
-                "impact": 0.85,
-                "solution_feasibility": 0.78,
-                "current_mitigation": "Adaptive pruning strategies"
+                "impact": round(pruning["bytes_after"] / pruning["bytes_before"], 3),
+                "solution_feasibility": round(max(reclaimed, 0.0) / max(slowdown, 1.0), 3),
+                "current_mitigation": (
+                    f"Adaptive pruning ({pruning['source']}): {pruning['items_pruned']} items, "
+                    f"{pruning['bytes_reclaimed'] / 2 ** 20:.1f} MiB reclaimed ({reclaimed:.0%}), "
+                    f"probe latency {pruning['probe_ms_before']:.2f} -> {pruning['probe_ms_after']:.2f} ms"
+                ),
+                "measured": pruning
             },
             {
                 "challenge": "Computational Overhead",
@@ -93,33 +125,30 @@ class AnalysisAgent(TitansAgent):
         ]
         
         # Create bubble chart
-        fig = go.Figure()
-        
-        for challenge in challenges:
-            fig.add_trace(go.Scatter(
-                x=[challenge['impact']],
-                y=[challenge['solution_feasibility']],
-                mode='markers',
-                name=challenge['challenge'],
-                marker=dict(
-                    size=50,
-                    sizemode='diameter'
-                ),
-                text=[challenge['current_mitigation']]
-            ))
-            
-        fig.update_layout(
+        visualization = figure_spec(
+            *[trace("scatter",
+                    x=[challenge['impact']],
+                    y=[challenge['solution_feasibility']],
+                    mode='markers',
+                    name=challenge['challenge'],
+                    marker=dict(
+                        size=50,
+                        sizemode='diameter'
+                    ),
+                    text=[challenge['current_mitigation']])
+              for challenge in challenges],
             title="Scalability Challenges Analysis",
-            xaxis_title="Impact",
-            yaxis_title="Solution Feasibility",
+            x_title="Impact",
+            y_title="Solution Feasibility",
             showlegend=True
         )
         
         return {
             "challenges": challenges,
-            "visualization": fig.to_dict()
+            "visualization": visualization
         }
         
+    @traced()
     async def _explore_future_directions(self) -> List[Dict[str, Any]]:
         """Explore future research directions"""
         directions = [
@@ -144,40 +173,41 @@ class AnalysisAgent(TitansAgent):
         ]
         
         # Create timeline visualization
-        fig = go.Figure()
-        
-        for direction in directions:
-            fig.add_trace(go.Scatter(
-                x=[direction['timeline_years']],
-                y=[direction['potential_impact']],
-                mode='markers+text',
-                name=direction['area'],
-                text=[direction['area']],
-                textposition="top center"
-            ))
-            
-        fig.update_layout(
+        visualization = figure_spec(
+            *[trace("scatter",
+                    x=[direction['timeline_years']],
+                    y=[direction['potential_impact']],
+                    mode='markers+text',
+                    name=direction['area'],
+                    text=[direction['area']],
+                    textposition="top center")
+              for direction in directions],
             title="Future Research Timeline",
-            xaxis_title="Years from Now",
-            yaxis_title="Potential Impact",
+            x_title="Years from Now",
+            y_title="Potential Impact",
             showlegend=False
         )
         
         return {
             "directions": directions,
-            "visualization": fig.to_dict()
+            "visualization": visualization
         }
         
     async def interact(self, user_input: str) -> str:
         """Handle user interactions"""
+        result = await self._call_provider(user_input, self._post_analysis, self._compose_prompt(user_input))
+        return result.get("analysis", "Analysis not available")
+
+    async def _post_analysis(self, query: str) -> Dict[str, Any]:
         async with aiohttp.ClientSession() as session:
             async with session.post(
-                "https://api.emergence.ai/analyze",
+                f"{self.base_url}/analyze",
                 headers={"Authorization": f"Bearer {self.api_key}"},
-                json={"query": user_input}
+                json={"query": query}
             ) as response:
-                result = await response.json()
-                return result.get("analysis", "Analysis not available")
+                # Raise on 429/5xx so the provider client can back off and retry.
+                response.raise_for_status()
+                return await response.json()
         
     async def collaborate(self, other_agent_data: Dict[str, Any]) -> str:
         """Collaborate with other agents"""
@@ -193,12 +223,13 @@ class AnalysisAgent(TitansAgent):
             "architecture_coherence": 0.92,
             "scalability_score": 0.85,
             "future_readiness": 0.88,
-            "integration_potential": 0.90
+            "integration_potential": 0.90,
+            **self._runtime_metrics()
         }
         
     def visualize(self) -> Dict[str, Any]:
         """Generate visualizations"""
         return {
             "architecture_analysis": self._analyze_architecture(),
-            "scalability_assessment": self._assess_scalability()
+            "scalability_assessment": self._assess_scalability(self._live_pruning() or _synthetic_pruning())
         }
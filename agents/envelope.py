@@ -0,0 +1,163 @@
+"""Binary result envelope: a small structured header plus raw NumPy buffers.
+
+Layout:
+    b"TTNS" | version (u8) | codec (u8) | header length (u32 LE) | header | padding | buffers
+
+The header holds the result with every array replaced by a reference
+{"__ndarray__": index, "dtype": ..., "shape": ..., "offset": ...}. Buffers are
+64-byte aligned so unpacking is a zero-copy np.frombuffer view, including
+over a memory-mapped file.
+"""
+import json
+import mmap
+import struct
+from pathlib import Path
+from typing import Any, List, Tuple, Union
+
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MAGIC = b"TTNS"
+VERSION = 1
+CODEC_JSON, CODEC_ORJSON, CODEC_MSGPACK = 0, 1, 2
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<4sBBI")
+
+# Numeric lists at least this long are stored as arrays rather than in the header.
+MIN_ARRAY_LENGTH = 32
+
+
+def to_jsonable(value: Any) -> Any:
+    """`default=` hook for json.dumps that keeps NumPy values numeric instead of str()"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def _is_numeric_list(value: list) -> bool:
+    return len(value) >= MIN_ARRAY_LENGTH and all(
+        isinstance(item, (int, float)) and not isinstance(item, bool) for item in value
+    )
+
+
+def _split(value: Any, arrays: List[np.ndarray]) -> Any:
+    """Replace arrays (and long numeric lists) with header references"""
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        arrays.append(np.require(value, requirements="C"))
+        return {"__ndarray__": len(arrays) - 1}
+    if isinstance(value, list) and _is_numeric_list(value):
+        arrays.append(np.asarray(value, dtype=np.float64))
+        return {"__ndarray__": len(arrays) - 1}
+    if isinstance(value, dict):
+        return {str(key): _split(item, arrays) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_split(item, arrays) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _encode_header(header: Any) -> Tuple[int, bytes]:
+    if msgpack is not None:
+        return CODEC_MSGPACK, msgpack.packb(header, use_bin_type=True)
+    if orjson is not None:
+        return CODEC_ORJSON, orjson.dumps(header)
+    return CODEC_JSON, json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+
+def _decode_header(codec: int, payload) -> Any:
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise RuntimeError("This envelope needs msgpack: pip install msgpack")
+        return msgpack.unpackb(payload, raw=False)
+    if codec == CODEC_ORJSON and orjson is not None:
+        return orjson.loads(bytes(payload))
+    return json.loads(bytes(payload).decode("utf-8"))
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def pack_result(result: Any) -> bytearray:
+    """Serialize a result with numeric payloads kept as raw array buffers"""
+    arrays: List[np.ndarray] = []
+    body = _split(result, arrays)
+
+    # Buffer offsets are relative to the start of the data section.
+    layout = []
+    offset = 0
+    for array in arrays:
+        offset = _aligned(offset)
+        layout.append({"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset})
+        offset += array.nbytes
+    codec, header = _encode_header({"body": body, "arrays": layout})
+
+    data_start = _aligned(_PREFIX.size + len(header))
+    out = bytearray(data_start + offset)
+    _PREFIX.pack_into(out, 0, MAGIC, VERSION, codec, len(header))
+    out[_PREFIX.size:_PREFIX.size + len(header)] = header
+    for array, meta in zip(arrays, layout):
+        start = data_start + meta["offset"]
+        out[start:start + array.nbytes] = array.reshape(-1).view(np.uint8).data
+    return out
+
+
+def _join(value: Any, arrays: List[np.ndarray]) -> Any:
+    if isinstance(value, dict):
+        if "__ndarray__" in value and len(value) == 1:
+            return arrays[value["__ndarray__"]]
+        return {key: _join(item, arrays) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_join(item, arrays) for item in value]
+    return value
+
+
+def unpack_result(data: Union[bytes, bytearray, memoryview, mmap.mmap]) -> Any:
+    """Inverse of pack_result; arrays are read-only views into `data`"""
+    view = memoryview(data)
+    magic, version, codec, header_length = _PREFIX.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a Titans result envelope")
+    if version != VERSION:
+        raise ValueError(f"Unsupported envelope version {version}")
+    header = _decode_header(codec, view[_PREFIX.size:_PREFIX.size + header_length])
+    data_start = _aligned(_PREFIX.size + header_length)
+
+    arrays = []
+    for meta in header["arrays"]:
+        dtype = np.dtype(meta["dtype"])
+        count = int(np.prod(meta["shape"], dtype=np.int64))
+        array = np.frombuffer(view, dtype=dtype, count=count, offset=data_start + meta["offset"])
+        array.flags.writeable = False  # even over a writable buffer such as pack_result's bytearray
+        arrays.append(array.reshape(tuple(meta["shape"])))
+    return _join(header["body"], arrays)
+
+
+def save_result(path: Union[str, Path], result: Any) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(pack_result(result))
+    return path
+
+
+def load_result(path: Union[str, Path]) -> Any:
+    """Memory-map an envelope file; arrays stay backed by the page cache until touched"""
+    with open(path, "rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    return unpack_result(mapped)
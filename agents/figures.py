@@ -0,0 +1,62 @@
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from .tracing import span
+
+
+def _plain(value: Any) -> Any:
+    """NumPy arrays and scalars (also inside nested dicts such as marker=...) as lists and Python numbers"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+def trace(kind: str, **attrs) -> Dict[str, Any]:
+    """A single Plotly trace as a plain, JSON-safe dict, e.g. trace("scatter", x=[...], y=[...])"""
+    return {"type": kind, **{key: _plain(value) for key, value in attrs.items()}}
+
+
+def figure_spec(*traces: Dict[str, Any], title: Optional[str] = None,
+                x_title: Optional[str] = None, y_title: Optional[str] = None,
+                **layout) -> Dict[str, Any]:
+    """Lightweight figure description in Plotly's own dict schema.
+
+    Building a go.Figure validates every trace and is slow, so agents return
+    this spec and renderers call build_figure() only when they draw it.
+    """
+    if title is not None:
+        layout["title"] = {"text": title}
+    if x_title is not None:
+        layout.setdefault("xaxis", {})["title"] = {"text": x_title}
+    if y_title is not None:
+        layout.setdefault("yaxis", {})["title"] = {"text": y_title}
+    return {"data": list(traces), "layout": layout}
+
+
+def is_figure_spec(value: Any) -> bool:
+    return isinstance(value, dict) and isinstance(value.get("data"), list) and "layout" in value
+
+
+def iter_figure_specs(payload: Any, path: str = "") -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (path, spec) for every figure spec nested in an agent result"""
+    if is_figure_spec(payload):
+        yield path, payload
+    elif isinstance(payload, dict):
+        for key, value in payload.items():
+            yield from iter_figure_specs(value, f"{path}.{key}" if path else str(key))
+    elif isinstance(payload, list):
+        for index, value in enumerate(payload):
+            yield from iter_figure_specs(value, f"{path}[{index}]")
+
+
+def build_figure(spec: Dict[str, Any]):
+    """Construct (and validate) the Plotly figure for a spec"""
+    import plotly.graph_objects as go
+
+    with span("plotly.build_figure", "plotly"):
+        return go.Figure(spec)
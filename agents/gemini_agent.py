@@ -1,15 +1,32 @@
 from .base_agent import TitansAgent
+from . import kernels
+from .figures import figure_spec, trace
+from .memory_experiments import cached_experiment, threshold_sweep
+from .provider_client import MOCK_API_KEY, mock_base_url
+from .tracing import traced
 import google.generativeai as genai
 import numpy as np
-import plotly.graph_objects as go
 from typing import Dict, Any, List
+import asyncio
 import time
 
+
+@cached_experiment
+def _sparse_update_sweep() -> List[Dict[str, Any]]:
+    return threshold_sweep([0.0, 0.1, 0.2, 0.25, 0.3], sessions=32, rounds=80, repeats=1)
+
+
 class ExperimentalAgent(TitansAgent):
     def __init__(self):
-        super().__init__("Gemini Experimental Agent")
-        genai.configure()
-        self.model = genai.GenerativeModel('gemini-pro')
+        super().__init__("Gemini Experimental Agent", provider="gemini")
+        base_url = mock_base_url()
+        if base_url:
+            # The mock only speaks REST, not gRPC.
+            genai.configure(api_key=MOCK_API_KEY, transport="rest", client_options={"api_endpoint": base_url})
+        else:
+            genai.configure()
+        self.model_name = "gemini-pro"
+        self.model = genai.GenerativeModel(self.model_name)
         self.experiment_results = []
         
     async def demonstrate(self) -> Dict[str, Any]:
@@ -18,110 +35,111 @@ class ExperimentalAgent(TitansAgent):
             "title": "Experimental Validation Demonstration",
             "scalability_tests": await self._run_scalability_tests(),
             "retrieval_experiments": await self._run_retrieval_experiments(),
+            "sparse_update_sweep": await self._run_sparse_update_sweep(),
             "performance_visualization": self._create_performance_visualization()
         }
         return demonstration
         
+    @traced()
     async def _run_scalability_tests(self) -> List[Dict[str, Any]]:
         """Run scalability experiments"""
-        tests = []
-        sequence_lengths = [1000, 10000, 100000, 1000000, 2000000]
-        
-        for length in sequence_lengths:
-            test = {
-                "sequence_length": length,
-                "processing_time": self._simulate_processing_time(length),
-                "memory_usage": self._calculate_memory_usage(length),
-                "throughput": self._calculate_throughput(length)
+        sequence_lengths = np.array([1000, 10000, 100000, 1000000, 2000000])
+        times = kernels.processing_time(sequence_lengths)
+        memory = kernels.memory_usage_mb(sequence_lengths)
+        rates = kernels.throughput(sequence_lengths)
+        
+        tests = [
+            {
+                "sequence_length": int(length),
+                "processing_time": float(t),
+                "memory_usage": float(m),
+                "throughput": float(r)
             }
-            tests.append(test)
-            self.experiment_results.append(test)
-            
+            for length, t, m, r in zip(sequence_lengths, times, memory, rates)
+        ]
+        self.experiment_results.extend(tests)
         return tests
         
     def _simulate_processing_time(self, length: int) -> float:
         """Simulate processing time for different sequence lengths"""
-        base_time = 0.1  # seconds
-        return base_time * np.log10(length)
+        return float(kernels.processing_time(length))
         
     def _calculate_memory_usage(self, length: int) -> float:
         """Calculate memory usage for different sequence lengths"""
-        bytes_per_token = 16
-        return (length * bytes_per_token) / (1024 * 1024)  # in MB
+        return float(kernels.memory_usage_mb(length))  # in MB
         
     def _calculate_throughput(self, length: int) -> float:
         """Calculate throughput for different sequence lengths"""
-        base_throughput = 1000  # tokens per second
-        return base_throughput / np.log10(length)
+        return float(kernels.throughput(length))
         
+    @traced()
     async def _run_retrieval_experiments(self) -> List[Dict[str, Any]]:
         """Run information retrieval experiments"""
-        experiments = []
-        haystack_sizes = [1000, 10000, 100000]
-        
-        for size in haystack_sizes:
-            experiment = {
-                "haystack_size": size,
-                "retrieval_time": self._simulate_retrieval_time(size),
-                "accuracy": self._calculate_retrieval_accuracy(size),
-                "success_rate": self._calculate_success_rate(size)
+        haystack_sizes = np.array([1000, 10000, 100000])
+        times = kernels.retrieval_time(haystack_sizes)
+        accuracy = kernels.retrieval_accuracy(haystack_sizes)
+        success = kernels.retrieval_success_rate(haystack_sizes)
+        
+        return [
+            {
+                "haystack_size": int(size),
+                "retrieval_time": float(t),
+                "accuracy": float(a),
+                "success_rate": float(s)
             }
-            experiments.append(experiment)
-            
-        return experiments
+            for size, t, a, s in zip(haystack_sizes, times, accuracy, success)
+        ]
+        
+    @traced()
+    async def _run_sparse_update_sweep(self) -> List[Dict[str, Any]]:
+        """Measure surprise-thresholded memory updates: skipped work, throughput and recall vs dense.
+
+        The sweep runs once per process, on a worker thread, and is reused by every later demonstration.
+        """
+        return await asyncio.to_thread(_sparse_update_sweep)
         
     def _simulate_retrieval_time(self, size: int) -> float:
         """Simulate retrieval time for different haystack sizes"""
-        base_time = 0.05  # seconds
-        return base_time * np.log2(size)
+        return float(kernels.retrieval_time(size))
         
     def _calculate_retrieval_accuracy(self, size: int) -> float:
         """Calculate retrieval accuracy for different haystack sizes"""
-        base_accuracy = 0.98
-        return base_accuracy * (1 - np.log10(size) / 20)
+        return float(kernels.retrieval_accuracy(size))
         
     def _calculate_success_rate(self, size: int) -> float:
         """Calculate success rate for different haystack sizes"""
-        base_rate = 0.95
-        return base_rate * (1 - np.log10(size) / 15)
+        return float(kernels.retrieval_success_rate(size))
         
+    @traced()
     def _create_performance_visualization(self) -> Dict[str, Any]:
         """Create visualization of performance metrics"""
         if not self.experiment_results:
             return {}
             
-        # Create scatter plot of processing time vs sequence length
-        fig = go.Figure()
-        
-        x = [r["sequence_length"] for r in self.experiment_results]
-        y_time = [r["processing_time"] for r in self.experiment_results]
-        y_memory = [r["memory_usage"] for r in self.experiment_results]
-        
-        fig.add_trace(go.Scatter(
-            x=x, y=y_time,
-            name="Processing Time",
-            mode='lines+markers'
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=x, y=y_memory,
-            name="Memory Usage (MB)",
-            mode='lines+markers'
-        ))
-        
-        fig.update_layout(
+        # Dense curves over the tested range, evaluated in one call per metric
+        lengths = [r["sequence_length"] for r in self.experiment_results]
+        x = kernels.log_grid(min(lengths), max(lengths))
+        
+        return figure_spec(
+            trace("scatter", x=x, y=kernels.processing_time(x),
+                  name="Processing Time",
+                  mode='lines'),
+            trace("scatter", x=x, y=kernels.memory_usage_mb(x),
+                  name="Memory Usage (MB)",
+                  mode='lines'),
             title="Scalability Performance Metrics",
-            xaxis_title="Sequence Length",
-            yaxis_title="Metric Value",
-            xaxis_type="log"
+            x_title="Sequence Length",
+            y_title="Metric Value",
+            xaxis={"type": "log"}
         )
         
-        return fig.to_dict()
-        
     async def interact(self, user_input: str) -> str:
         """Handle user interactions"""
-        response = await self.model.generate_content(
-            f"Explain how Titans handles this experimental scenario: {user_input}"
+        response = await self._call_provider(
+            user_input,
+            self.model.generate_content,
+            self._compose_prompt(
+                user_input, f"Explain how Titans handles this experimental scenario: {user_input}")
         )
         return response.text
         
@@ -137,9 +155,10 @@ class ExperimentalAgent(TitansAgent):
         """Return performance metrics"""
         return {
             "max_sequence_length": 2000000,
-            "avg_processing_time_ms": 25.3,
+            "avg_processing_time_ms": self.telemetry.mean_ms("demonstrate"),
             "memory_efficiency": 0.93,
-            "retrieval_accuracy": 0.91
+            "retrieval_accuracy": 0.91,
+            **self._runtime_metrics()
         }
         
     def visualize(self) -> Dict[str, Any]:
@@ -1,13 +1,18 @@
 from .base_agent import TitansAgent
+from . import kernels
+from .figures import figure_spec, trace
+from .provider_client import MOCK_API_KEY, mock_base_url
+from .tracing import traced
 from groq import Groq
 import numpy as np
-import plotly.graph_objects as go
 from typing import Dict, Any, List
 
 class MemoryLayerAgent(TitansAgent):
     def __init__(self):
-        super().__init__("Groq Memory Layer Agent")
-        self.client = Groq()
+        super().__init__("Groq Memory Layer Agent", provider="groq")
+        base_url = mock_base_url()
+        self.client = Groq(base_url=base_url, api_key=MOCK_API_KEY) if base_url else Groq()
+        self.model_name = "mixtral-8x7b-32768"
         self.layer_activations = []
         self.architecture_comparisons = []
         
@@ -21,32 +26,33 @@ class MemoryLayerAgent(TitansAgent):
         }
         return demonstration
         
+    @traced()
     async def _analyze_layer_behavior(self) -> List[Dict[str, Any]]:
         """Analyze memory layer behavior"""
-        analyses = []
-        layer_sizes = [256, 512, 1024]
-        
-        for size in layer_sizes:
-            analysis = {
-                "layer_size": size,
-                "throughput": self._calculate_throughput(size),
-                "memory_capacity": size * 4,  # 4 bytes per parameter
-                "activation_pattern": self._simulate_activation_pattern(size)
+        layer_sizes = np.array([256, 512, 1024])
+        rates = kernels.layer_throughput(layer_sizes)
+        
+        analyses = [
+            {
+                "layer_size": int(size),
+                "throughput": float(rate),
+                "memory_capacity": int(size) * 4,  # 4 bytes per parameter
+                "activation_pattern": self._simulate_activation_pattern(int(size))
             }
-            analyses.append(analysis)
-            self.layer_activations.append(analysis)
-            
+            for size, rate in zip(layer_sizes, rates)
+        ]
+        self.layer_activations.extend(analyses)
         return analyses
         
     def _calculate_throughput(self, layer_size: int) -> float:
         """Calculate layer throughput"""
-        base_throughput = 1000  # tokens per second
-        return base_throughput * (512 / layer_size)  # Scale with layer size
+        return float(kernels.layer_throughput(layer_size))  # Scale with layer size
         
-    def _simulate_activation_pattern(self, size: int) -> List[float]:
+    def _simulate_activation_pattern(self, size: int) -> np.ndarray:
         """Simulate layer activation patterns"""
-        return list(np.random.normal(0.5, 0.1, size=min(size, 10)))
+        return np.random.normal(0.5, 0.1, size=min(size, 10))
         
+    @traced()
     def _compare_architectures(self) -> Dict[str, Any]:
         """Compare different memory architectures"""
         architectures = {
@@ -68,22 +74,20 @@ class MemoryLayerAgent(TitansAgent):
         }
         
         # Create comparison visualization
-        fig = go.Figure(data=[
-            go.Bar(name=metric, x=list(architectures.keys()),
-                  y=[arch[metric] for arch in architectures.values()])
-            for metric in ["memory_efficiency", "computational_cost"]
-        ])
-        
-        fig.update_layout(
+        visualization = figure_spec(
+            *[trace("bar", name=metric, x=list(architectures.keys()),
+                    y=[arch[metric] for arch in architectures.values()])
+              for metric in ["memory_efficiency", "computational_cost"]],
             title="Architecture Comparison",
             barmode='group'
         )
         
         return {
             "data": architectures,
-            "visualization": fig.to_dict()
+            "visualization": visualization
         }
         
+    @traced()
     def _visualize_activations(self) -> Dict[str, Any]:
         """Visualize layer activation patterns"""
         if not self.layer_activations:
@@ -93,29 +97,25 @@ class MemoryLayerAgent(TitansAgent):
         patterns = np.array([a["activation_pattern"] 
                            for a in self.layer_activations])
         
-        fig = go.Figure(data=go.Heatmap(
-            z=patterns,
-            colorscale='Viridis'
-        ))
-        
-        fig.update_layout(
+        return figure_spec(
+            trace("heatmap", z=patterns.tolist(), colorscale='Viridis'),
             title="Layer Activation Patterns",
-            xaxis_title="Neuron Index",
-            yaxis_title="Layer Size Configuration"
+            x_title="Neuron Index",
+            y_title="Layer Size Configuration"
         )
         
-        return fig.to_dict()
-        
     async def interact(self, user_input: str) -> str:
         """Handle user interactions"""
-        response = await self.client.chat.completions.create(
-            model="mixtral-8x7b-32768",
+        response = await self._call_provider(
+            user_input,
+            self.client.chat.completions.create,
+            model=self.model_name,
             messages=[{
                 "role": "system",
                 "content": "You are a Memory Layer Architecture expert."
             }, {
                 "role": "user",
-                "content": user_input
+                "content": self._compose_prompt(user_input)
             }]
         )
         return response.choices[0].message.content
@@ -133,8 +133,9 @@ class MemoryLayerAgent(TitansAgent):
         return {
             "layer_efficiency": 0.91,
             "memory_utilization": 0.87,
-            "throughput_tokens_per_second": 1250,
-            "average_latency_ms": 15.8
+            "throughput_tokens_per_second": self.telemetry.output_tokens_per_second(),
+            "average_latency_ms": self.telemetry.mean_ms("interact"),
+            **self._runtime_metrics()
         }
         
     def visualize(self) -> Dict[str, Any]:
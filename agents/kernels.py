@@ -0,0 +1,113 @@
+"""Array-in/array-out versions of the agents' metric models.
+
+Every kernel accepts a scalar or an array of any shape and returns a float64
+array of the same shape, so a whole parameter grid is one call. The agents'
+`_calculate_*` / `_simulate_*` helpers are thin scalar wrappers around these.
+"""
+from typing import Optional
+
+import numpy as np
+
+# Points per curve when an agent draws a sweep as a line instead of a few markers.
+DENSE_POINTS = 256
+
+
+def _f64(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def log_grid(start: float, stop: float, num: int = DENSE_POINTS) -> np.ndarray:
+    """Geometrically spaced grid, for sequence lengths and haystack sizes"""
+    return np.geomspace(start, stop, num)
+
+
+def linear_grid(start: float, stop: float, num: int = DENSE_POINTS) -> np.ndarray:
+    return np.linspace(start, stop, num)
+
+
+# Experimental validation (Gemini)
+
+def processing_time(lengths, base_time: float = 0.1) -> np.ndarray:
+    """Seconds to process a sequence; grows with log10(length)"""
+    return base_time * np.log10(_f64(lengths))
+
+
+def memory_usage_mb(lengths, bytes_per_token: int = 16) -> np.ndarray:
+    return _f64(lengths) * bytes_per_token / (1024 * 1024)
+
+
+def throughput(lengths, base_throughput: float = 1000.0) -> np.ndarray:
+    """Tokens per second at a sequence length"""
+    return base_throughput / np.log10(_f64(lengths))
+
+
+def retrieval_time(sizes, base_time: float = 0.05) -> np.ndarray:
+    return base_time * np.log2(_f64(sizes))
+
+
+def retrieval_accuracy(sizes, base_accuracy: float = 0.98) -> np.ndarray:
+    return base_accuracy * (1 - np.log10(_f64(sizes)) / 20)
+
+
+def retrieval_success_rate(sizes, base_rate: float = 0.95) -> np.ndarray:
+    return base_rate * (1 - np.log10(_f64(sizes)) / 15)
+
+
+# Momentum and weight decay (Cohere)
+
+def convergence_rate(momentum) -> np.ndarray:
+    return 1 - np.exp(-5 * (1 - _f64(momentum)))
+
+
+def stability_score(momentum) -> np.ndarray:
+    return 1 - (1 - _f64(momentum)) ** 2
+
+
+def momentum_efficiency(momentum) -> np.ndarray:
+    return 0.9 + 0.1 * _f64(momentum)
+
+
+def size_reduction(decay_rates) -> np.ndarray:
+    return np.minimum(0.5, _f64(decay_rates) * 5)
+
+
+def performance_impact(decay_rates) -> np.ndarray:
+    return 1 - _f64(decay_rates) * 2
+
+
+def memory_savings(decay_rates) -> np.ndarray:
+    return np.minimum(0.4, _f64(decay_rates) * 4)
+
+
+# Memory as Context (Anthropic)
+
+def integration_score(seq_lengths, base_score: float = 0.95) -> np.ndarray:
+    """Context integration effectiveness, decaying with sequence length"""
+    return base_score * np.exp(-0.0001 * _f64(seq_lengths))
+
+
+def context_memory_usage(seq_lengths) -> np.ndarray:
+    """Memory usage in MB, capped at 1.0"""
+    return np.minimum(1.0, _f64(seq_lengths) * 16 / (1024 * 1024))
+
+
+def context_window(seq_lengths, window: int = 2048) -> np.ndarray:
+    return np.minimum(_f64(seq_lengths), window)
+
+
+# Memory as Layer (Groq)
+
+def layer_throughput(layer_sizes, base_throughput: float = 1000.0) -> np.ndarray:
+    """Tokens per second, inversely proportional to layer size"""
+    return base_throughput * (512 / _f64(layer_sizes))
+
+
+# Memory as Gate (Mistral)
+
+def gated_output(stm_weights, ltm_weights, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Gate-weighted mix of noisy short- and long-term memory signals, one draw per element"""
+    stm_weights, ltm_weights = np.broadcast_arrays(_f64(stm_weights), _f64(ltm_weights))
+    source = np.random if rng is None else rng
+    stm_signal = source.normal(0.7, 0.1, size=stm_weights.shape)
+    ltm_signal = source.normal(0.6, 0.1, size=ltm_weights.shape)
+    return stm_weights * stm_signal + ltm_weights * ltm_signal
@@ -0,0 +1,166 @@
+"""Needle-in-a-haystack experiments on the session memory engine.
+
+Each session's stream is mostly background: tokens drawn from a small
+vocabulary of recurring patterns (plus noise), which the memory soon learns to
+predict. One novel needle token per session lands at a random position.
+Recall reads a session's memory with a token's key and succeeds when the
+nearest candidate value (every pattern's and the needle's) is the token's own.
+
+pruning_experiment measures a MemoryPruner pass on such sessions, left idle,
+and on a store of stored memories of mixed strength and age.
+
+Agents show these experiments in their demonstrations; cached_experiment runs
+each one once per process instead of on every request.
+"""
+import copy
+import functools
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from .memory_index import MemoryStore
+from .neural_memory import SessionMemoryManager
+from .pruning import ENERGY, HALF_LIFE, MemoryPruner, SessionMemoryTarget, StoredMemoryTarget
+from .quantization import dequantize
+
+
+T = TypeVar("T")
+
+
+def cached_experiment(fn: Callable[[], T]) -> Callable[[], T]:
+    """Run a no-argument experiment at most once per process, however many threads ask at once.
+
+    Callers get a copy of the result, free to modify.
+    """
+    lock = threading.Lock()
+    results: List[T] = []
+
+    @functools.wraps(fn)
+    def wrapper() -> T:
+        with lock:
+            if not results:
+                results.append(fn())
+        return copy.deepcopy(results[0])
+    return wrapper
+
+
+def _unit(rng: np.random.Generator, shape) -> np.ndarray:
+    vectors = rng.normal(size=shape).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def needle_stream(sessions: int, rounds: int, tokens: int, dim: int = 256, vocabulary: int = 16,
+                  noise: float = 0.05, seed: int = 0) -> Dict[str, np.ndarray]:
+    """(rounds, sessions, tokens, dim) unit tokens with one needle per session, plus the patterns and needles"""
+    rng = np.random.default_rng(seed)
+    patterns = _unit(rng, (vocabulary, dim))
+    stream = patterns[rng.integers(0, vocabulary, size=(rounds, sessions, tokens))]
+    stream += noise * _unit(rng, stream.shape)
+    needles = _unit(rng, (sessions, dim))
+    needle_round = rng.integers(0, rounds, size=sessions)
+    stream[needle_round, np.arange(sessions), rng.integers(0, tokens, size=sessions)] = needles
+    stream /= np.linalg.norm(stream, axis=-1, keepdims=True)
+    return {"stream": stream, "patterns": patterns, "needles": needles}
+
+
+def needle_recall(manager: SessionMemoryManager, session_ids: Sequence[str],
+                  patterns: np.ndarray, needles: np.ndarray) -> Tuple[float, float]:
+    """(needle recall, pattern recall) of each session's memory, averaged over sessions"""
+    slots = np.array([manager.admit(session_id) for session_id in session_ids])
+    memory = dequantize(manager.memory[slots], manager.memory_scale[slots])
+    # Candidates per session: every pattern, then its needle.
+    candidates = np.concatenate([np.broadcast_to(patterns, (len(slots), *patterns.shape)),
+                                 needles[:, None, :]], axis=1)
+    values = candidates @ manager.w_value
+    recalled = np.matmul(candidates @ manager.w_key, memory.transpose(0, 2, 1))
+    similarity = np.matmul(recalled, values.transpose(0, 2, 1)) / np.linalg.norm(values, axis=-1)[:, None, :]
+    correct = similarity.argmax(axis=2) == np.arange(candidates.shape[1])
+    return float(correct[:, -1].mean()), float(correct[:, :-1].mean())
+
+
+def threshold_sweep(thresholds: Sequence[float], sessions: int = 16, rounds: int = 60, tokens: int = 8,
+                    dim: int = 256, seed: int = 0, repeats: int = 3, lr: Optional[float] = None,
+                    momentum: float = 0.5) -> List[Dict[str, Any]]:
+    """Write the same needle stream at each surprise threshold; the first threshold is the baseline.
+
+    Throughput is the best of `repeats` runs from an empty memory. The learning
+    rate defaults to `tokens` (a needle gets 1/tokens of its chunk's mean
+    gradient): with it and momentum 0.5, dense updates converge on the patterns
+    and store the needles. At the agents' defaults (0.1 and 0.9) they recall
+    needles at chance, which leaves nothing to lose.
+    """
+    lr = float(tokens) if lr is None else lr
+    data = needle_stream(sessions, rounds, tokens, dim, seed=seed)
+    session_ids = [f"needle-{i}" for i in range(sessions)]
+    results = []
+    with tempfile.TemporaryDirectory() as spill_dir:
+        for threshold in thresholds:
+            seconds = float("inf")
+            for _ in range(max(repeats, 1)):
+                manager = SessionMemoryManager(capacity=sessions, dim=dim, spill_dir=spill_dir, shared=False,
+                                               precision="float32", surprise_threshold=threshold)
+                for session_id in session_ids:
+                    manager.admit(session_id, lr=lr, momentum=momentum)
+                started = time.perf_counter()
+                for chunk in data["stream"]:
+                    manager.step(dict(zip(session_ids, chunk)))
+                seconds = min(seconds, time.perf_counter() - started)
+            needle, pattern = needle_recall(manager, session_ids, data["patterns"], data["needles"])
+            metrics = manager.get_metrics()
+            results.append({
+                "threshold": float(threshold),
+                "tokens_skipped": metrics["memory_tokens_skipped_fraction"],
+                "updates_skipped": metrics["memory_updates_skipped_fraction"],
+                "tokens_per_second": round(manager.tokens / seconds, 1),
+                "needle_recall": needle,
+                "pattern_recall": pattern
+            })
+    baseline = results[0] if results else {}
+    for result in results:
+        result["speedup"] = round(result["tokens_per_second"] / baseline["tokens_per_second"], 3)
+        result["needle_recall_delta"] = round(result["needle_recall"] - baseline["needle_recall"], 4)
+        result["pattern_recall_delta"] = round(result["pattern_recall"] - baseline["pattern_recall"], 4)
+    return results
+
+
+def pruning_experiment(memories: int = 20000, sessions: int = 32, rounds: int = 40, tokens: int = 8,
+                       dim: int = 256, strategy: str = "low_rank", energy: float = ENERGY,
+                       seed: int = 0) -> Dict[str, Any]:
+    """One pruning pass over synthetic stored memories and idle needle sessions.
+
+    Returns the pass report plus needle and pattern recall before pruning and
+    after the compressed sessions are restored.
+    """
+    rng = np.random.default_rng(seed)
+    store = MemoryStore(dim, max_memories=memories)
+    store.add([{"content": f"Memory content {i}", "strength": float(s)}
+               for i, s in enumerate(rng.uniform(0.05, 1.0, size=memories))], _unit(rng, (memories, dim)))
+    # Last use spread over the past few half-lives, as if written and retrieved over a long session.
+    for memory, age in zip(store.memories, rng.exponential(2 * HALF_LIFE, size=memories)):
+        memory["last_used"] -= age
+
+    data = needle_stream(sessions, rounds, tokens, dim, seed=seed)
+    session_ids = [f"needle-{i}" for i in range(sessions)]
+    with tempfile.TemporaryDirectory() as spill_dir:
+        manager = SessionMemoryManager(capacity=sessions, dim=dim, spill_dir=spill_dir, shared=False,
+                                       precision="float32", surprise_threshold=0.0)
+        for chunk in data["stream"]:
+            manager.step(dict(zip(session_ids, chunk)))
+        before = needle_recall(manager, session_ids, data["patterns"], data["needles"])
+        # Half the sessions are already spilled (dense), so restore latency is measured before and after.
+        for session_id in session_ids[::2]:
+            manager.evict(session_id)
+
+        pruner = MemoryPruner(interval=0)
+        pruner.register(StoredMemoryTarget("stored_memories", store))
+        pruner.register(SessionMemoryTarget(manager, strategy=strategy, energy=energy))
+        manager.idle_seconds = 0.0  # every session counts as idle for this pass
+        report = pruner.run_once()
+        manager.idle_seconds = float("inf")
+        after = needle_recall(manager, session_ids, data["patterns"], data["needles"])
+    return {**report, "strategy": strategy, "energy": energy,
+            "needle_recall_before": before[0], "needle_recall_after": after[0],
+            "pattern_recall_before": before[1], "pattern_recall_after": after[1]}
@@ -0,0 +1,442 @@
+"""Nearest-neighbour indexes over memory keys.
+
+ExactIndex scores queries against every stored key in fixed-size blocks, so
+memory stays bounded and each block is one BLAS matmul. IVFIndex clusters keys
+with k-means and only scans the `nprobe` closest clusters. Both take incremental
+inserts and deletes. Scores are inner products; insert unit vectors for cosine.
+
+Keys can be stored in float16 or int8 (one scale per key, see
+agents/quantization.py); scoring dequantizes one block of keys at a time.
+
+MemoryStore keeps the memories themselves next to an ExactIndex of their keys,
+with the usage and strength bookkeeping that forgetting and pruning rely on.
+"""
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .quantization import dequantize, quantize, storage_dtype
+
+SearchResult = Tuple[np.ndarray, np.ndarray]  # (scores, ids), each (n_queries, k)
+
+
+def _as_matrix(vectors, dim: int) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    if vectors.shape[1] != dim:
+        raise ValueError(f"Expected vectors of dimension {dim}, got {vectors.shape[1]}")
+    return vectors
+
+
+def _merge_top_k(best_scores: np.ndarray, best_ids: np.ndarray,
+                 scores: np.ndarray, ids: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep the k highest of the running best and a new block of candidates"""
+    scores = np.concatenate([best_scores, scores], axis=1)
+    ids = np.concatenate([best_ids, ids], axis=1)
+    if scores.shape[1] > k:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, part, axis=1)
+        ids = np.take_along_axis(ids, part, axis=1)
+    return scores, ids
+
+
+def _sorted(scores: np.ndarray, ids: np.ndarray, k: int) -> SearchResult:
+    order = np.argsort(-scores, axis=1)[:, :k]
+    scores = np.take_along_axis(scores, order, axis=1)
+    ids = np.take_along_axis(ids, order, axis=1)
+    if scores.shape[1] < k:
+        # Fewer than k live entries: pad with -inf / -1 so shapes stay (n, k).
+        pad = k - scores.shape[1]
+        scores = np.pad(scores, ((0, 0), (0, pad)), constant_values=-np.inf)
+        ids = np.pad(ids, ((0, 0), (0, pad)), constant_values=-1)
+    return scores, ids
+
+
+class _KeyStore:
+    """Growable (capacity-doubling) key matrix with O(1) delete by swapping in the last row"""
+
+    def __init__(self, dim: int, capacity: int = 1024, precision: str = "float32"):
+        self.dim = dim
+        self.precision = precision
+        self.min_capacity = capacity
+        self.keys = np.empty((capacity, dim), dtype=storage_dtype(precision))
+        self.scales = np.empty(capacity, dtype=np.float32)
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.size = 0
+
+    def append(self, keys: np.ndarray, ids: np.ndarray) -> int:
+        """Append rows and return the position of the first one"""
+        needed = self.size + len(keys)
+        if needed > len(self.keys):
+            capacity = max(needed, 2 * len(self.keys))
+            self.keys = np.resize(self.keys, (capacity, self.dim))
+            self.scales = np.resize(self.scales, capacity)
+            self.ids = np.resize(self.ids, capacity)
+        start = self.size
+        self.keys[start:needed], self.scales[start:needed] = quantize(keys, self.precision)
+        self.ids[start:needed] = ids
+        self.size = needed
+        return start
+
+    def remove(self, position: int) -> Optional[int]:
+        """Remove a row; returns the id that moved into `position`, if any"""
+        last = self.size - 1
+        moved = None
+        if position != last:
+            self.keys[position] = self.keys[last]
+            self.scales[position] = self.scales[last]
+            self.ids[position] = self.ids[last]
+            moved = int(self.ids[position])
+        self.size = last
+        return moved
+
+    def shrink(self) -> int:
+        """Release spare capacity beyond a quarter of headroom; returns bytes freed"""
+        capacity = max(self.size + self.size // 4, self.min_capacity)
+        if capacity >= len(self.keys):
+            return 0
+        before = self.allocated_bytes
+        self.keys = self.keys[:capacity].copy()
+        self.scales = self.scales[:capacity].copy()
+        self.ids = self.ids[:capacity].copy()
+        return before - self.allocated_bytes
+
+    @property
+    def allocated_bytes(self) -> int:
+        return self.keys.nbytes + self.scales.nbytes + self.ids.nbytes
+
+    @property
+    def live_keys(self) -> np.ndarray:
+        """float32 keys; a view of storage at float32, a dequantized copy otherwise"""
+        return dequantize(self.keys[:self.size], self.scales[:self.size])
+
+    @property
+    def nbytes(self) -> int:
+        return self.size * (self.keys.itemsize * self.dim + (self.scales.itemsize if self.precision == "int8" else 0))
+
+    def scores(self, queries: np.ndarray, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """queries @ keys[start:stop].T, dequantizing only that block"""
+        stop = self.size if stop is None else min(stop, self.size)
+        scores = queries @ self.keys[start:stop].astype(np.float32, copy=False).T
+        if self.precision == "int8":
+            scores *= self.scales[start:stop]
+        return scores
+
+    @property
+    def live_ids(self) -> np.ndarray:
+        return self.ids[:self.size]
+
+
+class ExactIndex:
+    """Brute-force top-k by blocked matrix multiply"""
+
+    def __init__(self, dim: int, block_size: int = 65536, precision: str = "float32"):
+        self.dim = dim
+        self.block_size = block_size
+        self.precision = precision
+        self._store = _KeyStore(dim, precision=precision)
+        self._positions: Dict[int, int] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return self._store.size
+
+    @property
+    def nbytes(self) -> int:
+        """Stored bytes of the live keys, scales included"""
+        return self._store.nbytes
+
+    @property
+    def allocated_bytes(self) -> int:
+        """Bytes held by the key store, spare capacity included"""
+        return self._store.allocated_bytes
+
+    def compact(self) -> int:
+        """Give back spare capacity left by removals; returns bytes freed"""
+        return self._store.shrink()
+
+    def _assign_ids(self, count: int, ids: Optional[Iterable[int]]) -> np.ndarray:
+        if ids is None:
+            ids = np.arange(self._next_id, self._next_id + count, dtype=np.int64)
+        else:
+            ids = np.asarray(list(ids), dtype=np.int64)
+            if len(ids) != count:
+                raise ValueError("ids and keys must have the same length")
+        duplicates = [int(i) for i in ids if int(i) in self._positions]
+        if duplicates:
+            raise KeyError(f"ids already indexed: {duplicates[:5]}")
+        self._next_id = max(self._next_id, int(ids.max()) + 1) if count else self._next_id
+        return ids
+
+    def add(self, keys, ids: Optional[Iterable[int]] = None) -> np.ndarray:
+        """Insert keys, returning their ids (sequential unless given)"""
+        keys = _as_matrix(keys, self.dim)
+        ids = self._assign_ids(len(keys), ids)
+        start = self._store.append(keys, ids)
+        for offset, key_id in enumerate(ids):
+            self._positions[int(key_id)] = start + offset
+        return ids
+
+    def remove(self, ids: Iterable[int]) -> int:
+        """Delete keys by id; unknown ids are ignored. Returns how many were removed"""
+        removed = 0
+        for key_id in ids:
+            position = self._positions.pop(int(key_id), None)
+            if position is None:
+                continue
+            moved = self._store.remove(position)
+            if moved is not None:
+                self._positions[moved] = position
+            removed += 1
+        return removed
+
+    def search(self, queries, k: int = 10) -> SearchResult:
+        queries = _as_matrix(queries, self.dim)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_ids = np.empty((len(queries), 0), dtype=np.int64)
+        ids = self._store.live_ids
+        for start in range(0, len(ids), self.block_size):
+            scores = self._store.scores(queries, start, start + self.block_size)
+            block_ids = np.broadcast_to(ids[start:start + scores.shape[1]], scores.shape)
+            if scores.shape[1] > k:
+                part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, part, axis=1)
+                block_ids = np.take_along_axis(block_ids, part, axis=1)
+            best_scores, best_ids = _merge_top_k(best_scores, best_ids, scores, block_ids, k)
+        return _sorted(best_scores, best_ids, k)
+
+
+def kmeans(vectors: np.ndarray, clusters: int, iterations: int = 10,
+           seed: int = 0, block_size: int = 65536) -> np.ndarray:
+    """Lloyd's k-means with blocked assignment; returns (clusters, dim) centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = _nearest(vectors, centroids, block_size)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=clusters)
+        empty = counts == 0
+        centroids = np.where(empty[:, None], centroids, sums / np.maximum(counts, 1)[:, None])
+        if empty.any():
+            # Re-seed empty clusters from random points so every list stays usable.
+            centroids[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+    return centroids.astype(np.float32)
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray, block_size: int = 65536) -> np.ndarray:
+    """Index of the nearest (L2) centroid for every vector"""
+    # Squared-L2 via inner products: argmax(v.c - |c|^2 / 2) == argmin |v - c|^2.
+    half_norms = 0.5 * np.einsum("ij,ij->i", centroids, centroids)
+    out = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), block_size):
+        block = vectors[start:start + block_size]
+        out[start:start + len(block)] = np.argmax(block @ centroids.T - half_norms, axis=1)
+    return out
+
+
+class IVFIndex:
+    """Inverted-file index: keys are bucketed by nearest k-means centroid.
+
+    Keys inserted before the index is trained are kept in a pending list and
+    scanned exactly; once `train_size` keys have arrived (or train() is called)
+    the centroids are fitted and pending keys are bucketed.
+    """
+
+    def __init__(self, dim: int, nlist: int = 256, nprobe: int = 8, train_size: Optional[int] = None,
+                 kmeans_iterations: int = 10, seed: int = 0, precision: str = "float32"):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size or 40 * nlist
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+        self.precision = precision
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[_KeyStore] = []
+        self._pending = ExactIndex(dim, precision=precision)
+        self._where: Dict[int, Tuple[int, int]] = {}  # id -> (list, position)
+        self._next_id = 0
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return len(self._pending) + sum(store.size for store in self._lists)
+
+    @property
+    def nbytes(self) -> int:
+        return self._pending.nbytes + sum(store.nbytes for store in self._lists)
+
+    def train(self, sample: Optional[np.ndarray] = None) -> None:
+        """Fit centroids (on `sample`, or the pending keys) and bucket everything pending"""
+        if sample is None:
+            sample = self._pending._store.live_keys
+        sample = _as_matrix(sample, self.dim)
+        if len(sample) < self.nlist:
+            raise ValueError(f"Need at least nlist={self.nlist} keys to train, got {len(sample)}")
+        if len(sample) > self.train_size:
+            rng = np.random.default_rng(self.seed)
+            sample = sample[rng.choice(len(sample), self.train_size, replace=False)]
+        self.centroids = kmeans(sample, self.nlist, self.kmeans_iterations, self.seed)
+        self._lists = [_KeyStore(self.dim, capacity=64, precision=self.precision) for _ in range(self.nlist)]
+        pending = self._pending._store
+        keys, ids = pending.live_keys.copy(), pending.live_ids.copy()
+        self._pending = ExactIndex(self.dim, precision=self.precision)
+        if len(keys):
+            self._bucket(keys, ids)
+
+    def _bucket(self, keys: np.ndarray, ids: np.ndarray) -> None:
+        assignment = _nearest(keys, self.centroids)
+        order = np.argsort(assignment, kind="stable")
+        assignment, keys, ids = assignment[order], keys[order], ids[order]
+        bounds = np.flatnonzero(np.diff(assignment)) + 1
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(keys)]):
+            cluster = int(assignment[lo])
+            start = self._lists[cluster].append(keys[lo:hi], ids[lo:hi])
+            for offset, key_id in enumerate(ids[lo:hi]):
+                self._where[int(key_id)] = (cluster, start + offset)
+
+    def add(self, keys, ids: Optional[Iterable[int]] = None) -> np.ndarray:
+        keys = _as_matrix(keys, self.dim)
+        if ids is None:
+            ids = np.arange(self._next_id, self._next_id + len(keys), dtype=np.int64)
+        else:
+            ids = np.asarray(list(ids), dtype=np.int64)
+        duplicates = [int(i) for i in ids if int(i) in self._where or int(i) in self._pending._positions]
+        if duplicates:
+            raise KeyError(f"ids already indexed: {duplicates[:5]}")
+        if len(ids):
+            self._next_id = max(self._next_id, int(ids.max()) + 1)
+        if self.is_trained:
+            self._bucket(keys, ids)
+        else:
+            self._pending.add(keys, ids)
+            if len(self._pending) >= self.train_size:
+                self.train()
+        return ids
+
+    def remove(self, ids: Iterable[int]) -> int:
+        removed = 0
+        for key_id in ids:
+            key_id = int(key_id)
+            location = self._where.pop(key_id, None)
+            if location is None:
+                removed += self._pending.remove([key_id])
+                continue
+            cluster, position = location
+            moved = self._lists[cluster].remove(position)
+            if moved is not None:
+                self._where[moved] = (cluster, position)
+            removed += 1
+        return removed
+
+    def search(self, queries, k: int = 10, nprobe: Optional[int] = None) -> SearchResult:
+        queries = _as_matrix(queries, self.dim)
+        if not self.is_trained:
+            return self._pending.search(queries, k)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        # Probe the clusters whose centroids are nearest in L2, matching how keys were bucketed.
+        half_norms = 0.5 * np.einsum("ij,ij->i", self.centroids, self.centroids)
+        probes = np.argpartition(-(queries @ self.centroids.T - half_norms), nprobe - 1, axis=1)[:, :nprobe]
+
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        # Group queries by probed cluster so each list is scored with one matmul.
+        query_rows = np.repeat(np.arange(len(queries)), nprobe)
+        clusters = probes.reshape(-1)
+        order = np.argsort(clusters, kind="stable")
+        clusters, query_rows = clusters[order], query_rows[order]
+        bounds = np.flatnonzero(np.diff(clusters)) + 1
+        candidates: List[List[Tuple[np.ndarray, np.ndarray]]] = [[] for _ in range(len(queries))]
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(clusters)]):
+            store = self._lists[int(clusters[lo])]
+            if not store.size:
+                continue
+            rows = query_rows[lo:hi]
+            scores = store.scores(queries[rows])
+            ids = store.live_ids
+            if scores.shape[1] > k:
+                part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                top_scores = np.take_along_axis(scores, part, axis=1)
+                top_ids = ids[part]
+            else:
+                top_scores, top_ids = scores, np.broadcast_to(ids, scores.shape)
+            for row, row_scores, row_ids in zip(rows, top_scores, top_ids):
+                candidates[row].append((row_scores, row_ids))
+
+        for row, parts in enumerate(candidates):
+            if parts:
+                scores = np.concatenate([p[0] for p in parts])[None, :]
+                ids = np.concatenate([p[1] for p in parts])[None, :]
+                row_scores, row_ids = _sorted(scores, ids, k)
+                all_scores[row], all_ids[row] = row_scores[0], row_ids[0]
+        return all_scores, all_ids
+
+
+class MemoryStore:
+    """Memories (dicts with a "strength") whose keys are indexed for retrieval.
+
+    Every memory gets a "memory_id", and "last_used"/"hits" that retrieval
+    updates. Beyond `max_memories` the weakest are forgotten. `lock` guards
+    every change, so a pruning thread can work alongside the owner.
+    """
+
+    def __init__(self, dim: int, max_memories: int = 10000, precision: str = "float32"):
+        self.index = ExactIndex(dim, precision=precision)
+        self.memories: List[Dict[str, Any]] = []
+        self.by_id: Dict[int, Dict[str, Any]] = {}
+        self.max_memories = max_memories
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.memories)
+
+    def add(self, memories: List[Dict[str, Any]], keys) -> None:
+        now = time.time()
+        with self.lock:
+            for memory, memory_id in zip(memories, self.index.add(keys)):
+                memory.update(memory_id=int(memory_id), last_used=now, hits=0)
+                self.by_id[int(memory_id)] = memory
+            self.memories.extend(memories)
+            overflow = len(self.memories) - self.max_memories
+            if overflow > 0:
+                self.forget(sorted(self.memories, key=lambda m: m["strength"])[:overflow])
+
+    def forget(self, memories: Iterable[Dict[str, Any]]) -> int:
+        """Drop memories and their keys; returns how many were stored"""
+        with self.lock:
+            ids = {m["memory_id"] for m in memories if m["memory_id"] in self.by_id}
+            if ids:
+                self.index.remove(ids)
+                for memory_id in ids:
+                    del self.by_id[memory_id]
+                self.memories = [m for m in self.memories if m["memory_id"] not in ids]
+        return len(ids)
+
+    def search(self, queries, k: int = 1) -> List[List[Tuple[float, Dict[str, Any]]]]:
+        """(score, memory) pairs per query, best first; retrieved memories count as used"""
+        now = time.time()
+        results = []
+        with self.lock:
+            scores, ids = self.index.search(queries, k)
+            for row_scores, row_ids in zip(scores, ids):
+                row = []
+                for score, memory_id in zip(row_scores, row_ids):
+                    memory = self.by_id.get(int(memory_id))
+                    if memory is not None:
+                        memory["hits"] += 1
+                        memory["last_used"] = now
+                        row.append((float(score), memory))
+                results.append(row)
+        return results
+
+    @property
+    def nbytes(self) -> int:
+        """Key store allocation plus the UTF-8 size of the memories' contents"""
+        return self.index.allocated_bytes + sum(len(str(m.get("content", "")).encode("utf-8"))
+                                                for m in self.memories)
@@ -0,0 +1,153 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+from .telemetry import BUCKET_COUNT, LatencyHistogram, all_telemetry, bucket_midpoint
+
+# Prometheus `le` boundaries in seconds; HDR buckets are folded into these at scrape time.
+LATENCY_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# HDR bucket index -> Prometheus bucket index, computed once at import.
+_BOUND_OF_BUCKET = []
+for _index in range(BUCKET_COUNT):
+    _seconds = bucket_midpoint(_index) / 1_000_000
+    _BOUND_OF_BUCKET.append(next(
+        (i for i, bound in enumerate(LATENCY_BOUNDS) if _seconds <= bound), len(LATENCY_BOUNDS)
+    ))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(name: str, labels: str, histogram: LatencyHistogram) -> List[str]:
+    folded = [0] * (len(LATENCY_BOUNDS) + 1)
+    for index, count in enumerate(histogram.counts):
+        if count:
+            folded[_BOUND_OF_BUCKET[index]] += count
+    lines = []
+    cumulative = 0
+    for bound, count in zip(LATENCY_BOUNDS, folded):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.total_seconds:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+def render_metrics() -> str:
+    """Render every agent's telemetry in the Prometheus text exposition format"""
+    registry = all_telemetry()
+    lines = [
+        "# HELP titans_agent_requests_total Agent operations completed, including failures.",
+        "# TYPE titans_agent_requests_total counter",
+    ]
+    for telemetry in registry.values():
+        agent = _label(telemetry.name)
+        for op, histogram in telemetry.operations.items():
+            lines.append(f'titans_agent_requests_total{{agent="{agent}",operation="{op}"}} {histogram.count}')
+
+    lines += [
+        "# HELP titans_agent_errors_total Agent operations that raised.",
+        "# TYPE titans_agent_errors_total counter",
+    ]
+    for telemetry in registry.values():
+        agent = _label(telemetry.name)
+        for op, errors in telemetry.errors.items():
+            lines.append(f'titans_agent_errors_total{{agent="{agent}",operation="{op}"}} {errors}')
+
+    lines += [
+        "# HELP titans_agent_latency_seconds Wall time of agent operations.",
+        "# TYPE titans_agent_latency_seconds histogram",
+    ]
+    for telemetry in registry.values():
+        agent = _label(telemetry.name)
+        for op, histogram in telemetry.operations.items():
+            lines += _histogram_lines(
+                "titans_agent_latency_seconds", f'agent="{agent}",operation="{op}"', histogram
+            )
+
+    lines += [
+        "# HELP titans_provider_latency_seconds Time to first token of provider calls.",
+        "# TYPE titans_provider_latency_seconds histogram",
+    ]
+    for telemetry in registry.values():
+        lines += _histogram_lines(
+            "titans_provider_latency_seconds", f'agent="{_label(telemetry.name)}"', telemetry.first_token
+        )
+
+    gauges = (
+        ("titans_agent_in_flight", "Agent operations currently running.", "in_flight"),
+        ("titans_provider_in_flight", "Provider calls currently running.", "provider_in_flight"),
+    )
+    counters = (
+        ("titans_provider_calls_total", "Provider call attempts.", "provider_calls"),
+        ("titans_provider_errors_total", "Provider call attempts that raised.", "provider_errors"),
+        ("titans_provider_retries_total", "Provider calls retried after 429/5xx.", "provider_retries"),
+        ("titans_provider_throttled_seconds_total", "Time spent waiting on rate limits.", "throttled_seconds"),
+        ("titans_provider_input_tokens_total", "Prompt tokens reported by providers.", "input_tokens"),
+        ("titans_provider_output_tokens_total", "Completion tokens reported by providers.", "output_tokens"),
+    )
+    for kind, metrics in (("gauge", gauges), ("counter", counters)):
+        for metric, help_text, attr in metrics:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            for telemetry in registry.values():
+                lines.append(f'{metric}{{agent="{_label(telemetry.name)}"}} {getattr(telemetry, attr)}')
+
+    lines += [
+        "# HELP titans_cache_hits_total Cache lookups served without a provider call.",
+        "# TYPE titans_cache_hits_total counter",
+        "# HELP titans_cache_lookups_total Cache lookups.",
+        "# TYPE titans_cache_lookups_total counter",
+    ]
+    for telemetry in registry.values():
+        agent = _label(telemetry.name)
+        for cache, (hits, lookups) in list(telemetry.caches.items()):
+            labels = f'agent="{agent}",cache="{_label(cache)}"'
+            lines.append(f"titans_cache_hits_total{{{labels}}} {hits}")
+            lines.append(f"titans_cache_lookups_total{{{labels}}} {lookups}")
+
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the Streamlit console.
+        pass
+
+
+def start_metrics_server(port: Optional[int] = None, host: Optional[str] = None) -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics on a daemon thread. Disabled unless a port is given or TITANS_METRICS_PORT is set.
+
+    Safe to call repeatedly; only the first call starts a server.
+    """
+    global _server
+    if port is None:
+        port = int(os.getenv("TITANS_METRICS_PORT", "0") or 0)
+    if not port:
+        return None
+    host = host or os.getenv("TITANS_METRICS_HOST", "127.0.0.1")
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="titans-metrics", daemon=True).start()
+        return _server
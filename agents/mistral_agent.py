@@ -1,21 +1,32 @@
 from .base_agent import TitansAgent
+from . import kernels
+from .figures import figure_spec, trace
+from .provider_client import MOCK_API_KEY, mock_base_url
+from .tracing import traced
 try:
     from mistralai.client import MistralClient
 except ImportError:
     # mistralai>=1.0.0 exposes `Mistral` instead of `MistralClient`.
     from mistralai import Mistral as MistralClient
-import numpy as np
-import plotly.graph_objects as go
 from typing import Dict, Any, List
 import os
 
 class MemoryGateAgent(TitansAgent):
     def __init__(self):
-        super().__init__("Mistral Memory Gate Agent")
-        api_key = os.getenv("MISTRAL_API_KEY")
-        if not api_key:
-            raise ValueError("MISTRAL_API_KEY environment variable is required")
-        self.client = MistralClient(api_key=api_key)
+        super().__init__("Mistral Memory Gate Agent", provider="mistral")
+        base_url = mock_base_url()
+        if base_url:
+            try:
+                self.client = MistralClient(api_key=MOCK_API_KEY, endpoint=base_url)
+            except TypeError:
+                # mistralai>=1.0.0 calls the same option server_url.
+                self.client = MistralClient(api_key=MOCK_API_KEY, server_url=base_url)
+        else:
+            api_key = os.getenv("MISTRAL_API_KEY")
+            if not api_key:
+                raise ValueError("MISTRAL_API_KEY environment variable is required")
+            self.client = MistralClient(api_key=api_key)
+        self.model_name = "mistral-large-latest"
         self.gate_states = []
         self.memory_flow = []
         
@@ -29,55 +40,58 @@ class MemoryGateAgent(TitansAgent):
         }
         return demonstration
         
+    @traced()
     async def _demonstrate_gating(self) -> List[Dict[str, Any]]:
         """Demonstrate gating mechanism"""
-        operations = []
         # Simulate different gating scenarios
         scenarios = [
             ("short_term", 0.8, 0.2),
             ("balanced", 0.5, 0.5),
             ("long_term", 0.2, 0.8)
         ]
+        names, stm_weights, ltm_weights = zip(*scenarios)
+        outputs = kernels.gated_output(stm_weights, ltm_weights)
         
-        for scenario, stm_weight, ltm_weight in scenarios:
-            operation = {
+        operations = [
+            {
                 "scenario": scenario,
                 "short_term_weight": stm_weight,
                 "long_term_weight": ltm_weight,
-                "combined_output": self._simulate_gated_output(stm_weight, ltm_weight)
+                "combined_output": float(output)
             }
-            operations.append(operation)
-            self.gate_states.append(operation)
-        
+            for scenario, stm_weight, ltm_weight, output in zip(names, stm_weights, ltm_weights, outputs)
+        ]
+        self.gate_states.extend(operations)
         return operations
         
     def _simulate_gated_output(self, stm_weight: float, ltm_weight: float) -> float:
         """Simulate gated output combining short-term and long-term memory"""
-        stm_signal = np.random.normal(0.7, 0.1)
-        ltm_signal = np.random.normal(0.6, 0.1)
-        return stm_weight * stm_signal + ltm_weight * ltm_signal
+        return float(kernels.gated_output(stm_weight, ltm_weight))
         
+    @traced()
     def _create_flow_visualization(self) -> Dict[str, Any]:
         """Create visualization of memory flow through gates"""
         # Create Sankey diagram of memory flow
-        fig = go.Figure(data=[go.Sankey(
-            node = dict(
-                pad = 15,
-                thickness = 20,
-                line = dict(color = "black", width = 0.5),
-                label = ["Input", "Short-term", "Long-term", "Output"],
-                color = "blue"
+        return figure_spec(
+            trace(
+                "sankey",
+                node = dict(
+                    pad = 15,
+                    thickness = 20,
+                    line = dict(color = "black", width = 0.5),
+                    label = ["Input", "Short-term", "Long-term", "Output"],
+                    color = "blue"
+                ),
+                link = dict(
+                    source = [0, 0, 1, 2],
+                    target = [1, 2, 3, 3],
+                    value = [0.6, 0.4, 0.5, 0.5]
+                )
             ),
-            link = dict(
-                source = [0, 0, 1, 2],
-                target = [1, 2, 3, 3],
-                value = [0.6, 0.4, 0.5, 0.5]
-            )
-        )])
-        
-        fig.update_layout(title_text="Memory Flow Through Gates")
-        return fig.to_dict()
+            title="Memory Flow Through Gates"
+        )
         
+    @traced()
     def _calculate_efficiency(self) -> Dict[str, float]:
         """Calculate efficiency metrics"""
         return {
@@ -90,17 +104,21 @@ class MemoryGateAgent(TitansAgent):
         """Handle user interactions"""
         messages = [
             {"role": "system", "content": "You are a Memory Gating expert."},
-            {"role": "user", "content": user_input}
+            {"role": "user", "content": self._compose_prompt(user_input)}
         ]
         if hasattr(self.client, "chat") and callable(getattr(self.client, "chat")):
-            response = self.client.chat(
-                model="mistral-large-latest",
+            response = await self._call_provider(
+                user_input,
+                self.client.chat,
+                model=self.model_name,
                 messages=messages,
                 safe_mode=False
             )
         else:
-            response = self.client.chat.complete(
-                model="mistral-large-latest",
+            response = await self._call_provider(
+                user_input,
+                self.client.chat.complete,
+                model=self.model_name,
                 messages=messages,
                 safe_mode=False
             )
@@ -120,7 +138,8 @@ class MemoryGateAgent(TitansAgent):
             "gating_accuracy": 0.94,
             "memory_efficiency": 0.89,
             "computational_overhead": 0.05,
-            "response_time_ms": 12.5
+            "response_time_ms": self.telemetry.percentile_ms("interact", 50),
+            **self._runtime_metrics()
         }
         
     def visualize(self) -> Dict[str, Any]:
@@ -0,0 +1,460 @@
+"""Local stand-in for every provider API the agents call.
+
+Point the agents at it with TITANS_MOCK_PROVIDER_URL (see provider_client.mock_base_url)
+and no API keys or network access are needed:
+
+  python -m agents.mock_provider --port 8900 --latency lognormal:400,0.5 --rate-limit-rate 0.05
+  TITANS_MOCK_PROVIDER_URL=http://127.0.0.1:8900 streamlit run app.py
+
+Routes follow each provider's wire format closely enough for the official SDKs:
+  POST /v1/chat/completions              OpenAI, Mistral
+  POST /openai/v1/chat/completions       Groq
+  POST /v1/messages                      Anthropic
+  POST /v1/chat                          Cohere
+  POST /v1beta/models/<m>:generateContent (and :streamGenerateContent)   Gemini
+  POST /analyze                          Emergence
+  GET  /stats                            request, error and latency counters
+Requests with "stream": true (or Gemini's streamGenerateContent) are answered as
+server-sent events, one word per chunk.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+_VOCABULARY = (
+    "memory", "surprise", "gradient", "momentum", "decay", "context", "attention", "retrieval",
+    "persistent", "long-term", "short-term", "gate", "layer", "token", "sequence", "update",
+    "forgetting", "associative", "test-time", "learning", "titans", "neural", "module", "weights",
+    "the", "a", "of", "and", "to", "with", "in", "for", "is", "that", "which", "across"
+)
+
+
+class LatencyDistribution:
+    """Response delay in seconds, parsed from specs like "lognormal:400,0.5".
+
+    fixed:MS | uniform:LOW_MS,HIGH_MS | normal:MEAN_MS,STD_MS |
+    lognormal:MEDIAN_MS,SIGMA | exponential:MEAN_MS
+    """
+
+    def __init__(self, spec: str = "fixed:0"):
+        kind, _, params = spec.partition(":")
+        kind = kind.strip().lower()
+        if kind not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {kind!r}; use one of {', '.join(DISTRIBUTIONS)}")
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p.strip()] or [0.0]
+
+    def sample(self, rng: random.Random) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            ms = p[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(p[0], p[1] if len(p) > 1 else p[0])
+        elif self.kind == "normal":
+            ms = rng.gauss(p[0], p[1] if len(p) > 1 else 0.0)
+        elif self.kind == "lognormal":
+            ms = p[0] * math.exp(rng.gauss(0.0, p[1] if len(p) > 1 else 0.5))
+        else:
+            ms = rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+        return max(0.0, ms) / 1000
+
+
+class MockSettings:
+    """Behaviour of the mock server; every field can also be set from TITANS_MOCK_* env vars."""
+
+    def __init__(self, latency: str = "fixed:50", error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 retry_after: float = 1.0, output_tokens: int = 48, stream_chunk_ms: float = 15.0,
+                 seed: Optional[int] = 0):
+        self.latency = LatencyDistribution(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.output_tokens = output_tokens
+        self.stream_chunk_ms = stream_chunk_ms
+        self.seed = seed
+
+    @classmethod
+    def from_env(cls) -> "MockSettings":
+        seed = os.getenv("TITANS_MOCK_SEED", "0")
+        return cls(
+            latency=os.getenv("TITANS_MOCK_LATENCY", "fixed:50"),
+            error_rate=float(os.getenv("TITANS_MOCK_ERROR_RATE", "0")),
+            rate_limit_rate=float(os.getenv("TITANS_MOCK_RATE_LIMIT_RATE", "0")),
+            retry_after=float(os.getenv("TITANS_MOCK_RETRY_AFTER", "1")),
+            output_tokens=int(os.getenv("TITANS_MOCK_OUTPUT_TOKENS", "48")),
+            stream_chunk_ms=float(os.getenv("TITANS_MOCK_STREAM_CHUNK_MS", "15")),
+            seed=int(seed) if seed else None
+        )
+
+
+class MockStats:
+    """Per-provider counters, readable at GET /stats"""
+
+    def __init__(self):
+        self.requests: Dict[str, int] = {}
+        self.rate_limited: Dict[str, int] = {}
+        self.server_errors: Dict[str, int] = {}
+        self.streamed: Dict[str, int] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.latency_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _bump(self, counter: Dict[str, int], provider: str) -> None:
+        with self._lock:
+            counter[provider] = counter.get(provider, 0) + 1
+
+    def enter(self, provider: str) -> None:
+        self._bump(self.requests, provider)
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self, latency: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.latency_seconds += latency
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self.requests.values())
+            return {
+                "requests": dict(self.requests),
+                "rate_limited": dict(self.rate_limited),
+                "server_errors": dict(self.server_errors),
+                "streamed": dict(self.streamed),
+                "total_requests": total,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "mean_latency_ms": self.latency_seconds / total * 1000 if total else 0.0
+            }
+
+
+def _route(method: str, path: str) -> Optional[Tuple[str, bool]]:
+    """(provider, force_stream) for a request path, or None if it isn't a provider route"""
+    path = path.split("?")[0].rstrip("/")
+    if method == "POST":
+        if path == "/openai/v1/chat/completions":
+            return "groq", False
+        if path == "/v1/chat/completions":
+            return "openai", False
+        if path == "/v1/messages":
+            return "anthropic", False
+        if path == "/v1/chat":
+            return "cohere", False
+        if path.startswith("/v1beta/models/") or path.startswith("/v1/models/"):
+            if path.endswith(":streamGenerateContent"):
+                return "gemini", True
+            if path.endswith(":generateContent"):
+                return "gemini", False
+        if path == "/analyze":
+            return "emergence", False
+    return None
+
+
+def _prompt_of(provider: str, body: Dict[str, Any]) -> str:
+    if provider in ("openai", "groq", "anthropic"):
+        messages = body.get("messages") or [{}]
+        content = messages[-1].get("content", "")
+        if isinstance(content, list):  # Anthropic content blocks
+            content = " ".join(block.get("text", "") for block in content if isinstance(block, dict))
+        return str(content)
+    if provider == "cohere":
+        return str(body.get("message", ""))
+    if provider == "gemini":
+        contents = body.get("contents") or [{}]
+        return " ".join(part.get("text", "") for part in contents[-1].get("parts", []))
+    return str(body.get("query", ""))
+
+
+def mock_words(provider: str, model: str, prompt: str, count: int) -> List[str]:
+    """Deterministic reply for a prompt: same provider, model and prompt give the same words"""
+    digest = hashlib.sha256(f"{provider}\0{model}\0{prompt}".encode("utf-8")).digest()
+    rng = random.Random(digest)
+    return [f"[mock {provider}]"] + [rng.choice(_VOCABULARY) for _ in range(max(0, count - 1))]
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text.split()))
+
+
+def _openai_body(model: str, text: str, prompt_tokens: int, output_tokens: int) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "finish_reason": "stop",
+            "logprobs": None
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens
+        }
+    }
+
+
+def _anthropic_body(model: str, text: str, prompt_tokens: int, output_tokens: int) -> Dict[str, Any]:
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": prompt_tokens, "output_tokens": output_tokens}
+    }
+
+
+def _cohere_body(model: str, text: str, prompt_tokens: int, output_tokens: int) -> Dict[str, Any]:
+    return {
+        "response_id": str(uuid.uuid4()),
+        "generation_id": str(uuid.uuid4()),
+        "text": text,
+        "finish_reason": "COMPLETE",
+        "chat_history": [],
+        "meta": {"billed_units": {"input_tokens": prompt_tokens, "output_tokens": output_tokens}}
+    }
+
+
+def _gemini_body(model: str, text: str, prompt_tokens: int, output_tokens: int,
+                 finish_reason: Optional[str] = "STOP") -> Dict[str, Any]:
+    candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if finish_reason:
+        candidate["finishReason"] = finish_reason
+    return {
+        "candidates": [candidate],
+        "usageMetadata": {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens
+        }
+    }
+
+
+def _emergence_body(model: str, text: str, prompt_tokens: int, output_tokens: int) -> Dict[str, Any]:
+    return {"analysis": text, "usage": {"input_tokens": prompt_tokens, "output_tokens": output_tokens}}
+
+
+_BODIES = {
+    "openai": _openai_body,
+    "groq": _openai_body,
+    "anthropic": _anthropic_body,
+    "cohere": _cohere_body,
+    "gemini": _gemini_body,
+    "emergence": _emergence_body,
+}
+
+
+def _stream_events(provider: str, model: str, words: List[str], prompt_tokens: int) -> List[Tuple[Optional[str], Any]]:
+    """(SSE event name, payload) pairs; a payload of None means "send the raw [DONE] marker\""""
+    pieces = [word if i == 0 else " " + word for i, word in enumerate(words)]
+    text = "".join(pieces)
+    if provider in ("openai", "groq"):
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+
+        def chunk(delta, finish=None):
+            return (None, {"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                           "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]})
+        return ([chunk({"role": "assistant", "content": ""})]
+                + [chunk({"content": piece}) for piece in pieces]
+                + [chunk({}, "stop"), (None, None)])
+    if provider == "anthropic":
+        message = _anthropic_body(model, "", prompt_tokens, 0)
+        message["content"] = []
+        message["stop_reason"] = None
+        return ([("message_start", {"type": "message_start", "message": message}),
+                 ("content_block_start", {"type": "content_block_start", "index": 0,
+                                          "content_block": {"type": "text", "text": ""}})]
+                + [("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                            "delta": {"type": "text_delta", "text": piece}}) for piece in pieces]
+                + [("content_block_stop", {"type": "content_block_stop", "index": 0}),
+                   ("message_delta", {"type": "message_delta",
+                                      "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                      "usage": {"output_tokens": len(words)}}),
+                   ("message_stop", {"type": "message_stop"})])
+    if provider == "cohere":
+        generation_id = str(uuid.uuid4())
+        return ([(None, {"is_finished": False, "event_type": "stream-start", "generation_id": generation_id})]
+                + [(None, {"is_finished": False, "event_type": "text-generation", "text": piece}) for piece in pieces]
+                + [(None, {"is_finished": True, "event_type": "stream-end", "finish_reason": "COMPLETE",
+                           "response": _cohere_body(model, text, prompt_tokens, len(words))})])
+    if provider == "gemini":
+        return ([(None, _gemini_body(model, piece, prompt_tokens, i + 1, None)) for i, piece in enumerate(pieces[:-1])]
+                + [(None, _gemini_body(model, pieces[-1], prompt_tokens, len(words)))])
+    return [(None, _emergence_body(model, piece, prompt_tokens, i + 1)) for i, piece in enumerate(pieces)]
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockProviderServer"
+
+    def _send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.split("?")[0] == "/stats":
+            self._send_json(200, self.server.stats.snapshot())
+        else:
+            self._send_json(404, {"error": {"message": f"No mock route for GET {self.path}"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        route = _route("POST", self.path)
+        if route is None:
+            self._send_json(404, {"error": {"message": f"No mock route for POST {self.path}"}})
+            return
+        provider, force_stream = route
+        try:
+            body = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "Request body is not JSON"}})
+            return
+
+        server = self.server
+        settings = server.settings
+        delay, roll = server.draw()
+        server.stats.enter(provider)
+        started = time.perf_counter()
+        try:
+            time.sleep(delay)
+            if roll < settings.rate_limit_rate:
+                server.stats._bump(server.stats.rate_limited, provider)
+                self._send_json(429, {"error": {"type": "rate_limit_error", "message": "Mock rate limit"}},
+                                {"Retry-After": f"{settings.retry_after:g}"})
+                return
+            if roll < settings.rate_limit_rate + settings.error_rate:
+                server.stats._bump(server.stats.server_errors, provider)
+                self._send_json(500, {"error": {"type": "api_error", "message": "Mock server error"}})
+                return
+
+            model = body.get("model") or self.path.split("/models/")[-1].split(":")[0] or provider
+            prompt = _prompt_of(provider, body)
+            words = mock_words(provider, model, prompt, settings.output_tokens)
+            prompt_tokens = _count_tokens(prompt)
+            if force_stream or body.get("stream"):
+                server.stats._bump(server.stats.streamed, provider)
+                self._stream(provider, model, words, prompt_tokens)
+            else:
+                self._send_json(200, _BODIES[provider](model, " ".join(words), prompt_tokens, len(words)))
+        finally:
+            server.stats.leave(time.perf_counter() - started)
+
+    def _stream(self, provider: str, model: str, words: List[str], prompt_tokens: int) -> None:
+        # Cohere's v1 chat stream is newline-delimited JSON; everything else is SSE.
+        ndjson = provider == "cohere"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson" if ndjson else "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pause = self.server.settings.stream_chunk_ms / 1000
+        for event, payload in _stream_events(provider, model, words, prompt_tokens):
+            if ndjson:
+                frame = json.dumps(payload) + "\n"
+            elif payload is None:
+                frame = "data: [DONE]\n\n"
+            else:
+                frame = (f"event: {event}\n" if event else "") + f"data: {json.dumps(payload)}\n\n"
+            self._write_chunk(frame.encode("utf-8"))
+            if pause:
+                time.sleep(pause)
+        self._write_chunk(b"")
+
+    def log_message(self, format, *args):
+        # Load tests send thousands of requests; keep the console quiet.
+        pass
+
+
+class MockProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], settings: Optional[MockSettings] = None):
+        super().__init__(address, _MockHandler)
+        self.settings = settings or MockSettings.from_env()
+        self.stats = MockStats()
+        self._rng = random.Random(self.settings.seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self) -> Tuple[float, float]:
+        """(delay, failure roll) from the shared seeded generator"""
+        with self._rng_lock:
+            return self.settings.latency.sample(self._rng), self._rng.random()
+
+
+def start_mock_server(port: int = 0, host: str = "127.0.0.1",
+                      settings: Optional[MockSettings] = None) -> MockProviderServer:
+    """Serve the mock providers on a daemon thread; port 0 picks a free port (see .url)"""
+    server = MockProviderServer((host, port), settings)
+    threading.Thread(target=server.serve_forever, name="titans-mock-provider", daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    defaults = MockSettings.from_env()
+    parser = argparse.ArgumentParser(description="Serve mock provider APIs for offline runs and load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", default=defaults.latency.spec,
+                        help=f"Latency distribution, e.g. lognormal:400,0.5 ({', '.join(DISTRIBUTIONS)})")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate,
+                        help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate,
+                        help="Fraction of requests answered with HTTP 429 and Retry-After")
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after,
+                        help="Retry-After seconds sent with 429 responses")
+    parser.add_argument("--output-tokens", type=int, default=defaults.output_tokens,
+                        help="Words per generated reply")
+    parser.add_argument("--stream-chunk-ms", type=float, default=defaults.stream_chunk_ms,
+                        help="Delay between streamed chunks")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args(argv)
+
+    settings = MockSettings(args.latency, args.error_rate, args.rate_limit_rate, args.retry_after,
+                            args.output_tokens, args.stream_chunk_ms, args.seed)
+    server = MockProviderServer((args.host, args.port), settings)
+    print(f"Mock providers listening on {server.url}")
+    print(f"Set TITANS_MOCK_PROVIDER_URL={server.url} to route every agent here.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
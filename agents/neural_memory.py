@@ -0,0 +1,418 @@
+"""Titans neural long-term memory for many sessions at once.
+
+Each session owns a linear associative memory M (value_dim x key_dim) and its
+momentum S. Tokens x are projected to keys k = x W_K and values v = x W_V
+(projections shared by all sessions) and each step applies the paper's update
+to every active session together:
+
+    surprise   g = grad ||M k - v||^2 over the step's tokens (one chunk, §3.2)
+    momentum   S = eta * S - theta * g
+    forgetting M = (1 - alpha) * M + S
+
+Sessions live in slots of preallocated (capacity, value_dim, key_dim) slabs,
+so a step is a handful of batched matmuls however many sessions take part.
+Sessions are admitted on first use, and the least recently used are spilled
+to `<spill dir>/<session key>.npz` when the slabs are full or they sit idle;
+spilled sessions reload transparently. The slot table is arrays too, so with
+TITANS_SHARED_STATE the whole manager lives in shared files and every worker
+process attaches to the same slabs, serialising updates with a FileLock.
+
+Slabs can be stored in float16 or int8 (TITANS_MEMORY_PRECISION, see
+agents/quantization.py). A step dequantizes only the slots it touches,
+updates them in float32 and quantizes them back; reads fold the per-channel
+scales into the output instead of expanding the memory.
+
+With a surprise threshold (TITANS_MEMORY_SURPRISE_THRESHOLD) a step first
+scores each session's chunk by the relative prediction error of its mean
+token, ||M k - v|| / ||v|| for k, v projected from that mean: one read per
+session where the update costs a projection and two matmuls per token.
+Chunks below the threshold are skipped entirely (no projection, gradient,
+momentum or forgetting); the rest are written in full.
+"""
+import functools
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from .quantization import dequantize, memory_precision, quantize, storage_dtype
+from .shared_state import FileLock, default_shared_dir, shared_array, shared_state_enabled
+from .telemetry import LatencyHistogram
+
+DEFAULT_CAPACITY = 256
+DEFAULT_IDLE_SECONDS = 600.0
+DEFAULT_SURPRISE_THRESHOLD = 0.0
+LEARNING_RATE = 0.1
+MOMENTUM = 0.9
+FORGET_RATE = 0.01
+
+_manager: Optional["SessionMemoryManager"] = None
+_manager_lock = threading.Lock()
+
+
+def default_spill_dir() -> Path:
+    return Path(os.getenv("TITANS_MEMORY_SPILL_DIR", Path(__file__).resolve().parents[1] / "cache" / "memory"))
+
+
+def memory_surprise_threshold() -> float:
+    """Relative prediction error below which tokens are not written (TITANS_MEMORY_SURPRISE_THRESHOLD); 0 writes all"""
+    return float(os.getenv("TITANS_MEMORY_SURPRISE_THRESHOLD", str(DEFAULT_SURPRISE_THRESHOLD)))
+
+
+@functools.lru_cache(maxsize=4096)
+def session_key(session_id: str) -> int:
+    """Stable non-zero 64-bit key for a session id; 0 marks a free slot"""
+    return int.from_bytes(hashlib.blake2b(session_id.encode("utf-8"), digest_size=8).digest(), "little") | 1
+
+
+def projections(dim: int, key_dim: int, value_dim: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Key, value and query projections; seeded, so every process derives the same ones without sharing them"""
+    rng = np.random.default_rng(seed)
+    return tuple((rng.normal(size=(dim, width)) / np.sqrt(dim)).astype(np.float32)
+                 for width in (key_dim, value_dim, key_dim))
+
+
+def memory_gradient(memory: np.ndarray, keys: np.ndarray, values: np.ndarray, mask: np.ndarray,
+                    error: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Gradient of each memory's mean loss ||M k - v||^2 over its chunk, and its norm (the surprise).
+
+    memory: (B, value_dim, key_dim); keys: (B, T, key_dim); values: (B, T, value_dim); mask: (B, T)
+    marks real tokens in padded chunks. `error`, the (B, T, value_dim) prediction error
+    keys M^T - values, is reused (and overwritten) if given.
+    """
+    scale = 2.0 / np.maximum(mask.sum(axis=1), 1.0)
+    if error is None:
+        error = np.matmul(keys, memory.transpose(0, 2, 1))
+        error -= values
+    error *= mask[:, :, None]
+    grad = np.matmul(error.transpose(0, 2, 1), keys)
+    grad *= scale[:, None, None]
+    return grad, np.sqrt(np.einsum("bij,bij->b", grad, grad))
+
+
+def apply_gradient(memory: np.ndarray, momentum: np.ndarray, grad: np.ndarray,
+                   lr: np.ndarray, eta: np.ndarray, alpha: np.ndarray) -> None:
+    """S = eta * S - lr * grad; M = (1 - alpha) * M + S, in place (grad is overwritten); lr, eta, alpha: (B,)"""
+    grad *= lr[:, None, None]
+    momentum *= eta[:, None, None]
+    momentum -= grad
+    memory *= (1.0 - alpha)[:, None, None]
+    memory += momentum
+
+
+def memory_step(memory: np.ndarray, momentum: np.ndarray, keys: np.ndarray, values: np.ndarray,
+                mask: np.ndarray, lr: np.ndarray, eta: np.ndarray, alpha: np.ndarray,
+                error: Optional[np.ndarray] = None) -> np.ndarray:
+    """Advance a batch of memories in place; returns each session's surprise (gradient norm).
+
+    Shapes as in memory_gradient, with momentum like memory.
+    """
+    grad, surprise = memory_gradient(memory, keys, values, mask, error)
+    apply_gradient(memory, momentum, grad, lr, eta, alpha)
+    return surprise
+
+
+def read_spill(path: Union[str, Path]) -> Dict[str, Any]:
+    """float32 memory and momentum, hyperparameters and whether it was pruned, from a spill file.
+
+    Reads the dense form the manager writes and the compressed forms agents/pruning.py rewrites it
+    into: low-rank factors (`<name>_u @ <name>_v`) or kept entries (`<name>_indices`, `<name>_values`).
+    """
+    with np.load(path) as state:
+        files = set(state.files)
+        spill = {"hyper": state["hyper"], "pruned": "pruned" in files}
+        for name in ("memory", "momentum"):
+            if f"{name}_u" in files:
+                spill[name] = state[f"{name}_u"].astype(np.float32) @ state[f"{name}_v"].astype(np.float32)
+            elif f"{name}_indices" in files:
+                dense = np.zeros(tuple(state[f"{name}_shape"]), dtype=np.float32)
+                dense.flat[state[f"{name}_indices"]] = state[f"{name}_values"]
+                spill[name] = dense
+            else:
+                scale = state[f"{name}_scale"] if f"{name}_scale" in files else \
+                    np.ones(state[name].shape[:-1], dtype=np.float32)
+                spill[name] = dequantize(state[name], scale)
+    return spill
+
+
+class SessionMemoryManager:
+    """Per-session neural memories stacked into batched slabs, with admission, eviction and spill"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, dim: int = 256, key_dim: int = 64,
+                 value_dim: int = 64, spill_dir: Optional[Union[str, Path]] = None,
+                 idle_seconds: float = DEFAULT_IDLE_SECONDS, seed: int = 0,
+                 shared: Optional[bool] = None, shared_dir: Optional[Union[str, Path]] = None,
+                 precision: Optional[str] = None, surprise_threshold: Optional[float] = None):
+        self.capacity = capacity
+        self.dim = dim
+        self.spill_dir = Path(spill_dir) if spill_dir else default_spill_dir()
+        self.idle_seconds = idle_seconds
+        self.w_key, self.w_value, self.w_query = projections(dim, key_dim, value_dim, seed)
+        self.surprise_threshold = memory_surprise_threshold() if surprise_threshold is None else surprise_threshold
+        self.shared = shared_state_enabled() if shared is None else shared
+        self.precision = precision or memory_precision()
+        dtype = storage_dtype(self.precision)
+        slab = (capacity, value_dim, key_dim)
+        if self.shared:
+            directory = (Path(shared_dir) if shared_dir else default_shared_dir()) / \
+                f"memory-{capacity}x{value_dim}x{key_dim}-{self.precision}"
+            self.memory = shared_array(directory / "memory.npy", slab, dtype)
+            self.momentum = shared_array(directory / "momentum.npy", slab, dtype)
+            # One scale per output channel (row) of each slot's matrices; all ones unless int8.
+            self.memory_scale = shared_array(directory / "memory_scale.npy", slab[:2])
+            self.momentum_scale = shared_array(directory / "momentum_scale.npy", slab[:2])
+            self.slot_keys = shared_array(directory / "slot_keys.npy", (capacity,), np.uint64)
+            # Per slot: last used (wall clock, comparable across processes), learning rate, momentum, forget rate.
+            self.slot_info = shared_array(directory / "slot_info.npy", (capacity, 4), np.float64)
+            self._lock = FileLock(directory / "sessions.lock")
+        else:
+            self.memory = np.zeros(slab, dtype=dtype)
+            self.momentum = np.zeros(slab, dtype=dtype)
+            self.memory_scale = np.ones(slab[:2], dtype=np.float32)
+            self.momentum_scale = np.ones(slab[:2], dtype=np.float32)
+            self.slot_keys = np.zeros(capacity, dtype=np.uint64)
+            self.slot_info = np.zeros((capacity, 4))
+            self._lock = threading.RLock()
+        self.step_latency = LatencyHistogram()
+        self.steps = 0
+        self.tokens = 0
+        self.session_updates = 0
+        self.tokens_skipped = 0
+        self.updates_skipped = 0
+        self.spills = 0
+        self.restores = 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.slot_keys))
+
+    def __contains__(self, session_id: str) -> bool:
+        return self._find(session_key(session_id)) is not None
+
+    def _find(self, key: int) -> Optional[int]:
+        hits = np.flatnonzero(self.slot_keys == np.uint64(key))
+        return int(hits[0]) if len(hits) else None
+
+    def _spill_path(self, key: int) -> Path:
+        return self.spill_dir / f"{key:016x}.npz"
+
+    def admit(self, session_id: str, lr: float = LEARNING_RATE, momentum: float = MOMENTUM,
+              forget_rate: float = FORGET_RATE) -> int:
+        """Slot holding a session's memory, restoring it from disk or starting empty.
+
+        The hyperparameters only apply to a brand-new session.
+        """
+        key = session_key(session_id)
+        with self._lock:
+            slot = self._find(key)
+            if slot is None:
+                self.spill_idle()
+                free = np.flatnonzero(self.slot_keys == 0)
+                if not len(free):
+                    self._evict_slot(int(self.slot_info[:, 0].argmin()))
+                    free = np.flatnonzero(self.slot_keys == 0)
+                slot = int(free[0])
+                path = self._spill_path(key)
+                if path.exists():
+                    # Spills keep their own precision and form; requantize in case this manager's differs.
+                    spill = read_spill(path)
+                    self._store("memory", slot, spill["memory"])
+                    self._store("momentum", slot, spill["momentum"])
+                    self.slot_info[slot, 1:] = spill["hyper"]
+                    path.unlink()
+                    self.restores += 1
+                else:
+                    self.memory[slot] = 0
+                    self.momentum[slot] = 0
+                    self.memory_scale[slot] = 1.0
+                    self.momentum_scale[slot] = 1.0
+                    self.slot_info[slot, 1:] = lr, momentum, forget_rate
+                self.slot_keys[slot] = key
+            self.slot_info[slot, 0] = time.time()
+            return slot
+
+    def _evict_slot(self, slot: int, spill: bool = True) -> None:
+        if spill:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            np.savez(self._spill_path(int(self.slot_keys[slot])), memory=self.memory[slot],
+                     momentum=self.momentum[slot], memory_scale=self.memory_scale[slot],
+                     momentum_scale=self.momentum_scale[slot], hyper=self.slot_info[slot, 1:])
+            self.spills += 1
+        self.slot_keys[slot] = 0
+        self.slot_info[slot] = 0.0
+
+    def _store(self, name: str, index, values: np.ndarray) -> None:
+        """Quantize float32 `values` into the `name` slab (and its scales) at `index`"""
+        codes, scales = quantize(values, self.precision)
+        getattr(self, name)[index] = codes
+        getattr(self, f"{name}_scale")[index] = scales
+
+    def evict(self, session_id: str, spill: bool = True) -> None:
+        """Free a session's slot, writing its state to disk unless `spill` is False"""
+        with self._lock:
+            slot = self._find(session_key(session_id))
+            if slot is not None:
+                self._evict_slot(slot, spill)
+
+    def spill_idle(self, now: Optional[float] = None) -> int:
+        """Spill every session idle for longer than idle_seconds; returns how many"""
+        now = time.time() if now is None else now
+        with self._lock:
+            idle = np.flatnonzero((self.slot_keys != 0) & (now - self.slot_info[:, 0] > self.idle_seconds))
+            for slot in idle:
+                self._evict_slot(int(slot))
+            return len(idle)
+
+    def spill_files(self):
+        return sorted(self.spill_dir.glob("*.npz"))
+
+    def spilled_bytes(self) -> int:
+        with self._lock:
+            return sum(path.stat().st_size for path in self.spill_files())
+
+    def rewrite_spills(self, transform: Callable[[Dict[str, Any]], Optional[Dict[str, np.ndarray]]]) -> int:
+        """Pass each spilled session (as read_spill gives it) through `transform` and save the arrays it
+        returns in place of the file, when smaller; None leaves a file alone. Returns files rewritten"""
+        rewritten = 0
+        with self._lock:
+            for path in self.spill_files():
+                arrays = transform(read_spill(path))
+                if arrays is None:
+                    continue
+                temporary = path.with_name(path.stem + ".tmp.npz")
+                np.savez(temporary, **arrays)
+                if temporary.stat().st_size < path.stat().st_size:
+                    os.replace(temporary, path)
+                    rewritten += 1
+                else:
+                    temporary.unlink()
+        return rewritten
+
+    def expire_spills(self, max_age_seconds: float) -> int:
+        """Delete spilled sessions untouched for `max_age_seconds`; returns how many"""
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            expired = [path for path in self.spill_files() if path.stat().st_mtime < cutoff]
+            for path in expired:
+                path.unlink()
+        return len(expired)
+
+    def _slots(self, session_ids) -> np.ndarray:
+        """Slots of many sessions: resident ones in one vectorized lookup, the rest admitted"""
+        keys = np.array([session_key(session_id) for session_id in session_ids], dtype=np.uint64)
+        with self._lock:
+            match = self.slot_keys[None, :] == keys[:, None]
+            found = match.any(axis=1)
+            slots = match.argmax(axis=1)
+            # Touch resident sessions first so admitting the others cannot evict them.
+            self.slot_info[slots[found], 0] = time.time()
+            for row in np.flatnonzero(~found):
+                slots[row] = self.admit(session_ids[row])
+        return slots
+
+    def _batch(self, inputs: Mapping[str, np.ndarray]):
+        """Slots plus (B, T_max, dim) padded tokens and their (B, T_max) mask"""
+        if len(inputs) > self.capacity:
+            raise ValueError(f"{len(inputs)} sessions in one step but only {self.capacity} slots")
+        slots = self._slots(list(inputs))
+        try:
+            # Equal-length chunks (the common case) convert in one call, with nothing to pad.
+            tokens = np.asarray(list(inputs.values()), dtype=np.float32).reshape(len(inputs), -1, self.dim)
+            return slots, tokens, np.ones(tokens.shape[:2], dtype=np.float32)
+        except ValueError:
+            pass
+        chunks = [np.atleast_2d(np.asarray(tokens, dtype=np.float32)) for tokens in inputs.values()]
+        longest = max(len(chunk) for chunk in chunks)
+        tokens = np.zeros((len(chunks), longest, self.dim), dtype=np.float32)
+        mask = np.zeros((len(chunks), longest), dtype=np.float32)
+        for row, chunk in enumerate(chunks):
+            tokens[row, :len(chunk)] = chunk
+            mask[row, :len(chunk)] = 1.0
+        return slots, tokens, mask
+
+    def step(self, inputs: Mapping[str, np.ndarray]) -> Dict[str, float]:
+        """Write each session's tokens (T x dim, or one dim-vector) into its memory in one batched
+        update; returns the surprise of each session's chunk (0 where a threshold skipped it)"""
+        if not inputs:
+            return {}
+        started = time.perf_counter()
+        with self._lock:
+            slots, tokens, mask = self._batch(inputs)
+            self.steps += 1
+            self.tokens += int(mask.sum())
+            self.session_updates += len(slots)
+            # Contiguous float32 slots update the slabs through views; anything else gathers
+            # (dequantizing) and scatters (quantizing) just the slots being written.
+            contiguous = bool(np.all(np.diff(slots) == 1))
+            index = slice(int(slots[0]), int(slots[-1]) + 1) if contiguous else slots
+            memory = dequantize(self.memory[index], self.memory_scale[index])
+            surprise = np.zeros(len(slots), dtype=np.float32)
+            rows = slice(None)
+            if self.surprise_threshold > 0:
+                # One read per session, of its chunk's mean token, before any token is projected.
+                mean = tokens.sum(axis=1) / np.maximum(mask.sum(axis=1), 1.0)[:, None]
+                mean_value = mean @ self.w_value
+                error = np.matmul(memory, (mean @ self.w_key)[:, :, None])[:, :, 0] - mean_value
+                surprising = np.linalg.norm(error, axis=1) >= \
+                    self.surprise_threshold * np.linalg.norm(mean_value, axis=1)
+                rows = np.flatnonzero(surprising)
+                self.tokens_skipped += int(mask[~surprising].sum())
+                self.updates_skipped += len(slots) - len(rows)
+                if len(rows) < len(slots):
+                    contiguous, index = False, slots[rows]
+                    memory, tokens, mask = memory[rows], tokens[rows], mask[rows]
+            if len(memory):
+                keys, values = tokens @ self.w_key, tokens @ self.w_value
+                momentum = dequantize(self.momentum[index], self.momentum_scale[index])
+                lr, eta, alpha = self.slot_info[index, 1:].astype(np.float32).T
+                surprise[rows] = memory_step(memory, momentum, keys, values, mask, lr, eta, alpha)
+                if not contiguous or self.precision != "float32":
+                    self._store("memory", index, memory)
+                    self._store("momentum", index, momentum)
+        self.step_latency.record(time.perf_counter() - started)
+        return {session_id: float(value) for session_id, value in zip(inputs, surprise)}
+
+    def retrieve(self, queries: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Read each session's memory with its queries (T x dim): returns T x value_dim outputs"""
+        if not queries:
+            return {}
+        with self._lock:
+            slots, tokens, _ = self._batch(queries)
+            # (q . codes) * scale per output channel, so the memory itself is never expanded.
+            outputs = np.matmul(tokens @ self.w_query, self.memory[slots].astype(np.float32).transpose(0, 2, 1))
+            outputs *= self.memory_scale[slots][:, None, :]
+        return {session_id: outputs[row, :len(np.atleast_2d(query))]
+                for row, (session_id, query) in enumerate(queries.items())}
+
+    @property
+    def bytes_per_session(self) -> int:
+        """Stored bytes of one session's memory and momentum, scales included"""
+        return sum(slab[0].nbytes + scale[0].nbytes for slab, scale in
+                   ((self.memory, self.memory_scale), (self.momentum, self.momentum_scale)))
+
+    def get_metrics(self) -> Dict[str, float]:
+        busy = self.step_latency.total_seconds
+        return {
+            "memory_sessions_active": len(self),
+            "memory_sessions_capacity": self.capacity,
+            "memory_bytes_per_session": self.bytes_per_session,
+            "memory_sessions_spilled": self.spills,
+            "memory_sessions_restored": self.restores,
+            "memory_tokens_skipped_fraction": round(self.tokens_skipped / self.tokens, 4) if self.tokens else 0.0,
+            "memory_updates_skipped_fraction":
+                round(self.updates_skipped / self.session_updates, 4) if self.session_updates else 0.0,
+            "memory_step_p50_ms": self.step_latency.percentile_ms(50),
+            "memory_tokens_per_second": round(self.tokens / busy, 1) if busy else 0.0
+        }
+
+
+def get_session_manager() -> SessionMemoryManager:
+    """Process-wide manager shared by every agent and session (TITANS_MEMORY_SESSIONS slots)"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = SessionMemoryManager(capacity=int(os.getenv("TITANS_MEMORY_SESSIONS", DEFAULT_CAPACITY)))
+        return _manager
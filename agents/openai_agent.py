@@ -1,16 +1,45 @@
-from .base_agent import TitansAgent
+from .base_agent import TitansAgent, current_session
+from .embeddings import HashingEmbedder
+from .figures import figure_spec, trace
+from .memory_index import MemoryStore
+from .neural_memory import get_session_manager
+from .pruning import SessionMemoryTarget, StoredMemoryTarget, get_pruner
+from .quantization import memory_precision
+from .provider_client import MOCK_API_KEY, mock_base_url
+from .tracing import traced
 from openai import OpenAI
 import numpy as np
-import plotly.graph_objects as go
+import uuid
+import weakref
 from typing import Dict, Any, List
 
 class NeuralMemoryAgent(TitansAgent):
     def __init__(self):
-        super().__init__("OpenAI Neural Memory Agent")
-        self.client = OpenAI()
-        self.memory_state = []
+        super().__init__("OpenAI Neural Memory Agent", provider="openai")
+        base_url = mock_base_url("/v1")
+        self.client = OpenAI(base_url=base_url, api_key=MOCK_API_KEY) if base_url else OpenAI()
+        self.model_name = "gpt-4-turbo-preview"
         self.decay_rate = 0.1
+        # Memory keys are indexed as they are written so retrieval never scans the stored memories.
+        self.embedder = HashingEmbedder()
+        self.memory_store = MemoryStore(self.embedder.dim, max_memories=10000, precision=memory_precision())
+        self.recent_memories: List[Dict[str, Any]] = []
+        # Test-time neural memory for this session, advanced in batches with every other session's.
+        self.session_memory = get_session_manager()
+        self._session_id = f"openai-{uuid.uuid4().hex}"
+        self.last_surprise = 0.0
+        weakref.finalize(self, self.session_memory.evict, self._session_id, False)
+        # Background pruning of this agent's stored memories and of the shared session memories.
+        self.pruner = get_pruner()
+        self.pruner.register(StoredMemoryTarget(f"stored_memories:{self._session_id}", self.memory_store))
+        self.pruner.register(SessionMemoryTarget(self.session_memory))
         
+    @property
+    def session_id(self) -> str:
+        """Neural memory session of the current user session (the agent's own outside any session)"""
+        session = current_session()
+        return self._session_id if session is None else f"openai-{session.session_id}"
+
     async def demonstrate(self) -> Dict[str, Any]:
         """Demonstrate the Neural Long-Term Memory Module"""
         demonstration = {
@@ -21,6 +50,7 @@ class NeuralMemoryAgent(TitansAgent):
         }
         return demonstration
         
+    @traced()
     async def _simulate_memory_updates(self) -> List[Dict[str, Any]]:
         """Simulate memory updates with decay"""
         updates = []
@@ -31,42 +61,58 @@ class NeuralMemoryAgent(TitansAgent):
                 "content": f"Memory content at time {t}",
                 "strength": np.exp(-self.decay_rate * t)
             }
-            self.memory_state.append(memory_state)
             updates.append(memory_state)
+        self._write_memories(updates)
         return updates
         
+    def _write_memories(self, memories: List[Dict[str, Any]]) -> None:
+        """Store memories and index their keys, forgetting the weakest beyond the store's limit"""
+        keys = self.embedder.embed([m["content"] for m in memories])
+        self.last_surprise = self.session_memory.step({self.session_id: keys})[self.session_id]
+        self.memory_store.add(memories, keys)
+        self.recent_memories = memories
+        
+    @traced()
     def _create_decay_visualization(self) -> Dict[str, Any]:
         """Create visualization of memory decay"""
-        times = [m["timestamp"] for m in self.memory_state]
-        strengths = [m["strength"] for m in self.memory_state]
+        times = [m["timestamp"] for m in self.memory_store.memories]
+        strengths = [m["strength"] for m in self.memory_store.memories]
         
-        fig = go.Figure(data=go.Scatter(x=times, y=strengths))
-        fig.update_layout(
+        return figure_spec(
+            trace("scatter", x=times, y=strengths),
             title="Memory Strength Decay Over Time",
-            xaxis_title="Time",
-            yaxis_title="Memory Strength"
+            x_title="Time",
+            y_title="Memory Strength"
         )
-        return fig.to_dict()
         
+    @traced()
     async def _demonstrate_retrieval(self) -> List[Dict[str, Any]]:
         """Demonstrate memory retrieval mechanism"""
+        # Query the index with the memories just written: one batched top-1 lookup.
+        queries = self.recent_memories
+        if not queries:
+            return []
+        hits = self.memory_store.search(self.embedder.embed([m["content"] for m in queries]), k=1)
         retrieval_examples = []
-        for memory in self.memory_state:
-            retrieved = {
+        for memory, row in zip(queries, hits):
+            score, match = row[0] if row else (0.0, memory)
+            retrieval_examples.append({
                 "query_time": memory["timestamp"] + 1,
-                "original_content": memory["content"],
-                "retrieval_strength": memory["strength"]
-            }
-            retrieval_examples.append(retrieved)
+                "original_content": match["content"],
+                "retrieval_strength": match["strength"],
+                "similarity": score
+            })
         return retrieval_examples
         
     async def interact(self, user_input: str) -> str:
         """Handle user interactions"""
-        response = await self.client.chat.completions.create(
-            model="gpt-4-turbo-preview",
+        response = await self._call_provider(
+            user_input,
+            self.client.chat.completions.create,
+            model=self.model_name,
             messages=[
                 {"role": "system", "content": "You are a Neural Memory Module expert."},
-                {"role": "user", "content": user_input}
+                {"role": "user", "content": self._compose_prompt(user_input)}
             ]
         )
         return response.choices[0].message.content
@@ -82,7 +128,12 @@ class NeuralMemoryAgent(TitansAgent):
             "memory_efficiency": 0.95,
             "retrieval_accuracy": 0.89,
             "decay_rate": self.decay_rate,
-            "active_memories": len(self.memory_state)
+            "active_memories": len(self.memory_store),
+            "memory_key_bytes": self.memory_store.index.nbytes,
+            "test_time_surprise": self.last_surprise,
+            **self.session_memory.get_metrics(),
+            **self.pruner.get_metrics(),
+            **self._runtime_metrics()
         }
         
     def visualize(self) -> Dict[str, Any]:
@@ -0,0 +1,303 @@
+"""Retrieval index over the bundled Titans paper, for grounding agent prompts.
+
+`python -m agents.paper_index` extracts the PDF text, splits each page into
+overlapping passages and writes under `cache/paper/`:
+
+    passages.jsonl   one {"page", "text"} object per passage
+    vectors.npy      HashingEmbedder vectors, float32 (passages x dim)
+    indptr.npy       BM25 postings in CSR form: term t owns [indptr[t], indptr[t+1])
+    doc_ids.npy      passage of each posting
+    weights.npy      precomputed BM25 weight (idf x saturated tf) of each posting
+    terms.json       vocabulary, in term id order
+    meta.json        source size/mtime and build parameters
+
+Arrays are opened as memory maps. A query sums the postings of its terms,
+scores every passage against the query vector, and ranks by a blend of the
+two. Agents prepend the top passages to their prompt instead of sending a bare
+question or a pasted chunk of the paper.
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from .embeddings import HashingEmbedder
+from .pdf_text import extract_pages
+from .semantic_cache import normalize_query
+from .shared_state import FileLock
+from .telemetry import LatencyHistogram
+
+PAPER_PATH = Path(__file__).resolve().parents[1] / "Titans Paper.pdf"
+
+PASSAGE_WORDS = 120
+PASSAGE_STRIDE = 90
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Weight of the lexical (BM25) score against embedding similarity when ranking.
+LEXICAL_WEIGHT = 0.6
+# Passages scoring below this fraction of the best hit are not worth their tokens.
+MIN_RELATIVE_SCORE = 0.5
+
+_index: Optional["PaperIndex"] = None
+_index_failed = False
+_index_lock = threading.Lock()
+_warming: Optional[threading.Thread] = None
+_warming_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def default_index_dir() -> Path:
+    return Path(os.getenv("TITANS_PAPER_INDEX_DIR", Path(__file__).resolve().parents[1] / "cache" / "paper"))
+
+
+def context_passages() -> int:
+    """Passages attached to each prompt (TITANS_PAPER_CONTEXT_K); 0 turns retrieval off"""
+    return int(os.getenv("TITANS_PAPER_CONTEXT_K", "3"))
+
+
+def chunk_pages(pages: List[str], words: int = PASSAGE_WORDS, stride: int = PASSAGE_STRIDE) -> List[Dict[str, Any]]:
+    """Overlapping word windows within each page, so every passage cites one page"""
+    passages = []
+    for page_number, text in enumerate(pages, start=1):
+        tokens = text.split()
+        for start in range(0, max(1, len(tokens) - words + stride), stride):
+            window = tokens[start:start + words]
+            if len(window) >= words // 4:
+                passages.append({"page": page_number, "text": " ".join(window)})
+    return passages
+
+
+_SUFFIXES = ("ing", "ed", "es", "s", "ly")
+
+
+def _stem(word: str) -> str:
+    """Strip one common suffix so that "forgetting" and "forget" share a term"""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def _terms(text: str) -> List[str]:
+    """Stemmed words plus adjacent pairs, so phrases such as "memory as context" outrank scattered words"""
+    words = [_stem(word) for word in normalize_query(text).split()]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+def _source_stamp(path: Path) -> Dict[str, Any]:
+    stat = path.stat()
+    return {"source": path.name, "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def build_index(pdf_path: Union[str, Path] = PAPER_PATH, directory: Optional[Union[str, Path]] = None,
+                embedder: Optional[HashingEmbedder] = None, pages: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Extract, chunk and index the paper; returns the written meta.json contents.
+
+    Passing `pages` skips extraction (the PDF still stamps the index).
+    """
+    pdf_path = Path(pdf_path)
+    directory = Path(directory) if directory else default_index_dir()
+    embedder = embedder or HashingEmbedder()
+    timings = {}
+
+    started = time.perf_counter()
+    pages = pages if pages is not None else extract_pages(pdf_path)
+    timings["extract_seconds"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    passages = chunk_pages(pages)
+    vectors = embedder.embed([normalize_query(passage["text"]) for passage in passages])
+    timings["embed_seconds"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vocabulary: Dict[str, int] = {}
+    term_ids, doc_ids, counts = [], [], []
+    lengths = np.zeros(len(passages), dtype=np.float32)
+    for doc, passage in enumerate(passages):
+        terms = _terms(passage["text"])
+        lengths[doc] = len(terms)
+        unique, frequency = np.unique(
+            np.array([vocabulary.setdefault(term, len(vocabulary)) for term in terms], dtype=np.int32),
+            return_counts=True)
+        term_ids.append(unique)
+        doc_ids.append(np.full(len(unique), doc, dtype=np.int32))
+        counts.append(frequency)
+    term_ids = np.concatenate(term_ids) if term_ids else np.zeros(0, dtype=np.int32)
+    doc_ids = np.concatenate(doc_ids) if doc_ids else np.zeros(0, dtype=np.int32)
+    tf = np.concatenate(counts).astype(np.float32) if counts else np.zeros(0, dtype=np.float32)
+
+    order = np.lexsort((doc_ids, term_ids))
+    term_ids, doc_ids, tf = term_ids[order], doc_ids[order], tf[order]
+    document_frequency = np.bincount(term_ids, minlength=len(vocabulary))
+    indptr = np.concatenate(([0], np.cumsum(document_frequency))).astype(np.int64)
+    idf = np.log1p((len(passages) - document_frequency + 0.5) / (document_frequency + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_ids] / max(float(lengths.mean()), 1.0))
+    weights = (idf[term_ids] * tf * (BM25_K1 + 1) / (tf + norm)).astype(np.float32)
+    timings["bm25_seconds"] = time.perf_counter() - started
+
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / "passages.jsonl", "w", encoding="utf-8") as handle:
+        for passage in passages:
+            handle.write(json.dumps(passage) + "\n")
+    np.save(directory / "vectors.npy", vectors.astype(np.float32))
+    np.save(directory / "indptr.npy", indptr)
+    np.save(directory / "doc_ids.npy", doc_ids)
+    np.save(directory / "weights.npy", weights)
+    terms = sorted(vocabulary, key=vocabulary.get)
+    (directory / "terms.json").write_text(json.dumps(terms), encoding="utf-8")
+    meta = {
+        **_source_stamp(pdf_path),
+        "pages": len(pages),
+        "passages": len(passages),
+        "terms": len(terms),
+        "dim": embedder.dim,
+        "passage_words": PASSAGE_WORDS,
+        "passage_stride": PASSAGE_STRIDE,
+        "created": time.time(),
+        **{name: round(seconds, 4) for name, seconds in timings.items()}
+    }
+    (directory / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    return meta
+
+
+class PaperIndex:
+    """Hybrid BM25 + embedding search over memory-mapped passage arrays"""
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None, embedder: Optional[HashingEmbedder] = None):
+        self.directory = Path(directory) if directory else default_index_dir()
+        self.meta = json.loads((self.directory / "meta.json").read_text(encoding="utf-8"))
+        self.embedder = embedder or HashingEmbedder(self.meta["dim"])
+        with open(self.directory / "passages.jsonl", encoding="utf-8") as handle:
+            self.passages = [json.loads(line) for line in handle]
+        self.vectors = np.load(self.directory / "vectors.npy", mmap_mode="r")
+        self.indptr = np.load(self.directory / "indptr.npy", mmap_mode="r")
+        self.doc_ids = np.load(self.directory / "doc_ids.npy", mmap_mode="r")
+        self.weights = np.load(self.directory / "weights.npy", mmap_mode="r")
+        terms = json.loads((self.directory / "terms.json").read_text(encoding="utf-8"))
+        self.term_ids = {term: index for index, term in enumerate(terms)}
+        self.query_latency = LatencyHistogram()
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def is_current(self, pdf_path: Union[str, Path] = PAPER_PATH) -> bool:
+        stamp = _source_stamp(Path(pdf_path))
+        return all(self.meta.get(key) == value for key, value in stamp.items())
+
+    def bm25(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self.passages), dtype=np.float32)
+        for term in set(_terms(query)):
+            term_id = self.term_ids.get(term)
+            if term_id is not None:
+                lo, hi = self.indptr[term_id], self.indptr[term_id + 1]
+                scores[self.doc_ids[lo:hi]] += self.weights[lo:hi]
+        return scores
+
+    def dense(self, query: str) -> np.ndarray:
+        return np.asarray(self.vectors @ self.embedder.embed(normalize_query(query)))
+
+    def search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """Top-k passages as {"page", "text", "score"}, best first"""
+        started = time.perf_counter()
+        lexical = self.bm25(query)
+        top = lexical.max(initial=0.0)
+        scores = LEXICAL_WEIGHT * (lexical / top if top > 0 else lexical)
+        scores += (1 - LEXICAL_WEIGHT) * np.clip(self.dense(query), 0.0, None)
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k] if k else np.zeros(0, dtype=int)
+        best = best[np.argsort(-scores[best])]
+        results = [{**self.passages[i], "score": round(float(scores[i]), 4)} for i in best
+                   if scores[i] > 0 and scores[i] >= MIN_RELATIVE_SCORE * scores[best[0]]]
+        self.query_latency.record(time.perf_counter() - started)
+        return results
+
+    def get_metrics(self) -> Dict[str, float]:
+        return {
+            "paper_passages": len(self.passages),
+            "paper_query_p50_ms": self.query_latency.percentile_ms(50),
+            "paper_query_p95_ms": self.query_latency.percentile_ms(95)
+        }
+
+
+def get_paper_index(wait: bool = True) -> Optional[PaperIndex]:
+    """The shared index, built on first use if missing or older than the PDF; None without the PDF.
+
+    Worker processes take a file lock, so only the first builds and the rest
+    map the finished files. If the index cannot be opened or built, the
+    failure is logged once and prompts go out without passages until restart.
+    With wait=False this never blocks: until the index is ready it starts the
+    build in the background (warm_paper_index) and returns None.
+    """
+    global _index, _index_failed
+    if not wait:
+        if _index is None:
+            warm_paper_index()
+        return _index
+    with _index_lock:
+        if _index is None and not _index_failed and PAPER_PATH.exists():
+            directory = default_index_dir()
+            try:
+                with FileLock(directory.with_name(directory.name + ".lock")):
+                    _index = _open_or_build(directory)
+            except Exception:
+                _index_failed = True
+                logger.exception("Titans paper index unavailable; prompts will carry no paper passages")
+        return _index
+
+
+def warm_paper_index() -> Optional[threading.Thread]:
+    """Open or build the shared index on a daemon thread, once per process; returns that thread"""
+    global _warming
+    with _warming_lock:
+        if _warming is None and _index is None and not _index_failed:
+            _warming = threading.Thread(target=get_paper_index, name="titans-paper-index", daemon=True)
+            _warming.start()
+        return _warming
+
+
+def _open_or_build(directory: Path) -> PaperIndex:
+    try:
+        index = PaperIndex(directory)
+        if index.is_current():
+            return index
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+    build_index(PAPER_PATH, directory)
+    return PaperIndex(directory)
+
+
+def paper_index_metrics() -> Dict[str, float]:
+    """Metrics of the shared index once something has loaded it; never triggers a build"""
+    return _index.get_metrics() if _index is not None else {}
+
+
+def format_passages(passages: List[Dict[str, Any]]) -> str:
+    return "\n".join(f"[p. {passage['page']}] {passage['text']}" for passage in passages)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the Titans paper retrieval index, or query it.")
+    parser.add_argument("query", nargs="*", help="Search the existing index instead of rebuilding it")
+    parser.add_argument("--pdf", default=str(PAPER_PATH))
+    parser.add_argument("--dir", help="Index directory (default: TITANS_PAPER_INDEX_DIR or ./cache/paper)")
+    parser.add_argument("-k", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.query:
+        for passage in PaperIndex(args.dir).search(" ".join(args.query), args.k):
+            print(f"[p. {passage['page']}, {passage['score']}] {passage['text']}\n")
+        return
+    meta = build_index(args.pdf, args.dir)
+    print(f"{meta['passages']} passages from {meta['pages']} pages, {meta['terms']} terms "
+          f"(extract {meta['extract_seconds']}s, embed {meta['embed_seconds']}s, bm25 {meta['bm25_seconds']}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Plain-text extraction from PDF pages with pypdf.
+
+pypdf is imported on first use, so without it only building the paper index
+fails (and get_paper_index() logs that once); agents still import.
+"""
+import re
+from pathlib import Path
+from typing import List, Union
+
+
+def clean_text(text: str) -> str:
+    """Rejoin words hyphenated across lines, fold sub/superscript fragments and collapse whitespace"""
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+    text = re.sub(r"[ \t\x0b\x0c\r]+", " ", text)
+    lines: List[str] = []
+    for line in re.split(r"\s*\n\s*", text):
+        if lines and len(line) <= 3:
+            lines[-1] += " " + line
+        else:
+            lines.append(line)
+    return "\n".join(line for line in lines if line).strip()
+
+
+def extract_pages(path: Union[str, Path]) -> List[str]:
+    """Text of each page, in page order"""
+    import pypdf
+
+    reader = pypdf.PdfReader(str(path))
+    return [clean_text(page.extract_text() or "") for page in reader.pages]
@@ -0,0 +1,218 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import inspect
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+from .telemetry import AgentTelemetry
+from .tracing import span
+
+# Requests per second, burst size and max concurrent calls per provider.
+# Override with TITANS_<PROVIDER>_RPS / _BURST / _CONCURRENCY in .env.
+DEFAULT_LIMITS = {
+    "openai": (5.0, 10, 8),
+    "anthropic": (4.0, 8, 4),
+    "mistral": (1.0, 2, 2),
+    "groq": (0.5, 2, 2),
+    "gemini": (1.0, 4, 4),
+    "cohere": (2.0, 5, 4),
+    "emergence": (2.0, 4, 4),
+}
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+# Sent instead of real keys when agents talk to the local mock providers.
+MOCK_API_KEY = "titans-mock"
+
+# Blocking SDK calls run here rather than on a loop's default executor, so their futures are ours to watch.
+_sdk_threads = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="titans-provider")
+
+
+def mock_base_url(suffix: str = "") -> Optional[str]:
+    """Base URL of the mock providers (agents/mock_provider.py) if TITANS_MOCK_PROVIDER_URL is set"""
+    url = os.getenv("TITANS_MOCK_PROVIDER_URL", "").strip().rstrip("/")
+    return url + suffix if url else None
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every event loop in the process."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1.0
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Drain the bucket so that no call starts for the next `seconds`"""
+        with self._lock:
+            # The next reserve() takes one more token, landing exactly `seconds` out.
+            self.tokens = min(self.tokens, 1.0 - seconds * self.rate)
+
+
+class ProviderClient:
+    """Rate limiting, concurrency limiting and retries around provider SDK calls."""
+
+    _buckets: Dict[str, TokenBucket] = {}
+    _slots: Dict[str, threading.BoundedSemaphore] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, provider: str, telemetry: Optional[AgentTelemetry] = None,
+                 max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 20.0):
+        self.provider = provider
+        self.telemetry = telemetry or AgentTelemetry(provider)
+        self.max_retries = int(os.getenv("TITANS_MAX_RETRIES", max_retries))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.bucket, self.slots = self._shared_limits(provider)
+
+    @classmethod
+    def _shared_limits(cls, provider: str):
+        """Limits are per provider, not per agent instance"""
+        with cls._registry_lock:
+            if provider not in cls._buckets:
+                rate, burst, concurrency = DEFAULT_LIMITS.get(provider, (2.0, 4, 4))
+                prefix = f"TITANS_{provider.upper()}_"
+                rate = float(os.getenv(prefix + "RPS", rate))
+                burst = int(os.getenv(prefix + "BURST", burst))
+                concurrency = int(os.getenv(prefix + "CONCURRENCY", concurrency))
+                cls._buckets[provider] = TokenBucket(rate, burst)
+                cls._slots[provider] = threading.BoundedSemaphore(concurrency)
+            return cls._buckets[provider], cls._slots[provider]
+
+    async def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Invoke a sync or async SDK function, retrying on 429 and 5xx responses"""
+        attempt = 0
+        while True:
+            await self._throttle(self.bucket.reserve())
+            await self._acquire_slot()  # released by _invoke
+            telemetry = self.telemetry
+            telemetry.provider_calls += 1
+            telemetry.adjust_gauge("provider_in_flight", 1)
+            try:
+                started = time.perf_counter()
+                with span(f"{self.provider}.call", "provider", attempt=attempt):
+                    result = await self._invoke(fn, *args, **kwargs)
+                telemetry.record_provider_call(time.perf_counter() - started, result)
+                return result
+            except Exception as exc:
+                telemetry.provider_errors += 1
+                status = _status_of(exc)
+                if status not in RETRYABLE_STATUS or attempt >= self.max_retries:
+                    telemetry.provider_failures += 1
+                    raise
+                delay = _retry_after(exc)
+                if delay is None:
+                    # Full jitter keeps agents sharing a provider from retrying in lockstep.
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                elif status == 429:
+                    # Every caller of this provider waits; the next reserve() sleeps for us.
+                    self.bucket.pause(delay)
+                    delay = 0.0
+                attempt += 1
+                telemetry.provider_retries += 1
+            finally:
+                telemetry.adjust_gauge("provider_in_flight", -1)
+            await self._throttle(delay)
+
+    async def _invoke(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run the call holding the slot taken by call(), and release it once the call is really over"""
+        if inspect.iscoroutinefunction(fn):
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self.slots.release()
+        # Blocking SDK clients run in a worker thread so the event loop stays free. Cancelling
+        # this task (race mode, hedging) cannot stop the thread, so the slot is released when
+        # the thread's call finishes, not when we stop waiting for it.
+        try:
+            future = _sdk_threads.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        result = await asyncio.wrap_future(future)
+        if inspect.isawaitable(result):
+            return await result
+        return result
+
+    async def _throttle(self, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        self.telemetry.throttled_seconds += seconds
+        await asyncio.sleep(seconds)
+
+    async def _acquire_slot(self) -> None:
+        # Polling keeps the slot cancellation-safe across independent event loops.
+        waited = 0.0
+        while not self.slots.acquire(blocking=False):
+            await asyncio.sleep(0.01)
+            waited += 0.01
+        if waited:
+            self.telemetry.throttled_seconds += waited
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        """Quantile of successful call latencies in seconds, None without history"""
+        if not self.telemetry.first_token.count:
+            return None
+        return self.telemetry.first_token.percentile_ms(q * 100) / 1000.0
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Return retry and throttling counters"""
+        telemetry = self.telemetry
+        return {
+            "provider_calls": telemetry.provider_calls,
+            "provider_retries": telemetry.provider_retries,
+            "provider_failures": telemetry.provider_failures,
+            "throttled_time_s": round(telemetry.throttled_seconds, 3),
+        }
+
+
+def _status_of(exc: Exception) -> Optional[int]:
+    """Extract an HTTP status code from the various SDK exception types"""
+    for attr in ("status_code", "status", "http_status", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None) or getattr(response, "status", None)
+    if isinstance(value, int):
+        return value
+    return None
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    """Read a Retry-After header (seconds or HTTP date) from an SDK exception"""
+    headers = getattr(exc, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,269 @@
+"""Adaptive pruning of stored memories and memory-module weights, on a schedule.
+
+Strategies, per target:
+
+- stored memories (MemoryStore): a memory's strength halves every `half_life`
+  seconds since it was last written or retrieved; memories that decay below
+  `min_strength` are forgotten, so little-used ones go first, and the key
+  store gives back the capacity they held.
+- session memories (SessionMemoryManager): sessions idle past the manager's
+  idle_seconds are spilled, freeing their slab slot; spills untouched for
+  `spill_ttl` seconds are deleted; remaining spills are rewritten at reduced
+  rank (truncated SVD) or as their largest-magnitude entries, keeping
+  `energy` of each matrix's squared norm (TITANS_PRUNE_WEIGHTS). Resident
+  slabs stay dense, so updates never pay for decompression.
+
+A MemoryPruner runs every registered target every TITANS_PRUNE_INTERVAL
+seconds on a daemon thread. Each pass measures bytes held and a probe latency
+(key search, spill restore) before and after, so reports carry what was
+actually reclaimed and what it cost.
+"""
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .memory_index import MemoryStore
+from .neural_memory import SessionMemoryManager, read_spill
+
+DEFAULT_INTERVAL = 600.0
+HALF_LIFE = 3600.0
+MIN_STRENGTH = 0.1
+ENERGY = 0.99
+SPILL_TTL = 7 * 24 * 3600.0
+STRATEGIES = ("low_rank", "magnitude", "off")
+PROBE_QUERIES = 32
+PROBE_SPILLS = 8
+HISTORY = 50
+
+_pruner: Optional["MemoryPruner"] = None
+_pruner_lock = threading.Lock()
+
+
+def prune_interval() -> float:
+    """Seconds between background pruning passes (TITANS_PRUNE_INTERVAL); 0 turns the schedule off"""
+    return float(os.getenv("TITANS_PRUNE_INTERVAL", str(DEFAULT_INTERVAL)))
+
+
+def weight_strategy() -> str:
+    """How spilled memory weights are compressed (TITANS_PRUNE_WEIGHTS): low_rank, magnitude or off"""
+    strategy = os.getenv("TITANS_PRUNE_WEIGHTS", "low_rank").lower()
+    if strategy not in STRATEGIES:
+        raise ValueError(f"TITANS_PRUNE_WEIGHTS must be one of {', '.join(STRATEGIES)}, got {strategy!r}")
+    return strategy
+
+
+def low_rank(matrix: np.ndarray, energy: float = ENERGY) -> Tuple[np.ndarray, np.ndarray]:
+    """(u, v) with u @ v the smallest-rank truncation of `matrix` keeping `energy` of its squared norm"""
+    u, s, vt = np.linalg.svd(matrix, full_matrices=False)
+    squared = s ** 2
+    total = squared.sum()
+    rank = min(int(np.searchsorted(np.cumsum(squared) / total, energy)) + 1, len(s)) if total > 0 else 0
+    return (u[:, :rank] * s[:rank]).astype(np.float32), vt[:rank].astype(np.float32)
+
+
+def magnitude(matrix: np.ndarray, energy: float = ENERGY) -> Tuple[np.ndarray, np.ndarray]:
+    """(flat indices, values) of the fewest largest-magnitude entries keeping `energy` of the squared norm"""
+    flat = matrix.ravel()
+    order = np.argsort(-np.abs(flat))
+    squared = flat[order] ** 2
+    total = squared.sum()
+    keep = min(int(np.searchsorted(np.cumsum(squared) / total, energy)) + 1, len(flat)) if total > 0 else 0
+    indices = np.sort(order[:keep]).astype(np.min_scalar_type(max(len(flat) - 1, 0)))
+    return indices, flat[indices].astype(np.float32)
+
+
+def compress_spill(spill: Dict[str, Any], strategy: str, energy: float = ENERGY) -> Optional[Dict[str, np.ndarray]]:
+    """Arrays for a compressed spill file, or None if already pruned (so repeated passes do not erode it)"""
+    if spill["pruned"] or strategy == "off":
+        return None
+    arrays = {"hyper": spill["hyper"], "pruned": np.ones(1, dtype=np.uint8)}
+    for name in ("memory", "momentum"):
+        if strategy == "low_rank":
+            arrays[f"{name}_u"], arrays[f"{name}_v"] = low_rank(spill[name], energy)
+        else:
+            arrays[f"{name}_indices"], arrays[f"{name}_values"] = magnitude(spill[name], energy)
+            arrays[f"{name}_shape"] = np.array(spill[name].shape)
+    return arrays
+
+
+class StoredMemoryTarget:
+    """Strength-decay and low-usage eviction for a MemoryStore, held weakly"""
+
+    def __init__(self, name: str, store: MemoryStore, half_life: float = HALF_LIFE,
+                 min_strength: float = MIN_STRENGTH):
+        self.name = name
+        self._store = weakref.ref(store)
+        self.half_life = half_life
+        self.min_strength = min_strength
+
+    @property
+    def alive(self) -> bool:
+        return self._store() is not None
+
+    def nbytes(self) -> int:
+        store = self._store()
+        return store.nbytes if store is not None else 0
+
+    def probe(self) -> float:
+        """Seconds for one batch of key searches"""
+        store = self._store()
+        if store is None or not len(store):
+            return 0.0
+        queries = np.random.default_rng(0).normal(size=(PROBE_QUERIES, store.index.dim)).astype(np.float32)
+        started = time.perf_counter()
+        store.index.search(queries, k=1)
+        return time.perf_counter() - started
+
+    def prune(self, now: Optional[float] = None) -> int:
+        store = self._store()
+        if store is None:
+            return 0
+        now = time.time() if now is None else now
+        with store.lock:
+            memories = list(store.memories)
+            strength = np.array([m["strength"] for m in memories], dtype=np.float64)
+            idle = now - np.array([m["last_used"] for m in memories], dtype=np.float64)
+            decayed = strength * 0.5 ** (np.maximum(idle, 0.0) / self.half_life)
+            pruned = store.forget(m for m, weak in zip(memories, decayed < self.min_strength) if weak)
+            store.index.compact()
+        return pruned
+
+
+class SessionMemoryTarget:
+    """Idle-session spill, spill expiry and spill compression for a SessionMemoryManager"""
+
+    def __init__(self, manager: SessionMemoryManager, name: str = "session_memory",
+                 strategy: Optional[str] = None, energy: float = ENERGY, spill_ttl: float = SPILL_TTL):
+        self.name = name
+        self.manager = manager
+        self.strategy = strategy or weight_strategy()
+        self.energy = energy
+        self.spill_ttl = spill_ttl
+        self.alive = True
+
+    def nbytes(self) -> int:
+        """Slab bytes of resident sessions plus spill files on disk"""
+        return len(self.manager) * self.manager.bytes_per_session + self.manager.spilled_bytes()
+
+    def probe(self) -> float:
+        """Mean seconds to read one spilled session back"""
+        read = 0
+        started = time.perf_counter()
+        for path in self.manager.spill_files()[:PROBE_SPILLS]:
+            try:
+                read_spill(path)
+                read += 1
+            except FileNotFoundError:
+                pass  # Restored (and removed) by another thread since the listing.
+        return (time.perf_counter() - started) / read if read else 0.0
+
+    def prune(self, now: Optional[float] = None) -> int:
+        pruned = self.manager.spill_idle(now)
+        pruned += self.manager.expire_spills(self.spill_ttl)
+        pruned += self.manager.rewrite_spills(lambda spill: compress_spill(spill, self.strategy, self.energy))
+        return pruned
+
+
+class MemoryPruner:
+    """Runs registered pruning targets on a schedule and keeps a report of each pass"""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = prune_interval() if interval is None else interval
+        self.targets: Dict[str, Any] = {}
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=HISTORY)
+        self.passes = 0
+        self.bytes_reclaimed = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, target) -> None:
+        """Add a target (once per name) and start the schedule if it is enabled"""
+        with self._lock:
+            self.targets.setdefault(target.name, target)
+        self.start()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.interval > 0 and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="titans-pruner", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                # Keep the schedule alive; the failure is kept for whoever inspects the pruner.
+                self.last_error = repr(e)
+
+    def run_once(self) -> Dict[str, Any]:
+        """Prune every live target once; returns the pass report"""
+        with self._lock:
+            for name in [name for name, target in self.targets.items() if not target.alive]:
+                del self.targets[name]
+            targets = list(self.targets.values())
+        started = time.perf_counter()
+        results: List[Dict[str, Any]] = []
+        for target in targets:
+            before, probe_before = target.nbytes(), target.probe()
+            target_started = time.perf_counter()
+            pruned = target.prune()
+            seconds = time.perf_counter() - target_started
+            after, probe_after = target.nbytes(), target.probe()
+            results.append({
+                "target": target.name,
+                "items_pruned": pruned,
+                "bytes_before": before,
+                "bytes_after": after,
+                "bytes_reclaimed": before - after,
+                "probe_ms_before": round(probe_before * 1000, 4),
+                "probe_ms_after": round(probe_after * 1000, 4),
+                "seconds": round(seconds, 4)
+            })
+        report = {
+            "time": time.time(),
+            "targets": results,
+            "items_pruned": sum(r["items_pruned"] for r in results),
+            "bytes_before": sum(r["bytes_before"] for r in results),
+            "bytes_after": sum(r["bytes_after"] for r in results),
+            "bytes_reclaimed": sum(r["bytes_reclaimed"] for r in results),
+            "probe_ms_before": round(sum(r["probe_ms_before"] for r in results), 4),
+            "probe_ms_after": round(sum(r["probe_ms_after"] for r in results), 4),
+            "seconds": round(time.perf_counter() - started, 4)
+        }
+        with self._lock:
+            self.history.append(report)
+            self.passes += 1
+            self.bytes_reclaimed += report["bytes_reclaimed"]
+        return report
+
+    @property
+    def last_report(self) -> Optional[Dict[str, Any]]:
+        return self.history[-1] if self.history else None
+
+    def get_metrics(self) -> Dict[str, float]:
+        last = self.last_report or {}
+        return {
+            "pruning_passes": self.passes,
+            "pruning_bytes_reclaimed": self.bytes_reclaimed,
+            "pruning_last_seconds": last.get("seconds", 0.0)
+        }
+
+
+def get_pruner() -> MemoryPruner:
+    """Process-wide pruner; its schedule starts with the first registered target"""
+    global _pruner
+    with _pruner_lock:
+        if _pruner is None:
+            _pruner = MemoryPruner()
+        return _pruner
@@ -0,0 +1,56 @@
+"""Reduced-precision storage for memory weights, momentum and retrieval keys.
+
+Values are stored as codes plus one float32 scale per row of the last axis
+(per output channel of a memory matrix, per stored key):
+
+    float32  codes are the values, scales are 1
+    float16  codes are the values cast to half precision, scales are 1
+    int8     codes = round(x / scale), scale = max |row| / 127  (symmetric)
+
+Compute always happens in float32: callers dequantize the rows they touch,
+one slot or one block at a time, or fold the scale into a matmul's output.
+"""
+import os
+from typing import Tuple
+
+import numpy as np
+
+PRECISIONS = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+_INT8_LEVELS = 127
+
+
+def memory_precision() -> str:
+    """Storage precision for memory state and keys (TITANS_MEMORY_PRECISION): float32, float16 or int8"""
+    precision = os.getenv("TITANS_MEMORY_PRECISION", "float32").lower()
+    if precision not in PRECISIONS:
+        raise ValueError(f"TITANS_MEMORY_PRECISION must be one of {', '.join(PRECISIONS)}, got {precision!r}")
+    return precision
+
+
+def storage_dtype(precision: str) -> np.dtype:
+    return np.dtype(PRECISIONS[precision])
+
+
+def bytes_per_row(width: int, precision: str) -> int:
+    """Stored bytes of one row of `width` values, scale included when the precision needs one"""
+    return width * storage_dtype(precision).itemsize + (4 if precision == "int8" else 0)
+
+
+def quantize(values: np.ndarray, precision: str) -> Tuple[np.ndarray, np.ndarray]:
+    """(codes, scales) for `values`; scales have the shape of values without its last axis"""
+    values = np.asarray(values, dtype=np.float32)
+    if precision != "int8":
+        return values.astype(PRECISIONS[precision]), np.ones(values.shape[:-1], dtype=np.float32)
+    scales = np.abs(values).max(axis=-1) / _INT8_LEVELS if values.shape[-1] else \
+        np.zeros(values.shape[:-1], dtype=np.float32)
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    codes = np.rint(values / scales[..., None])
+    return np.clip(codes, -_INT8_LEVELS, _INT8_LEVELS).astype(np.int8), scales
+
+
+def dequantize(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """float32 values of stored codes"""
+    values = np.asarray(codes, dtype=np.float32)
+    if codes.dtype == np.int8:
+        values *= np.asarray(scales, dtype=np.float32)[..., None]
+    return values
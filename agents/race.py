@@ -0,0 +1,98 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from .base_agent import TitansAgent
+
+# Hedge delay used before an agent has any latency history.
+DEFAULT_HEDGE_DELAY = 2.0
+
+
+def _is_good(response: Any) -> bool:
+    if response is None:
+        return False
+    if isinstance(response, str):
+        return bool(response.strip())
+    return bool(response)
+
+
+def _hedge_delay(agent: TitansAgent, hedge: Union[str, float]) -> float:
+    """Resolve "p95" (or "p90", "p99") against the agent's recent provider latencies"""
+    if isinstance(hedge, str):
+        quantile = agent.provider_client.latency_quantile(int(hedge.lstrip("p")) / 100)
+        return quantile if quantile is not None else DEFAULT_HEDGE_DELAY
+    return float(hedge)
+
+
+async def race_interact(agents: Dict[str, TitansAgent], user_input: str,
+                        hedge: Optional[Union[str, float]] = None) -> Dict[str, Any]:
+    """Ask several agents the same question and return the first good answer.
+
+    Without `hedge` every agent starts at once. With `hedge` (seconds, or a
+    quantile such as "p95") agents start one after another, each only if the
+    previous ones have not answered within the hedge delay. Losing requests
+    are cancelled once a winner is found.
+    """
+    if not agents:
+        raise ValueError("Race mode needs at least one agent.")
+
+    names: List[str] = list(agents)
+    started_at = time.perf_counter()
+    pending: Dict[asyncio.Task, str] = {}
+    errors: Dict[str, str] = {}
+    launched = 0
+
+    def launch() -> None:
+        nonlocal launched
+        name = names[launched]
+        pending[asyncio.ensure_future(agents[name].interact(user_input))] = name
+        launched += 1
+
+    launch()
+    if hedge is None:
+        while launched < len(names):
+            launch()
+
+    try:
+        while pending:
+            timeout = None
+            if launched < len(names):
+                timeout = _hedge_delay(agents[names[launched - 1]], hedge)
+            done, _ = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                launch()
+                continue
+
+            for task in done:
+                name = pending.pop(task)
+                if task.exception() is not None:
+                    errors[name] = str(task.exception())
+                elif _is_good(task.result()):
+                    return {
+                        "winner": name,
+                        "response": task.result(),
+                        "latency_s": round(time.perf_counter() - started_at, 3),
+                        "cancelled": sorted(pending.values()),
+                        "not_started": names[launched:],
+                        "errors": errors
+                    }
+                else:
+                    errors[name] = "Empty response"
+
+            # A failure means waiting for the hedge is pointless; start the next agent now.
+            if launched < len(names):
+                launch()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    return {
+        "winner": None,
+        "response": None,
+        "latency_s": round(time.perf_counter() - started_at, 3),
+        "cancelled": [],
+        "not_started": [],
+        "errors": errors
+    }
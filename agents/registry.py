@@ -0,0 +1,39 @@
+import importlib
+from typing import Any, Dict, Tuple
+
+# Display name -> (module, class), in the order the apps list them.
+AGENT_CLASSES = {
+    "OpenAI (Neural Memory)": ("agents.openai_agent", "NeuralMemoryAgent"),
+    "Anthropic (Memory Context)": ("agents.anthropic_agent", "MemoryContextAgent"),
+    "Mistral (Memory Gate)": ("agents.mistral_agent", "MemoryGateAgent"),
+    "Groq (Memory Layer)": ("agents.groq_agent", "MemoryLayerAgent"),
+    "Gemini (Experimental)": ("agents.gemini_agent", "ExperimentalAgent"),
+    "Cohere (Innovations)": ("agents.cohere_agent", "InnovationsAgent"),
+    "Emergence (Analysis)": ("agents.emergence_agent", "AnalysisAgent"),
+}
+
+
+def load_agent_factories() -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Load agent classes lazily and capture import errors per provider."""
+    factories: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+
+    for display_name, (module_name, class_name) in AGENT_CLASSES.items():
+        try:
+            factories[display_name] = getattr(importlib.import_module(module_name), class_name)
+        except Exception as exc:
+            errors[display_name] = str(exc)
+
+    return factories, errors
+
+
+def create_agents(factories: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Instantiate agents, capturing initialization errors (e.g. missing API keys)."""
+    agents: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    for display_name, factory in factories.items():
+        try:
+            agents[display_name] = factory()
+        except Exception as exc:
+            errors[display_name] = str(exc)
+    return agents, errors
@@ -0,0 +1,219 @@
+"""Semantic cache of interact() answers, keyed by query meaning rather than exact text.
+
+Queries are normalised (Titans acronyms expanded, question filler dropped,
+question words kept so "why" and "how" questions stay apart), embedded with
+HashingEmbedder and matched against earlier queries by cosine similarity. Each agent/model pair has its own cache, persisted as
+`<slug>.v<KEY_VERSION>.jsonl` (entries), `.offsets` (where each entry's
+line starts) and `.vectors` (float32 query vectors). The last two are
+SharedAppendArrays, so every worker process searches the same mapped pages,
+sees entries stored by the others, and never locks to read. Storing a query
+that duplicates an existing one replaces that row (its vector, and its offset
+now pointing at the new line) rather than adding a duplicate, so an expired
+answer is refreshed in place. A sample of hits
+is audited: the provider is called anyway and the fresh answer compared with
+the cached one, to estimate the false-hit rate.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .embeddings import HashingEmbedder
+from .shared_state import SharedAppendArray
+from .telemetry import AgentTelemetry, LatencyHistogram
+
+GLOSSARY = {
+    "mac": "memory as context",
+    "mag": "memory as gate",
+    "mal": "memory as layer",
+    "ltm": "long term memory",
+    "stm": "short term memory",
+    "lmm": "long term memory module",
+}
+
+_FILLER = frozenset((
+    "a an the is are was were be do does did how what why when which who can could would should will "
+    "please explain describe tell me about work works working mean means meaning of in on for to and or "
+    "i you it this that there give show define definition detail details"
+).split())
+# Dropped for retrieval, but they change what a question asks, so cache keys keep them.
+QUESTION_WORDS = frozenset(("how", "what", "why", "when", "which", "who"))
+_WORD = re.compile(r"[a-z0-9]+")
+
+DEFAULT_THRESHOLD = 0.85
+# Bumped whenever normalisation changes, so vectors keyed the old way are not matched against.
+KEY_VERSION = 2
+# A stored query this similar to an existing one (same words once normalised) replaces it.
+DUPLICATE_THRESHOLD = 0.98
+# Audited hits whose fresh answer is less similar than this to the cached one count as false hits.
+AUDIT_AGREEMENT = 0.5
+
+_caches: Dict[Tuple[str, str], "SemanticCache"] = {}
+_caches_lock = threading.Lock()
+
+
+def normalize_query(query: str, keep_question_words: bool = False) -> str:
+    filler = _FILLER - QUESTION_WORDS if keep_question_words else _FILLER
+    words = []
+    for word in _WORD.findall(query.lower()):
+        words.extend(GLOSSARY.get(word, word).split())
+    return " ".join(word for word in words if word not in filler)
+
+
+def cache_enabled() -> bool:
+    return os.getenv("TITANS_SEMANTIC_CACHE", "1").lower() not in {"0", "false", "no", "off"}
+
+
+def default_cache_dir() -> Path:
+    return Path(os.getenv("TITANS_CACHE_DIR", Path(__file__).resolve().parents[1] / "cache" / "semantic"))
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def _stem(namespace: str) -> str:
+    return f"{_slug(namespace)}.v{KEY_VERSION}"
+
+
+class SemanticCache:
+    def __init__(self, namespace: str, directory: Optional[Path] = None, telemetry: Optional[AgentTelemetry] = None,
+                 threshold: Optional[float] = None, audit_rate: Optional[float] = None,
+                 ttl_seconds: Optional[float] = None, embedder: Optional[HashingEmbedder] = None):
+        self.namespace = namespace
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.telemetry = telemetry or AgentTelemetry(namespace)
+        self.threshold = threshold if threshold is not None else float(
+            os.getenv("TITANS_SEMANTIC_CACHE_THRESHOLD", DEFAULT_THRESHOLD))
+        self.audit_rate = audit_rate if audit_rate is not None else float(
+            os.getenv("TITANS_SEMANTIC_CACHE_AUDIT_RATE", "0.05"))
+        ttl = ttl_seconds if ttl_seconds is not None else float(os.getenv("TITANS_SEMANTIC_CACHE_TTL", "0"))
+        self.ttl_seconds = ttl or None
+        self.embedder = embedder or HashingEmbedder()
+        self.vectors = SharedAppendArray(self.directory / f"{_stem(namespace)}.vectors", self.embedder.dim)
+        self.offsets = SharedAppendArray(self.directory / f"{_stem(namespace)}.offsets", 2, dtype=np.int64)
+        # Lines never change once written, so each process keeps the ones it has read, by file
+        # offset: a replaced row points at a new offset and so misses this cache.
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self.lookup_latency = LatencyHistogram()
+        self.audits = 0
+        self.false_hits = 0
+        self._lock = threading.Lock()
+
+    @property
+    def entries_path(self) -> Path:
+        return self.directory / f"{_stem(self.namespace)}.jsonl"
+
+    @property
+    def audit_path(self) -> Path:
+        return self.directory / f"{_stem(self.namespace)}.audit.jsonl"
+
+    def _entry(self, entry_id: int) -> Dict[str, Any]:
+        # Only the offset is read: it is the one word a replacing writer changes last.
+        offset = int(self.offsets.view()[entry_id, 0])
+        with self._lock:
+            entry = self.entries.get(offset)
+        if entry is None:
+            with open(self.entries_path, "rb") as handle:
+                handle.seek(offset)
+                entry = json.loads(handle.readline())
+            with self._lock:
+                self.entries[offset] = entry
+        return entry
+
+    def _fresh(self, entry: Dict[str, Any]) -> bool:
+        return self.ttl_seconds is None or time.time() - entry["created"] <= self.ttl_seconds
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """Best cached entry above the threshold (with its "similarity"), or None"""
+        started = time.perf_counter()
+        vector = self.embedder.embed(normalize_query(query, keep_question_words=True))
+        vectors = self.vectors.view()[:len(self.offsets)]
+        hit = None
+        if len(vectors):
+            scores = vectors @ vector
+            candidates = np.flatnonzero(scores >= self.threshold)
+            # Best first, skipping expired entries so that a fresher match further down still hits.
+            for best in candidates[np.argsort(-scores[candidates])]:
+                entry = self._entry(int(best))
+                if self._fresh(entry):
+                    hit = {**entry, "id": int(best), "similarity": float(scores[best])}
+                    break
+        self.lookup_latency.record(time.perf_counter() - started)
+        self.telemetry.record_cache("semantic", hit=hit is not None)
+        return hit
+
+    def store(self, query: str, answer: str) -> None:
+        """Cache an answer, replacing an existing entry for the same query if there is one"""
+        vector = self.embedder.embed(normalize_query(query, keep_question_words=True))
+        entry = {"query": query, "answer": answer, "created": time.time()}
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        # Offsets then vector: readers only trust rows present in both, and the next
+        # writer trims whichever array a crash left one row ahead.
+        with self.vectors.lock:
+            committed = min(len(self.offsets), len(self.vectors))
+            self.offsets.truncate(committed)
+            self.vectors.truncate(committed)
+            scores = self.vectors.view() @ vector if committed else np.zeros(0, dtype=np.float32)
+            duplicate = int(scores.argmax()) if len(scores) and scores.max() >= DUPLICATE_THRESHOLD else None
+            with open(self.entries_path, "ab") as handle:
+                offset = handle.seek(0, os.SEEK_END)
+                handle.write(line)
+            if duplicate is None:
+                self.offsets.append(np.array([offset, len(line)]))
+                self.vectors.append(vector)
+            else:
+                # The old line stays in the file, unreferenced.
+                self.vectors.view()[duplicate] = vector
+                self.offsets.view()[duplicate, 1] = len(line)
+                self.offsets.view()[duplicate, 0] = offset
+        with self._lock:
+            self.entries[offset] = entry
+
+    def should_audit(self) -> bool:
+        return self.audit_rate > 0 and random.random() < self.audit_rate
+
+    def audit(self, query: str, hit: Dict[str, Any], fresh_answer: str) -> bool:
+        """Compare a fresh answer with the cached one; returns True if the hit looks false"""
+        agreement = float(self.embedder.embed(hit["answer"]) @ self.embedder.embed(fresh_answer))
+        false_hit = agreement < AUDIT_AGREEMENT
+        with self._lock:
+            self.audits += 1
+            self.false_hits += false_hit
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.audit_path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps({
+                    "timestamp": time.time(),
+                    "query": query,
+                    "cached_query": hit["query"],
+                    "similarity": hit["similarity"],
+                    "answer_agreement": round(agreement, 4),
+                    "false_hit": false_hit
+                }) + "\n")
+        return false_hit
+
+    def get_metrics(self) -> Dict[str, float]:
+        return {
+            "semantic_cache_entries": len(self.vectors),
+            "semantic_cache_hit_ratio": self.telemetry.cache_hit_ratio("semantic"),
+            "semantic_cache_lookup_p50_ms": self.lookup_latency.percentile_ms(50),
+            "semantic_cache_lookup_p95_ms": self.lookup_latency.percentile_ms(95),
+            "semantic_cache_audits": self.audits,
+            "semantic_cache_false_hit_rate": round(self.false_hits / self.audits, 4) if self.audits else 0.0
+        }
+
+
+def get_semantic_cache(agent_name: str, model_name: str,
+                       telemetry: Optional[AgentTelemetry] = None) -> SemanticCache:
+    """One cache per agent and model, shared by every instance in the process"""
+    key = (agent_name, model_name)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = SemanticCache(f"{agent_name} {model_name}", telemetry=telemetry)
+        return _caches[key]
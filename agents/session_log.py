@@ -0,0 +1,131 @@
+"""Append-only, compressed record of agent results with an agent/timestamp index.
+
+Each SessionLog writes its own data file, `<session>.tlog`: a sequence of
+frames, each a u32 length followed by a zlib-compressed result envelope.
+Every record also gets one line in the shared `index.jsonl`. Single-line
+appends are atomic, so several app processes can record into the same
+directory.
+"""
+import json
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .envelope import pack_result, unpack_result
+
+_FRAME = struct.Struct("<I")
+INDEX_NAME = "index.jsonl"
+
+
+def default_session_dir() -> Path:
+    return Path(os.getenv("TITANS_SESSION_DIR", Path(__file__).resolve().parents[1] / "sessions"))
+
+
+def recording_enabled() -> bool:
+    return os.getenv("TITANS_SESSION_LOG", "1").lower() not in {"0", "false", "no", "off"}
+
+
+class SessionLog:
+    def __init__(self, directory: Optional[Union[str, Path]] = None, session_id: Optional[str] = None):
+        self.directory = Path(directory) if directory else default_session_dir()
+        # The random part keeps sessions started in the same second (several Streamlit
+        # sessions share a process) out of each other's data files.
+        self.session_id = session_id or f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex}"
+        self.sequence = 0
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / INDEX_NAME
+
+    def _data_path(self, session_id: str) -> Path:
+        return self.directory / f"{session_id}.tlog"
+
+    def append(self, label: str, agent: Optional[str], result: Any) -> Dict[str, Any]:
+        """Compress and append one result, returning its index entry"""
+        frame = zlib.compress(pack_result(result), 1)
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self._data_path(self.session_id), "ab") as data:
+                offset = data.tell()
+                data.write(_FRAME.pack(len(frame)))
+                data.write(frame)
+            entry = {
+                "session": self.session_id,
+                "seq": self.sequence,
+                "timestamp": time.time(),
+                "label": label,
+                "agent": agent,
+                "offset": offset,
+                "length": len(frame)
+            }
+            self.sequence += 1
+            with open(self.index_path, "a", encoding="utf-8") as index:
+                index.write(json.dumps(entry) + "\n")
+        return entry
+
+    def entries(self, session: Optional[str] = None, agent: Optional[str] = None,
+                since: Optional[float] = None, until: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Index entries filtered by session, agent and timestamp range"""
+        if not self.index_path.exists():
+            return []
+        matches = []
+        with open(self.index_path, encoding="utf-8") as index:
+            for line in index:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a torn last line from a crashed writer
+                if session is not None and entry["session"] != session:
+                    continue
+                if agent is not None and entry.get("agent") != agent:
+                    continue
+                if since is not None and entry["timestamp"] < since:
+                    continue
+                if until is not None and entry["timestamp"] > until:
+                    continue
+                matches.append(entry)
+        return matches
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        """One summary per recorded session, newest first"""
+        summaries: Dict[str, Dict[str, Any]] = {}
+        for entry in self.entries():
+            summary = summaries.setdefault(entry["session"], {
+                "session": entry["session"],
+                "started": entry["timestamp"],
+                "records": 0,
+                "agents": set()
+            })
+            summary["records"] += 1
+            if entry.get("agent"):
+                summary["agents"].add(entry["agent"])
+        for summary in summaries.values():
+            summary["agents"] = sorted(summary["agents"])
+        return sorted(summaries.values(), key=lambda s: s["started"], reverse=True)
+
+    def read(self, entry: Dict[str, Any]) -> Any:
+        with open(self._data_path(entry["session"]), "rb") as data:
+            data.seek(entry["offset"])
+            (length,) = _FRAME.unpack(data.read(_FRAME.size))
+            return unpack_result(zlib.decompress(data.read(length)))
+
+    def replay(self, session: str, agent: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield {"entry", "result"} for every record in a session, in order"""
+        for entry in sorted(self.entries(session=session, agent=agent), key=lambda e: e["seq"]):
+            yield {"entry": entry, "result": self.read(entry)}
+
+
+def result_agent(result: Any) -> Optional[str]:
+    """Best-effort agent name from the payloads the apps produce"""
+    if isinstance(result, dict):
+        for key in ("agent", "selected_agent", "winner"):
+            if isinstance(result.get(key), str):
+                return result[key]
+    return None
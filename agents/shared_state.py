@@ -0,0 +1,164 @@
+"""State shared by every worker process through memory-mapped files.
+
+Arrays live in files under `cache/shared/` (TITANS_SHARED_DIR) and each
+process maps them, so the pages are held once by the OS page cache however
+many Streamlit workers attach. Two access patterns are supported:
+
+- SharedAppendArray: append-only rows with a committed-row count in the file
+  header. Writers append under a FileLock and bump the count last, so
+  readers never lock: they see a consistent prefix of rows.
+- shared_array: a fixed-shape .npy created once and attached by everyone;
+  callers serialise their own updates with a FileLock.
+
+FileLock is an exclusive lock across processes (flock, or msvcrt on
+Windows) that is also re-entrant across threads of one process.
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+_MAGIC = 0x54545341  # "TTSA"
+_HEADER_WORDS = 8  # magic, row width, capacity, count, itemsize, 3 spare
+_HEADER_BYTES = _HEADER_WORDS * 8
+_WIDTH, _CAPACITY, _COUNT, _ITEMSIZE = 1, 2, 3, 4
+
+
+def shared_state_enabled() -> bool:
+    """Whether per-process state (session memory slabs) is placed in shared files (TITANS_SHARED_STATE)"""
+    return os.getenv("TITANS_SHARED_STATE", "0").lower() in {"1", "true", "yes", "on"}
+
+
+def default_shared_dir() -> Path:
+    return Path(os.getenv("TITANS_SHARED_DIR", Path(__file__).resolve().parents[1] / "cache" / "shared"))
+
+
+class FileLock:
+    """Exclusive lock on `path` across processes, re-entrant within a process"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._handle = None
+
+    def acquire(self) -> None:
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(self.path, "a+b")
+            try:
+                if os.name == "nt":
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                else:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            except BaseException:
+                handle.close()
+                self._thread_lock.release()
+                raise
+            self._handle = handle
+        self._depth += 1
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            handle, self._handle = self._handle, None
+            if os.name == "nt":
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            handle.close()
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class SharedAppendArray:
+    """Append-only (rows x width) array in a file, readable zero-copy by any process"""
+
+    def __init__(self, path: Union[str, Path], width: int, dtype=np.float32, initial_capacity: int = 1024):
+        self.path = Path(path)
+        self.width = width
+        self.dtype = np.dtype(dtype)
+        self.lock = FileLock(self.path.with_name(self.path.name + ".lock"))
+        self._data: Optional[np.ndarray] = None
+        self._capacity = 0
+        with self.lock:
+            if not self.path.exists() or self.path.stat().st_size < _HEADER_BYTES:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "wb") as handle:
+                    handle.truncate(_HEADER_BYTES + initial_capacity * width * self.dtype.itemsize)
+                header = np.memmap(self.path, dtype=np.uint64, mode="r+", shape=(_HEADER_WORDS,))
+                header[:_ITEMSIZE + 1] = [_MAGIC, width, initial_capacity, 0, self.dtype.itemsize]
+                header.flush()
+        self._header = np.memmap(self.path, dtype=np.uint64, mode="r+", shape=(_HEADER_WORDS,))
+        if int(self._header[0]) != _MAGIC or int(self._header[_WIDTH]) != width \
+                or int(self._header[_ITEMSIZE]) != self.dtype.itemsize:
+            raise ValueError(f"{self.path} is not a {width}-wide {self.dtype} shared array")
+
+    def __len__(self) -> int:
+        return int(self._header[_COUNT])
+
+    def _mapped(self) -> np.ndarray:
+        capacity = int(self._header[_CAPACITY])
+        if self._data is None or capacity != self._capacity:
+            # The file only ever grows, so views of an older, smaller mapping stay valid.
+            self._data = np.memmap(self.path, dtype=self.dtype, mode="r+", offset=_HEADER_BYTES,
+                                   shape=(capacity, self.width))
+            self._capacity = capacity
+        return self._data
+
+    def view(self) -> np.ndarray:
+        """Zero-copy view of every committed row"""
+        count = len(self)
+        return self._mapped()[:count]
+
+    def append(self, rows: np.ndarray) -> int:
+        """Append rows and commit them; returns the index of the first"""
+        rows = np.asarray(rows, dtype=self.dtype).reshape(-1, self.width)
+        with self.lock:
+            start = len(self)
+            needed = start + len(rows)
+            if needed > int(self._header[_CAPACITY]):
+                capacity = max(needed, 2 * int(self._header[_CAPACITY]))
+                with open(self.path, "r+b") as handle:
+                    handle.truncate(_HEADER_BYTES + capacity * self.width * self.dtype.itemsize)
+                self._header[_CAPACITY] = capacity
+            # No msync: other processes read the same page cache, and the kernel writes it
+            # back even if this process dies.
+            self._mapped()[start:needed] = rows
+            self._header[_COUNT] = needed
+        return start
+
+    def truncate(self, count: int) -> None:
+        """Drop committed rows past `count`, e.g. to realign with a companion array after a crash"""
+        with self.lock:
+            if count < len(self):
+                self._header[_COUNT] = count
+
+
+def shared_array(path: Union[str, Path], shape: Tuple[int, ...], dtype=np.float32) -> np.ndarray:
+    """Attach to a fixed-shape array file, creating it zero-filled if it does not exist yet"""
+    path = Path(path)
+    with FileLock(path.with_name(path.name + ".lock")):
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape).flush()
+    array = np.load(path, mmap_mode="r+")
+    if array.shape != tuple(shape) or array.dtype != np.dtype(dtype):
+        raise ValueError(f"{path} holds {array.dtype}{array.shape}, expected {np.dtype(dtype)}{tuple(shape)}")
+    return array
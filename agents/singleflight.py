@@ -0,0 +1,85 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from .telemetry import AgentTelemetry
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key.
+
+    Futures are thread-safe `concurrent.futures.Future` objects, so callers on
+    different event loops (Streamlit sessions, desktop worker threads) can
+    wait on the same provider request.
+    """
+
+    def __init__(self, telemetry: Optional[AgentTelemetry] = None):
+        self.telemetry = telemetry
+        self._inflight: Dict[Hashable, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `call` unless an identical request is already running, then share its result"""
+        while True:
+            with self._lock:
+                future = self._inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = concurrent.futures.Future()
+                    self._inflight[key] = future
+                    self.leaders += 1
+                else:
+                    self.shared += 1
+            if self.telemetry is not None:
+                self.telemetry.record_cache("coalesce", hit=not leader)
+
+            if leader:
+                return await self._lead(key, future, call)
+
+            # asyncio.wait raises only if this task is cancelled, never for the leader's outcome,
+            # and leaves the shared future running for the other callers.
+            waiter = asyncio.wrap_future(future)
+            try:
+                await asyncio.wait({waiter})
+            except asyncio.CancelledError:
+                waiter.add_done_callback(_retrieve)
+                raise
+            if waiter.cancelled():
+                continue  # The leader was cancelled rather than us: retry, possibly as the new leader.
+            return waiter.result()
+
+    async def _lead(self, key: Hashable, future: concurrent.futures.Future,
+                    call: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Return how many requests were executed versus served from a shared flight"""
+        with self._lock:
+            total = self.leaders + self.shared
+            return {
+                "coalesced_requests": self.shared,
+                "coalesced_ratio": round(self.shared / total, 4) if total else 0.0,
+            }
+
+
+def _retrieve(future: asyncio.Future) -> None:
+    """Mark an abandoned waiter's outcome as seen, so asyncio does not log it as never retrieved"""
+    if not future.cancelled():
+        future.exception()
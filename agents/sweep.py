@@ -0,0 +1,242 @@
+"""Parameter sweeps over the agents' metric kernels, stored as labelled N-d arrays.
+
+A sweep evaluates every metric at every point of a grid (the Cartesian product
+of its axes) and writes a cube of shape (metric, axis_1, ..., axis_n) to
+`<dir>/<name>.npy`, with axis labels and values in `<name>.json`. Cubes open as
+memory maps, so any slice is read from disk without recomputing.
+
+  python -m agents.sweep scalability --workers 4
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import kernels
+
+# metric name -> (kernel, {kernel parameter: axis name})
+Metrics = Dict[str, Tuple[Callable[..., np.ndarray], Dict[str, str]]]
+
+# Grids smaller than this are evaluated in-process; starting workers would cost more.
+PARALLEL_MIN_POINTS = 2_000_000
+
+SWEEPS: Dict[str, Dict[str, Any]] = {
+    "scalability": {
+        "agent": "Gemini (Experimental)",
+        "axes": {
+            "sequence_length": kernels.log_grid(1e3, 2e6),
+            "bytes_per_token": np.array([8, 16, 32])
+        },
+        "metrics": {
+            "processing_time": (kernels.processing_time, {"lengths": "sequence_length"}),
+            "memory_usage_mb": (kernels.memory_usage_mb, {"lengths": "sequence_length",
+                                                         "bytes_per_token": "bytes_per_token"}),
+            "throughput": (kernels.throughput, {"lengths": "sequence_length"})
+        }
+    },
+    "retrieval": {
+        "agent": "Gemini (Experimental)",
+        "axes": {"haystack_size": kernels.log_grid(1e3, 1e7)},
+        "metrics": {
+            "retrieval_time": (kernels.retrieval_time, {"sizes": "haystack_size"}),
+            "accuracy": (kernels.retrieval_accuracy, {"sizes": "haystack_size"}),
+            "success_rate": (kernels.retrieval_success_rate, {"sizes": "haystack_size"})
+        }
+    },
+    "momentum": {
+        "agent": "Cohere (Innovations)",
+        "axes": {"momentum": kernels.linear_grid(0.0, 0.99)},
+        "metrics": {
+            "convergence_rate": (kernels.convergence_rate, {"momentum": "momentum"}),
+            "stability_score": (kernels.stability_score, {"momentum": "momentum"}),
+            "memory_efficiency": (kernels.momentum_efficiency, {"momentum": "momentum"})
+        }
+    },
+    "weight_decay": {
+        "agent": "Cohere (Innovations)",
+        "axes": {"decay_rate": kernels.log_grid(1e-5, 0.5)},
+        "metrics": {
+            "model_size_reduction": (kernels.size_reduction, {"decay_rates": "decay_rate"}),
+            "performance_impact": (kernels.performance_impact, {"decay_rates": "decay_rate"}),
+            "memory_savings": (kernels.memory_savings, {"decay_rates": "decay_rate"})
+        }
+    },
+    "context": {
+        "agent": "Anthropic (Memory Context)",
+        "axes": {
+            "sequence_length": kernels.log_grid(10, 1e6),
+            "window": np.array([1024, 2048, 4096, 8192]),
+            "base_score": np.array([0.9, 0.95, 0.99])
+        },
+        "metrics": {
+            "integration_score": (kernels.integration_score, {"seq_lengths": "sequence_length",
+                                                             "base_score": "base_score"}),
+            "memory_usage": (kernels.context_memory_usage, {"seq_lengths": "sequence_length"}),
+            "context_window": (kernels.context_window, {"seq_lengths": "sequence_length", "window": "window"})
+        }
+    },
+    "layer": {
+        "agent": "Groq (Memory Layer)",
+        "axes": {
+            "layer_size": kernels.log_grid(64, 8192),
+            "base_throughput": np.array([500.0, 1000.0, 2000.0])
+        },
+        "metrics": {
+            "throughput": (kernels.layer_throughput, {"layer_sizes": "layer_size",
+                                                     "base_throughput": "base_throughput"})
+        }
+    },
+}
+
+
+def default_sweep_dir() -> Path:
+    return Path(os.getenv("TITANS_SWEEP_DIR", Path(__file__).resolve().parents[1] / "sweeps"))
+
+
+class ResultsCube:
+    """Metric values over a grid, labelled by metric and axis name"""
+
+    def __init__(self, name: str, data: np.ndarray, metrics: Sequence[str],
+                 axes: Dict[str, np.ndarray], meta: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.data = data
+        self.metrics = list(metrics)
+        self.axes = {axis: np.asarray(values) for axis, values in axes.items()}
+        self.meta = meta or {}
+
+    @property
+    def dims(self) -> List[str]:
+        return ["metric", *self.axes]
+
+    @classmethod
+    def open(cls, name: str, directory: Optional[Union[str, Path]] = None) -> "ResultsCube":
+        """Memory-map a saved cube; nothing is read until it is sliced"""
+        directory = Path(directory) if directory else default_sweep_dir()
+        meta = json.loads((directory / f"{name}.json").read_text(encoding="utf-8"))
+        data = np.load(directory / f"{name}.npy", mmap_mode="r")
+        return cls(name, data, meta["metrics"], meta["axes"], meta)
+
+    def index(self, axis: str, value: float) -> int:
+        """Grid index nearest to a value on an axis"""
+        return int(np.abs(self.axes[axis] - value).argmin())
+
+    def select(self, metric: str, **indices: int) -> Tuple[List[str], np.ndarray]:
+        """Fix some axes by grid index; returns the remaining axis names and the slice"""
+        key: List[Any] = [self.metrics.index(metric)]
+        remaining = []
+        for axis in self.axes:
+            if axis in indices:
+                key.append(int(indices[axis]))
+            else:
+                key.append(slice(None))
+                remaining.append(axis)
+        return remaining, self.data[tuple(key)]
+
+    def line(self, metric: str, along: str, **indices: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(axis values, metric values) along one axis; other axes default to index 0"""
+        fixed = {axis: indices.get(axis, 0) for axis in self.axes if axis != along}
+        _, values = self.select(metric, **fixed)
+        return self.axes[along], np.asarray(values)
+
+
+def saved_sweeps(directory: Optional[Union[str, Path]] = None) -> List[str]:
+    directory = Path(directory) if directory else default_sweep_dir()
+    if not directory.exists():
+        return []
+    return sorted(path.stem for path in directory.glob("*.json") if path.with_suffix(".npy").exists())
+
+
+def _evaluate_chunk(path: str, metrics: Metrics, axes: Dict[str, np.ndarray], start: int, stop: int) -> None:
+    """Fill rows [start, stop) of the first axis, writing straight into the on-disk cube"""
+    cube = np.load(path, mmap_mode="r+")
+    names = list(axes)
+    shape = (stop - start, *(len(axes[axis]) for axis in names[1:]))
+    # Each axis becomes a broadcastable view along its own dimension; no meshgrid copies.
+    views = {}
+    for position, axis in enumerate(names):
+        values = axes[axis][start:stop] if position == 0 else axes[axis]
+        view_shape = [1] * len(names)
+        view_shape[position] = len(values)
+        views[axis] = values.reshape(view_shape)
+    for index, (kernel, params) in enumerate(metrics.values()):
+        result = kernel(**{param: views[axis] for param, axis in params.items()})
+        cube[index, start:stop] = np.broadcast_to(result, shape)
+    cube.flush()
+
+
+def run_sweep(name: str, axes: Optional[Dict[str, Sequence[float]]] = None, metrics: Optional[Metrics] = None,
+              directory: Optional[Union[str, Path]] = None, workers: Optional[int] = None) -> ResultsCube:
+    """Evaluate a sweep over its grid and save it; `axes` overrides a registered sweep's grid.
+
+    Large grids are split along the first axis across a process pool; each worker
+    writes its rows into the memory-mapped cube, so results never cross processes.
+    """
+    spec = SWEEPS.get(name, {})
+    metrics = metrics or spec.get("metrics")
+    if not metrics:
+        raise ValueError(f"Unknown sweep {name!r}; choose from {', '.join(SWEEPS)} or pass metrics")
+    grid = {axis: np.asarray(values, dtype=np.float64) for axis, values in (axes or spec["axes"]).items()}
+    for kernel, params in metrics.values():
+        missing = set(params.values()) - set(grid)
+        if missing:
+            raise ValueError(f"{kernel.__name__} needs axes missing from the grid: {', '.join(sorted(missing))}")
+
+    directory = Path(directory) if directory else default_sweep_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.npy"
+    shape = (len(metrics), *(len(values) for values in grid.values()))
+    np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=shape).flush()
+
+    started = time.perf_counter()
+    rows = shape[1]
+    points = int(np.prod(shape))
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or points < PARALLEL_MIN_POINTS or rows < 2:
+        _evaluate_chunk(str(path), metrics, grid, 0, rows)
+    else:
+        bounds = np.linspace(0, rows, min(workers, rows) + 1, dtype=int)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_evaluate_chunk, str(path), metrics, grid, int(lo), int(hi))
+                       for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+            for future in futures:
+                future.result()
+
+    meta = {
+        "name": name,
+        "agent": spec.get("agent"),
+        "metrics": list(metrics),
+        "axes": {axis: values.tolist() for axis, values in grid.items()},
+        "shape": list(shape),
+        "created": time.time(),
+        "compute_seconds": round(time.perf_counter() - started, 4)
+    }
+    (directory / f"{name}.json").write_text(json.dumps(meta), encoding="utf-8")
+    return ResultsCube.open(name, directory)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a registered parameter sweep and save its results cube.")
+    parser.add_argument("sweep", choices=sorted(SWEEPS))
+    parser.add_argument("--points", type=int, help="Resample the first axis to this many points")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--dir", help="Output directory (default: TITANS_SWEEP_DIR or ./sweeps)")
+    args = parser.parse_args(argv)
+
+    axes = dict(SWEEPS[args.sweep]["axes"])
+    if args.points:
+        first = next(iter(axes))
+        values = axes[first]
+        grid = kernels.log_grid if values.min() > 0 and values.max() / values.min() > 100 else kernels.linear_grid
+        axes[first] = grid(values.min(), values.max(), args.points)
+    cube = run_sweep(args.sweep, axes, directory=args.dir, workers=args.workers)
+    print(f"{cube.name}: {' x '.join(f'{dim}={size}' for dim, size in zip(cube.dims, cube.data.shape))} "
+          f"in {cube.meta['compute_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# HDR-style log-linear buckets over microseconds: 128 linear sub-buckets per
+# power of two gives ~1% relative precision from 1us up to ~3 days.
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+MAX_MAGNITUDE = 32
+BUCKET_COUNT = SUB_BUCKET_COUNT + MAX_MAGNITUDE * SUB_BUCKET_HALF
+
+OPERATIONS = ("demonstrate", "interact", "collaborate")
+
+
+def bucket_index(micros: int) -> int:
+    if micros < SUB_BUCKET_COUNT:
+        return max(0, micros)
+    magnitude = micros.bit_length() - SUB_BUCKET_BITS
+    if magnitude > MAX_MAGNITUDE:
+        return BUCKET_COUNT - 1
+    return SUB_BUCKET_COUNT + (magnitude - 1) * SUB_BUCKET_HALF + (micros >> magnitude) - SUB_BUCKET_HALF
+
+
+def bucket_midpoint(index: int) -> float:
+    """Representative value (in microseconds) of a bucket"""
+    if index < SUB_BUCKET_COUNT:
+        return float(index)
+    magnitude = (index - SUB_BUCKET_COUNT) // SUB_BUCKET_HALF + 1
+    sub = (index - SUB_BUCKET_COUNT) % SUB_BUCKET_HALF + SUB_BUCKET_HALF
+    return ((sub << magnitude) + (sub + 1 << magnitude)) / 2.0
+
+
+class LatencyHistogram:
+    """Fixed-size latency histogram; recording never allocates.
+
+    Counters are plain list slots updated without a lock. Under the GIL a
+    racing increment can very rarely be lost, which is acceptable for
+    telemetry and keeps the request path lock-free.
+    """
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bucket_index(int(seconds * 1_000_000))] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+
+    def percentile_ms(self, percentile: float) -> float:
+        """Latency at the given percentile (0-100) in milliseconds, 0.0 when empty"""
+        if not self.count:
+            return 0.0
+        target = max(1, int(round(self.count * percentile / 100.0)))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= target:
+                return round(min(bucket_midpoint(index) / 1000.0, self.max_seconds * 1000.0), 3)
+        return round(self.max_seconds * 1000.0, 3)
+
+    def mean_ms(self) -> float:
+        return round(self.total_seconds * 1000.0 / self.count, 3) if self.count else 0.0
+
+
+class AgentTelemetry:
+    """Wall time, time-to-first-token, tokens and errors for one agent"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = time.time()
+        self.operations = {op: LatencyHistogram() for op in OPERATIONS}
+        self.errors = {op: 0 for op in OPERATIONS}
+        self.in_flight = 0
+        self.first_token = LatencyHistogram()
+        self.provider_calls = 0
+        self.provider_in_flight = 0
+        self.provider_errors = 0
+        self.provider_retries = 0
+        self.provider_failures = 0
+        self.throttled_seconds = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        # cache name -> [hits, lookups]; lists are created once per cache, not per request.
+        self.caches: Dict[str, list] = {}
+        self._gauge_lock = threading.Lock()
+
+    def adjust_gauge(self, gauge: str, delta: int) -> None:
+        """Move an in-flight gauge. Unlike counters, gauges are locked: they are moved from several
+        threads and event loops, and a lost update would leave them off for good."""
+        with self._gauge_lock:
+            setattr(self, gauge, getattr(self, gauge) + delta)
+
+    def record_operation(self, op: str, seconds: float, error: bool = False) -> None:
+        self.operations[op].record(seconds)
+        if error:
+            self.errors[op] += 1
+
+    def record_provider_call(self, seconds: float, response: Any = None) -> None:
+        """Record a successful provider response; non-streaming calls arrive all at once"""
+        self.first_token.record(seconds)
+        input_tokens, output_tokens = usage_tokens(response)
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        counters = self.caches.get(cache)
+        if counters is None:
+            counters = self.caches.setdefault(cache, [0, 0])
+        if hit:
+            counters[0] += 1
+        counters[1] += 1
+
+    def cache_hit_ratio(self, cache: str) -> float:
+        hits, lookups = self.caches.get(cache, (0, 0))
+        return round(hits / lookups, 4) if lookups else 0.0
+
+    def percentile_ms(self, op: str, percentile: float) -> float:
+        return self.operations[op].percentile_ms(percentile)
+
+    def mean_ms(self, op: str) -> float:
+        return self.operations[op].mean_ms()
+
+    def output_tokens_per_second(self) -> float:
+        busy = self.first_token.total_seconds
+        return round(self.output_tokens / busy, 2) if busy else 0.0
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Percentiles for every operation that has run, plus provider-level counters"""
+        metrics: Dict[str, float] = {}
+        for op, histogram in self.operations.items():
+            if not histogram.count:
+                continue
+            metrics[f"{op}_calls"] = histogram.count
+            metrics[f"{op}_error_rate"] = round(self.errors[op] / histogram.count, 4)
+            for p in (50, 95, 99):
+                metrics[f"{op}_p{p}_ms"] = histogram.percentile_ms(p)
+        if self.first_token.count:
+            for p in (50, 95, 99):
+                metrics[f"ttft_p{p}_ms"] = self.first_token.percentile_ms(p)
+            metrics["input_tokens"] = self.input_tokens
+            metrics["output_tokens"] = self.output_tokens
+            metrics["output_tokens_per_second"] = self.output_tokens_per_second()
+        return metrics
+
+
+_registry: Dict[str, AgentTelemetry] = {}
+_registry_lock = threading.Lock()
+
+
+def get_telemetry(name: str) -> AgentTelemetry:
+    """Telemetry is kept per agent name so it survives Streamlit reruns"""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = AgentTelemetry(name)
+        return _registry[name]
+
+
+def all_telemetry() -> Dict[str, AgentTelemetry]:
+    with _registry_lock:
+        return dict(_registry)
+
+
+def usage_tokens(response: Any) -> "tuple[int, int]":
+    """(input, output) token counts from any of the supported SDK responses"""
+    if response is None:
+        return 0, 0
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        # OpenAI, Groq and Mistral use prompt/completion; Anthropic uses input/output.
+        return (
+            _as_int(getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", None)),
+            _as_int(getattr(usage, "completion_tokens", None) or getattr(usage, "output_tokens", None))
+        )
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        return (
+            _as_int(getattr(usage, "prompt_token_count", None)),
+            _as_int(getattr(usage, "candidates_token_count", None))
+        )
+    billed = getattr(getattr(response, "meta", None), "billed_units", None)
+    if billed is not None:
+        return _as_int(getattr(billed, "input_tokens", None)), _as_int(getattr(billed, "output_tokens", None))
+    if isinstance(response, dict) and isinstance(response.get("usage"), dict):
+        usage = response["usage"]
+        return _as_int(usage.get("input_tokens")), _as_int(usage.get("output_tokens"))
+    return 0, 0
+
+
+def _as_int(value: Optional[Any]) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
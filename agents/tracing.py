@@ -0,0 +1,117 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Innermost open span, so events can name their parent across awaits.
+_current_span: contextvars.ContextVar = contextvars.ContextVar("titans_span", default=None)
+
+
+class TraceRecorder:
+    """Collects spans as Chrome trace "complete" events (viewable in Perfetto / chrome://tracing)."""
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Dict[str, Any]] = []
+        self.started_at = 0.0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            self.events = []
+            self.started_at = time.perf_counter()
+            self.enabled = True
+
+    def stop(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self.enabled = False
+            events, self.events = self.events, []
+        return events
+
+    def add(self, event: Dict[str, Any]) -> None:
+        # list.append is atomic under the GIL, so worker threads need no lock here.
+        self.events.append(event)
+
+    def export(self, path: Path, events: Optional[List[Dict[str, Any]]] = None) -> Path:
+        """Write events as a Chrome trace JSON file"""
+        events = self.events if events is None else events
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "traceEvents": [
+                {"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": "Titans"}},
+                *events
+            ],
+            "displayTimeUnit": "ms"
+        }
+        path.write_text(json.dumps(payload, default=str), encoding="utf-8")
+        return path
+
+
+recorder = TraceRecorder()
+
+
+def _track_id() -> int:
+    """Async tasks get their own track so interleaved coroutines don't overlap on one row"""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return id(task) % 1_000_000_007
+    return threading.get_ident()
+
+
+@contextmanager
+def span(name: str, category: str = "titans", **args):
+    """Record a nested span while tracing is enabled; a no-op otherwise"""
+    if not recorder.enabled:
+        yield
+        return
+    parent = _current_span.get()
+    token = _current_span.set(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        finished = time.perf_counter()
+        _current_span.reset(token)
+        if parent is not None:
+            args["parent"] = parent
+        recorder.add({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (started - recorder.started_at) * 1_000_000,
+            "dur": (finished - started) * 1_000_000,
+            "pid": os.getpid(),
+            "tid": _track_id(),
+            "args": args
+        })
+
+
+def traced(name: Optional[str] = None, category: str = "helper"):
+    """Decorator recording a span around a sync or async function"""
+    def decorate(fn):
+        span_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, category):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -7,7 +7,14 @@ from agents.groq_agent import MemoryLayerAgent
 from agents.gemini_agent import ExperimentalAgent
 from agents.cohere_agent import InnovationsAgent
 from agents.emergence_agent import AnalysisAgent
-import asyncio
+from agents.race import race_interact
+from agents.metrics_exporter import start_metrics_server
+from agents.figures import build_figure, iter_figure_specs
+from agents.session_log import SessionLog, recording_enabled
+from agents.background import background_loop
+from agents.base_agent import AgentSession, in_session
+from agents.paper_index import context_passages, warm_paper_index
+from concurrent.futures import as_completed
 import os
 from dotenv import load_dotenv
 
@@ -27,8 +34,45 @@ class AgentManager:
             "Emergence (Analysis)": AnalysisAgent()
         }
 
-# Create agent manager instance
-agent_manager = AgentManager()
+# Agents and their provider clients are built once per process and shared by every session.
+@st.cache_resource
+def _agent_manager():
+    return AgentManager()
+
+agent_manager = _agent_manager()
+
+# Per-session agent state (session id, conversation memory) lives in st.session_state and is
+# put in place around each agent call with in_session, so users never see each other's history.
+if "agent_session" not in st.session_state:
+    st.session_state.agent_session = AgentSession()
+agent_session = st.session_state.agent_session
+
+# Agent coroutines run on one shared background loop, not on the script thread.
+runner = background_loop()
+
+# Optional Prometheus endpoint; set TITANS_METRICS_PORT to enable it.
+@st.cache_resource
+def _metrics_server():
+    return start_metrics_server()
+
+_metrics_server()
+
+# Build the paper index off the agents' shared loop; prompts go without passages until it is ready.
+if context_passages() > 0:
+    warm_paper_index()
+
+# One session log per browser session; results are appended as they arrive.
+if "session_log" not in st.session_state:
+    st.session_state.session_log = SessionLog() if recording_enabled() else None
+
+def record_result(label, agent_name, result):
+    log = st.session_state.session_log
+    if log is None:
+        return
+    try:
+        log.append(label, agent_name, result)
+    except Exception as e:
+        st.caption(f"Session recording failed: {str(e)}")
 
 # Set page config
 st.set_page_config(
@@ -52,6 +96,38 @@ selected_agent = st.sidebar.selectbox(
     list(agent_manager.agents.keys())
 )
 
+# Race mode: ask several agents at once and keep the fastest good answer
+st.sidebar.title("Race Mode")
+race_agents = st.sidebar.multiselect(
+    "Agents that race:",
+    list(agent_manager.agents.keys()),
+    default=list(agent_manager.agents.keys())
+)
+race_hedge = st.sidebar.checkbox(
+    "Hedge after p95 latency",
+    help="Start agents one at a time, adding the next only if the previous is slower than its p95."
+)
+
+# Replay a recorded session without calling any provider
+st.sidebar.title("Session Replay")
+replay_log = SessionLog()
+recorded_sessions = replay_log.sessions()
+replay_session = st.sidebar.selectbox(
+    "Recorded sessions:",
+    [None] + [s["session"] for s in recorded_sessions],
+    format_func=lambda s: "—" if s is None else next(
+        f"{r['session']} ({r['records']} results)" for r in recorded_sessions if r["session"] == s
+    )
+)
+if replay_session and st.sidebar.button("Load Session"):
+    st.header(f"⏪ Replay of {replay_session}")
+    for record in replay_log.replay(replay_session):
+        entry = record["entry"]
+        with st.expander(f"{entry['label']} — {entry.get('agent') or 'multiple agents'}", expanded=False):
+            for path, spec in iter_figure_specs(record["result"]):
+                st.plotly_chart(build_figure(spec), key=f"replay-{entry['seq']}-{path}")
+            st.write(record["result"])
+
 # Main content area
 col1, col2 = st.columns([2, 1])
 
@@ -66,14 +142,15 @@ with col1:
             try:
                 agent = agent_manager.agents[selected_agent]
                 # Run demonstration asynchronously
-                demo_result = asyncio.run(agent.demonstrate())
+                demo_result = runner.run(in_session(agent_session, agent.demonstrate()))
+                record_result("Demonstration", selected_agent, {"agent": selected_agent, "demonstration": demo_result})
                 
                 # Display demonstration results
                 st.subheader("📊 Demonstration Results")
                 
-                # Display visualizations if available
-                if "visualization" in demo_result:
-                    st.plotly_chart(go.Figure(demo_result["visualization"]))
+                # Agents return lightweight figure specs; build Plotly figures only to draw them
+                for path, spec in iter_figure_specs(demo_result):
+                    st.plotly_chart(build_figure(spec), key=f"demo-{path}")
                 
                 # Display metrics if available
                 if "metrics" in demo_result:
@@ -92,6 +169,29 @@ with col1:
             except Exception as e:
                 st.error(f"Error during demonstration: {str(e)}")
 
+    if st.button("Race Query"):
+        if not user_input.strip():
+            st.warning("Enter a query before racing.")
+        elif not race_agents:
+            st.warning("Select at least one agent in the sidebar.")
+        else:
+            with st.spinner("Racing agents..."):
+                try:
+                    contenders = {name: agent_manager.agents[name] for name in race_agents}
+                    race_result = runner.run(in_session(agent_session, race_interact(
+                        contenders, user_input, hedge="p95" if race_hedge else None
+                    )))
+                    record_result("Race", race_result["winner"], {"query": user_input, **race_result})
+                    if race_result["winner"]:
+                        st.subheader(f"🏁 {race_result['winner']} answered in {race_result['latency_s']:.2f}s")
+                        st.write(race_result["response"])
+                    else:
+                        st.error("No agent returned an answer.")
+                    if race_result["errors"]:
+                        st.caption("Failed: " + ", ".join(race_result["errors"]))
+                except Exception as e:
+                    st.error(f"Error during race: {str(e)}")
+
 with col2:
     st.header("📈 Live Metrics")
     
@@ -126,31 +226,41 @@ with col2:
 # Collaborative Insights Section
 st.header("🤝 Collaborative Insights")
 if st.button("Generate Collaborative Insights"):
-    with st.spinner("Generating insights..."):
-        try:
-            # Get the current agent
-            current_agent = agent_manager.agents[selected_agent]
-            
-            # Get demonstration results from current agent
-            demo_results = asyncio.run(current_agent.demonstrate())
-            
-            # Generate collaborative insights
-            insights = []
-            for other_name, other_agent in agent_manager.agents.items():
-                if other_name != selected_agent:
-                    insight = asyncio.run(other_agent.collaborate(demo_results))
-                    insights.append({
-                        "from_agent": other_name,
-                        "insight": insight
-                    })
-            
-            # Display insights
-            for insight in insights:
-                with st.expander(f"Insight from {insight['from_agent']}"):
-                    st.write(insight["insight"])
-                    
-        except Exception as e:
-            st.error(f"Error generating insights: {str(e)}")
+    try:
+        # Get the current agent
+        current_agent = agent_manager.agents[selected_agent]
+        
+        # Get demonstration results from current agent
+        with st.spinner("Running demonstration..."):
+            demo_results = runner.run(in_session(agent_session, current_agent.demonstrate()))
+        
+        # One placeholder per collaborator, filled in as each one finishes
+        others = [name for name in agent_manager.agents if name != selected_agent]
+        slots = {name: st.empty() for name in others}
+        for name, slot in slots.items():
+            slot.info(f"⏳ Waiting for {name}...")
+        futures = {
+            runner.submit(in_session(agent_session, agent_manager.agents[name].collaborate(demo_results))): name
+            for name in others
+        }
+        
+        insights = {}
+        for future in as_completed(futures):
+            name = futures[future]
+            with slots[name].container():
+                with st.expander(f"Insight from {name}"):
+                    try:
+                        insights[name] = {"from_agent": name, "insight": future.result()}
+                        st.write(insights[name]["insight"])
+                    except Exception as e:
+                        insights[name] = {"from_agent": name, "error": str(e)}
+                        st.error(f"Error from {name}: {str(e)}")
+        
+        record_result("Collaborative Insights", selected_agent,
+                      {"selected_agent": selected_agent, "insights": [insights[name] for name in others]})
+                
+    except Exception as e:
+        st.error(f"Error generating insights: {str(e)}")
 
 # Footer
 st.markdown("---")
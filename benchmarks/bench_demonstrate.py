@@ -0,0 +1,65 @@
+"""Benchmark demonstrate() latency with lazy figure specs versus eager Plotly figures.
+
+"lazy" is what agents do now: return Plotly-schema dicts. "eager" additionally
+builds and serializes a go.Figure for every spec, which is what each
+demonstration used to pay for on every call.
+
+    python benchmarks/bench_demonstrate.py --runs 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.figures import build_figure, iter_figure_specs
+from agents.registry import create_agents, load_agent_factories
+
+# demonstrate() never calls a provider, but the SDK clients refuse to construct without a key.
+PLACEHOLDER_KEYS = ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "MISTRAL_API_KEY", "GROQ_API_KEY",
+                    "GOOGLE_API_KEY", "COHERE_API_KEY", "CO_API_KEY")
+
+
+def _time_ms(fn, runs: int):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    for key in PLACEHOLDER_KEYS:
+        os.environ.setdefault(key, "benchmark-placeholder")
+    factories, import_errors = load_agent_factories()
+    agents, init_errors = create_agents(factories)
+    for name, reason in {**import_errors, **init_errors}.items():
+        print(f"skip {name}: {reason}")
+
+    print(f"{'agent':<30} {'lazy p50 ms':>12} {'eager p50 ms':>13} {'speedup':>8}")
+    for name, agent in agents.items():
+        def lazy():
+            return asyncio.run(agent.demonstrate())
+
+        def eager():
+            result = asyncio.run(agent.demonstrate())
+            for _path, spec in iter_figure_specs(result):
+                build_figure(spec).to_dict()
+
+        eager()  # warm up Plotly's validators once so the first agent isn't penalised
+        lazy_p50, _ = _time_ms(lazy, args.runs)
+        eager_p50, _ = _time_ms(eager, args.runs)
+        print(f"{name:<30} {lazy_p50:>12.2f} {eager_p50:>13.2f} {eager_p50 / lazy_p50:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
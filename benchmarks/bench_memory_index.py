@@ -0,0 +1,78 @@
+"""Benchmark recall@k against query latency for the memory key indexes.
+
+Keys are unit vectors drawn around random cluster centres, which is closer to
+real embeddings than uniform noise. Ground truth comes from ExactIndex.
+
+    python benchmarks/bench_memory_index.py --sizes 10000 100000 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.memory_index import ExactIndex, IVFIndex
+
+
+def clustered_keys(count: int, dim: int, rng: np.random.Generator, clusters: int = 1000) -> np.ndarray:
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+    keys = centres[rng.integers(0, clusters, count)] + 0.6 * rng.normal(size=(count, dim)).astype(np.float32)
+    return keys / np.linalg.norm(keys, axis=1, keepdims=True)
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(a) & set(b)) / k for a, b in zip(found, truth)]))
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'entries':>9} {'index':<18} {'build s':>8} {'ms/query':>9} {'recall@' + str(args.k):>10}")
+    for size in args.sizes:
+        keys = clustered_keys(size, args.dim, rng)
+        queries = keys[rng.integers(0, size, args.queries)] + 0.05 * rng.normal(size=(args.queries, args.dim))
+
+        exact = ExactIndex(args.dim)
+        _, build = timed(lambda: exact.add(keys))
+        (_, truth), elapsed = timed(lambda: exact.search(queries, args.k))
+        print(f"{size:>9} {'exact':<18} {build:>8.2f} {elapsed * 1000 / args.queries:>9.3f} {1.0:>10.3f}")
+
+        nlist = max(16, int(np.sqrt(size)))
+        ivf = IVFIndex(args.dim, nlist=nlist)
+        _, build = timed(lambda: ivf.add(keys))
+        for nprobe in args.nprobe:
+            if nprobe > nlist:
+                continue
+            (_, found), elapsed = timed(lambda: ivf.search(queries, args.k, nprobe=nprobe))
+            label = f"ivf{nlist} nprobe={nprobe}"
+            print(f"{size:>9} {label:<18} {build:>8.2f} {elapsed * 1000 / args.queries:>9.3f} "
+                  f"{recall_at_k(found, truth):>10.3f}")
+
+        # Incremental maintenance: forget 1% of entries, then write them back.
+        victims = rng.choice(size, max(1, size // 100), replace=False)
+        _, removed = timed(lambda: ivf.remove(victims))
+        _, added = timed(lambda: ivf.add(keys[victims], ids=victims))
+        print(f"{size:>9} {'ivf delete/insert':<18} {'':>8} "
+              f"{removed * 1e6 / len(victims):>7.1f}us /{added * 1e6 / len(victims):>6.1f}us per key")
+
+
+if __name__ == "__main__":
+    main()
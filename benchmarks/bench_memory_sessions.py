@@ -0,0 +1,75 @@
+"""Benchmark batched multi-session neural memory updates against one session at a time.
+
+Every round, each active session writes a chunk of tokens to its memory.
+"batched" advances all sessions in one SessionMemoryManager.step; "looped"
+calls step once per session, as serving sessions independently would. Also
+reports spill and restore cost per session.
+
+    python benchmarks/bench_memory_sessions.py --sessions 1 16 64 256 --tokens 8
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.neural_memory import SessionMemoryManager
+
+
+def make_manager(capacity: int, spill_dir: str, dim: int) -> SessionMemoryManager:
+    return SessionMemoryManager(capacity=capacity, dim=dim, spill_dir=spill_dir)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--tokens", type=int, default=8, help="Tokens per session per round")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'sessions':>8} {'looped tok/s':>13} {'batched tok/s':>14} {'speedup':>8} "
+          f"{'max diff':>9} {'spill ms':>9} {'restore ms':>11}")
+    for count in args.sessions:
+        with tempfile.TemporaryDirectory() as spill_dir:
+            ids = [f"session-{i}" for i in range(count)]
+            chunks = rng.normal(size=(args.rounds, count, args.tokens, args.dim)).astype(np.float32)
+            chunks /= np.linalg.norm(chunks, axis=-1, keepdims=True)
+
+            looped = make_manager(count, spill_dir, args.dim)
+            started = time.perf_counter()
+            for round_chunks in chunks:
+                for session_id, chunk in zip(ids, round_chunks):
+                    looped.step({session_id: chunk})
+            looped_seconds = time.perf_counter() - started
+
+            batched = make_manager(count, spill_dir, args.dim)
+            started = time.perf_counter()
+            for round_chunks in chunks:
+                batched.step(dict(zip(ids, round_chunks)))
+            batched_seconds = time.perf_counter() - started
+
+            difference = float(np.abs(looped.memory - batched.memory).max())
+            tokens = args.rounds * count * args.tokens
+
+            started = time.perf_counter()
+            for session_id in ids:
+                batched.evict(session_id)
+            spill = (time.perf_counter() - started) * 1000 / count
+            started = time.perf_counter()
+            for session_id in ids:
+                batched.admit(session_id)
+            restore = (time.perf_counter() - started) * 1000 / count
+
+            print(f"{count:>8} {tokens / looped_seconds:>13,.0f} {tokens / batched_seconds:>14,.0f} "
+                  f"{looped_seconds / batched_seconds:>7.1f}x {difference:>9.1e} {spill:>9.3f} {restore:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
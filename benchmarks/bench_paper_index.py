@@ -0,0 +1,88 @@
+"""Benchmark building and querying the Titans paper retrieval index.
+
+Reports build time by stage, index open time, per-query latency for BM25,
+embedding and hybrid scoring, and prompt size with retrieved passages against
+pasting the whole paper. --replicate indexes N copies of the paper to see how
+query latency grows with corpus size.
+
+    python benchmarks/bench_paper_index.py --replicate 1 10 100
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.paper_index import PAPER_PATH, PaperIndex, build_index, format_passages
+from agents.pdf_text import extract_pages
+
+QUERIES = [
+    "how does MAC work",
+    "what is the surprise metric",
+    "how does momentum affect memory updates",
+    "forgetting mechanism and weight decay",
+    "memory as a gate with sliding window attention",
+    "persistent memory tokens",
+    "needle in a haystack long context results",
+    "how is training parallelized with matmuls",
+    "deep memory MLP layers versus linear memory",
+    "comparison with Mamba and Transformers",
+]
+
+
+def approx_tokens(text: str) -> int:
+    return int(len(text.split()) * 1.3)
+
+
+def latency(fn, queries, repeat: int) -> np.ndarray:
+    samples = []
+    for _ in range(repeat):
+        for query in queries:
+            started = time.perf_counter()
+            fn(query)
+            samples.append(time.perf_counter() - started)
+    return np.array(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf", default=str(PAPER_PATH))
+    parser.add_argument("--replicate", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the query set per measurement")
+    parser.add_argument("-k", type=int, default=3)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    pages = extract_pages(args.pdf)
+    print(f"extract: {len(pages)} pages in {time.perf_counter() - started:.2f}s")
+
+    print(f"{'copies':>6} {'passages':>8} {'build s':>8} {'open ms':>8} "
+          f"{'bm25 p50':>9} {'dense p50':>10} {'hybrid p50':>11} {'hybrid p95':>11}")
+    for copies in args.replicate:
+        with tempfile.TemporaryDirectory() as directory:
+            started = time.perf_counter()
+            meta = build_index(args.pdf, directory, pages=pages * copies)
+            build = time.perf_counter() - started
+            started = time.perf_counter()
+            index = PaperIndex(directory)
+            opened = (time.perf_counter() - started) * 1000
+            bm25 = latency(index.bm25, QUERIES, args.repeat)
+            dense = latency(index.dense, QUERIES, args.repeat)
+            hybrid = latency(lambda query: index.search(query, args.k), QUERIES, args.repeat)
+            print(f"{copies:>6} {meta['passages']:>8} {build:>8.2f} {opened:>8.1f} "
+                  f"{np.percentile(bm25, 50):>9.3f} {np.percentile(dense, 50):>10.3f} "
+                  f"{np.percentile(hybrid, 50):>11.3f} {np.percentile(hybrid, 95):>11.3f}")
+            if copies == args.replicate[0]:
+                context = [approx_tokens(format_passages(index.search(query, args.k))) for query in QUERIES]
+
+    paper = approx_tokens(" ".join(pages))
+    print(f"\nprompt context: {np.mean(context):.0f} tokens per request with top-{args.k} passages "
+          f"vs {paper} tokens to paste the whole paper ({paper / np.mean(context):.0f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Benchmark adaptive memory pruning: bytes reclaimed, latency and recall per strategy.
+
+Each configuration builds the same workload (agents/memory_experiments.py):
+a MemoryStore of memories with mixed strength and last use, and needle
+sessions, half already spilled and half idle. It runs one MemoryPruner pass.
+Reports bytes before and after for each target, probe latency (key search,
+spill restore), and needle and pattern recall once sessions are restored.
+
+    python benchmarks/bench_pruning.py --strategies low_rank magnitude --energies 0.9 0.99
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.memory_experiments import pruning_experiment
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--strategies", nargs="+", default=["off", "low_rank", "magnitude"])
+    parser.add_argument("--energies", type=float, nargs="+", default=[0.9, 0.99])
+    parser.add_argument("--memories", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'strategy':>9} {'energy':>6} {'target':>16} {'pruned':>7} {'MiB before':>10} {'MiB after':>10} "
+          f"{'reclaimed':>9} {'probe ms':>15} {'needle':>13} {'pattern':>13}")
+    for strategy in args.strategies:
+        for energy in args.energies if strategy != "off" else args.energies[:1]:
+            report = pruning_experiment(args.memories, args.sessions, args.rounds, strategy=strategy,
+                                        energy=energy, seed=args.seed)
+            recall = (f"{report['needle_recall_before']:.3f}>{report['needle_recall_after']:.3f}",
+                      f"{report['pattern_recall_before']:.3f}>{report['pattern_recall_after']:.3f}")
+            for target in report["targets"]:
+                share = target["bytes_reclaimed"] / target["bytes_before"] if target["bytes_before"] else 0.0
+                session = target["target"].startswith("session")
+                print(f"{strategy:>9} {energy:>6.2f} {target['target']:>16} {target['items_pruned']:>7} "
+                      f"{target['bytes_before'] / 2 ** 20:>10.2f} {target['bytes_after'] / 2 ** 20:>10.2f} "
+                      f"{share:>9.1%} {target['probe_ms_before']:>7.2f}>{target['probe_ms_after']:<7.2f} "
+                      f"{recall[0] if session else '':>13} {recall[1] if session else '':>13}")
+
+
+if __name__ == "__main__":
+    main()
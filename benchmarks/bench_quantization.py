@@ -0,0 +1,116 @@
+"""Benchmark float16 and int8 memory storage against float32 on needle-in-a-haystack recall.
+
+Two needle tasks, run at every precision from identical inputs:
+
+- session memory: each session writes a haystack of random tokens, one of
+  which is the needle, through SessionMemoryManager. Recall reads the memory
+  with the needle's key and succeeds when the closest stored value is the
+  needle's.
+- memory keys: haystack keys go into an ExactIndex; queries are noisy copies
+  of the needles and succeed when the needle ranks first.
+
+Reports stored bytes per token, recall, its change against float32, and how
+far the stored memory drifts from the float32 one.
+
+    python benchmarks/bench_quantization.py --rounds 10 40 160 --keys 100000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.memory_index import ExactIndex
+from agents.neural_memory import SessionMemoryManager
+from agents.quantization import PRECISIONS, dequantize
+
+
+def unit(rng: np.random.Generator, shape) -> np.ndarray:
+    vectors = rng.normal(size=shape).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def session_needles(args, rounds: int, rng: np.random.Generator):
+    """Per precision: (bytes per token, recall, relative drift from float32, seconds per step)"""
+    chunks = unit(rng, (rounds, args.sessions, args.tokens, args.dim))
+    needle_round = rng.integers(0, rounds, size=args.sessions)
+    needles = chunks[needle_round, np.arange(args.sessions), 0]
+    ids = [f"session-{i}" for i in range(args.sessions)]
+    results, reference = {}, None
+    with tempfile.TemporaryDirectory() as spill_dir:
+        for precision in PRECISIONS:
+            manager = SessionMemoryManager(capacity=args.sessions, dim=args.dim, spill_dir=spill_dir,
+                                           precision=precision)
+            started = time.perf_counter()
+            for round_chunks in chunks:
+                manager.step(dict(zip(ids, round_chunks)))
+            step_seconds = (time.perf_counter() - started) / rounds
+            slots = np.array([manager.admit(session_id) for session_id in ids])
+            memory = dequantize(manager.memory[slots], manager.memory_scale[slots])
+            recalled = np.einsum("bvk,bk->bv", memory, needles @ manager.w_key)
+            values = chunks.transpose(1, 0, 2, 3).reshape(args.sessions, -1, args.dim) @ manager.w_value
+            similarity = np.einsum("bv,bnv->bn", recalled, values) / np.linalg.norm(values, axis=-1)
+            recall = float((similarity.argmax(axis=1) == needle_round * args.tokens).mean())
+            reference = memory if reference is None else reference
+            drift = float(np.abs(memory - reference).max() / np.abs(reference).max())
+            results[precision] = (manager.bytes_per_session / (rounds * args.tokens), recall, drift, step_seconds)
+    return results
+
+
+def key_needles(args, rng: np.random.Generator):
+    """Per precision: (bytes per key, recall@1, top-1 agreement with float32, seconds per query batch)"""
+    haystack = unit(rng, (args.keys, args.key_dim))
+    needle_ids = rng.choice(args.keys, args.queries, replace=False)
+    queries = haystack[needle_ids] + args.noise * unit(rng, (args.queries, args.key_dim))
+    results, reference = {}, None
+    for precision in PRECISIONS:
+        index = ExactIndex(args.key_dim, precision=precision)
+        index.add(haystack)
+        started = time.perf_counter()
+        _, ids = index.search(queries, k=1)
+        seconds = time.perf_counter() - started
+        reference = ids[:, 0] if reference is None else reference
+        results[precision] = (index.nbytes / len(index), float((ids[:, 0] == needle_ids).mean()),
+                              float((ids[:, 0] == reference).mean()), seconds)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 40, 160],
+                        help="Haystack lengths, in chunks written per session")
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--tokens", type=int, default=8, help="Tokens per chunk")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--keys", type=int, default=100_000, help="Haystack size for the key task")
+    parser.add_argument("--key-dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--noise", type=float, default=3.0, help="Norm of the noise added to needle queries")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    print(f"session memory: {args.sessions} sessions, {args.tokens} tokens per chunk")
+    print(f"{'tokens':>7} {'precision':>9} {'bytes/token':>12} {'recall':>7} {'delta':>7} {'drift':>8} {'step ms':>8}")
+    for rounds in args.rounds:
+        results = session_needles(args, rounds, rng)
+        baseline = results["float32"][1]
+        for precision, (per_token, recall, drift, seconds) in results.items():
+            print(f"{rounds * args.tokens:>7} {precision:>9} {per_token:>12.1f} {recall:>7.3f} "
+                  f"{recall - baseline:>+7.3f} {drift:>8.1e} {seconds * 1000:>8.2f}")
+
+    print(f"\nmemory keys: {args.keys:,} keys of dim {args.key_dim}, {args.queries} needle queries")
+    print(f"{'precision':>9} {'bytes/key':>10} {'recall@1':>9} {'delta':>7} {'agree':>6} {'search ms':>10}")
+    results = key_needles(args, rng)
+    baseline = results["float32"][1]
+    for precision, (per_key, recall, agreement, seconds) in results.items():
+        print(f"{precision:>9} {per_key:>10.1f} {recall:>9.3f} {recall - baseline:>+7.3f} "
+              f"{agreement:>6.3f} {seconds * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark saving and reloading a large benchmark run: JSON versus the binary envelope.
+
+    python benchmarks/bench_serialization.py --records 2000 --points 2000
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.envelope import load_result, save_result, to_jsonable
+
+
+def make_run(records: int, points: int):
+    rng = np.random.default_rng(0)
+    return {
+        "mode": "demonstrate",
+        "results": [
+            {
+                "id": f"job-{i}",
+                "agent": "Gemini (Experimental)",
+                "latency_s": float(rng.random()),
+                "result": {
+                    "sequence_length": np.logspace(3, 6, points),
+                    "processing_time": rng.random(points),
+                    "activation_pattern": rng.normal(0.5, 0.1, size=(16, points // 16)),
+                },
+            }
+            for i in range(records)
+        ],
+    }
+
+
+def timed(fn):
+    started = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--points", type=int, default=2000)
+    args = parser.parse_args()
+
+    run = make_run(args.records, args.points)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "run.json"
+        ttns_path = Path(tmp) / "run.ttns"
+
+        _, json_save = timed(lambda: json_path.write_text(json.dumps(run, default=to_jsonable)))
+        _, json_load = timed(lambda: json.loads(json_path.read_text()))
+        _, ttns_save = timed(lambda: save_result(ttns_path, run))
+        loaded, ttns_load = timed(lambda: load_result(ttns_path))
+        # Touch every array so lazily mapped pages are counted too.
+        _, ttns_touch = timed(lambda: sum(float(r["result"]["processing_time"].sum()) for r in loaded["results"]))
+
+        print(f"{'format':<10} {'size MB':>9} {'save s':>8} {'load s':>8}")
+        print(f"{'json':<10} {json_path.stat().st_size / 1e6:>9.1f} {json_save:>8.3f} {json_load:>8.3f}")
+        print(f"{'envelope':<10} {ttns_path.stat().st_size / 1e6:>9.1f} {ttns_save:>8.3f} "
+              f"{ttns_load + ttns_touch:>8.3f}")
+        print(f"speedup: save {json_save / ttns_save:.1f}x, load {json_load / (ttns_load + ttns_touch):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Measure data-parallel memory training across 1, 2, 4 and 8 worker processes.
+
+Trains one memory on a synthetic token stream (recurring patterns plus noise)
+with train_sharded, in both modes:
+
+- gradients: all-reduce of each step's gradient. Checked against a serial
+  replica stepping on chunks `workers` times as long, which it should match
+  to float32 rounding.
+- weights: local steps with memory and momentum averaged every --sync-every
+  steps. Compared by reconstruction loss, since it is a different update.
+
+Reports tokens per second, speedup and scaling efficiency (speedup / workers)
+against one worker, the share of time spent exchanging, and the logical CPU
+count: workers beyond it share cores, so efficiency there says nothing about
+the all-reduce. Set OMP_NUM_THREADS=1 so each worker's BLAS stays on one core.
+
+    python benchmarks/bench_sharded_memory.py --workers 1 2 4 8 --tokens 262144
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.distributed_memory import reconstruction_loss, train_serial, train_sharded
+from agents.memory_experiments import needle_stream
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--tokens", type=int, default=262_144, help="Length of the token stream")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--chunk", type=int, default=256, help="Tokens per worker per step")
+    parser.add_argument("--sync-every", type=int, default=8, help="Local steps between weight averages")
+    parser.add_argument("--modes", nargs="+", default=["gradients", "weights"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stream = needle_stream(1, 1, args.tokens, args.dim, seed=args.seed)["stream"].reshape(-1, args.dim)
+    print(f"{args.tokens:,} tokens of dim {args.dim}, {args.chunk} tokens per worker per step, "
+          f"{os.cpu_count()} logical CPUs")
+    print(f"{'mode':>9} {'workers':>7} {'tok/s':>11} {'speedup':>8} {'effic.':>7} {'sync %':>7} "
+          f"{'syncs':>6} {'loss':>8} {'max diff':>9}")
+    for mode in args.modes:
+        baseline = None
+        for workers in args.workers:
+            result = train_sharded(stream, workers, args.chunk, mode, args.sync_every, seed=args.seed)
+            baseline = baseline or result["tokens_per_second"]
+            speedup = result["tokens_per_second"] / baseline
+            loss = reconstruction_loss(result["memory"], stream, seed=args.seed)
+            if mode == "gradients":
+                reference = train_serial(stream, workers * args.chunk, seed=args.seed)
+                diff = f"{np.abs(result['memory'] - reference).max():>9.1e}"
+            else:
+                diff = f"{'-':>9}"
+            print(f"{mode:>9} {workers:>7} {result['tokens_per_second']:>11,.0f} {speedup:>7.2f}x "
+                  f"{speedup / workers:>7.2f} {100 * result['sync_share']:>6.1f}% {result['syncs']:>6} "
+                  f"{loss:>8.4f} {diff}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Measure per-worker memory with private versus shared (mmap-backed) state.
+
+Starts N worker processes that each attach a SessionMemoryManager, touch
+every slab page and open the paper index, then hold still while their
+memory is read from /proc (Linux). With --shared the slabs are mapped from
+cache files, so they count once in PSS rather than once per worker.
+Also checks that concurrent writers to one semantic cache never lose or
+misalign entries.
+
+    python benchmarks/bench_shared_state.py --workers 1 2 4 --capacity 2048
+"""
+import argparse
+import multiprocessing as mp
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.neural_memory import SessionMemoryManager
+from agents.paper_index import get_paper_index
+from agents.semantic_cache import SemanticCache
+
+
+def memory_kb() -> dict:
+    """Rss, Pss and private bytes of this process in KiB (Linux only)"""
+    try:
+        with open("/proc/self/smaps_rollup") as handle:
+            fields = dict(line.split(":", 1) for line in handle if ":" in line)
+    except OSError:
+        return {}
+    value = lambda name: int(fields.get(name, "0 kB").split()[0])
+    return {"rss": value("Rss"), "pss": value("Pss"),
+            "private": value("Private_Clean") + value("Private_Dirty")}
+
+
+def worker(shared: bool, capacity: int, directory: str, ready, release, results) -> None:
+    manager = SessionMemoryManager(capacity=capacity, shared=shared, shared_dir=directory,
+                                   spill_dir=f"{directory}/spill")
+    # Touch every page, as serving traffic across all slots eventually would.
+    manager.memory += 0.0
+    manager.momentum += 0.0
+    manager.step({f"{mp.current_process().name}-{i}": np.ones(manager.dim) for i in range(8)})
+    get_paper_index()
+    ready.wait()
+    results.put(memory_kb())
+    release.wait()
+
+
+def cache_writer(directory: str, writer: int, entries: int) -> None:
+    cache = SemanticCache("bench", directory=directory, audit_rate=0.0)
+    for i in range(entries):
+        cache.store(f"writer {writer} question {i} about surprise", f"answer {writer}-{i}")
+
+
+def run_workers(count: int, shared: bool, capacity: int) -> list:
+    context = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        ready, release = context.Barrier(count + 1), context.Barrier(count + 1)
+        results = context.Queue()
+        processes = [context.Process(target=worker, args=(shared, capacity, directory, ready, release, results))
+                     for _ in range(count)]
+        for process in processes:
+            process.start()
+        ready.wait()
+        samples = [results.get() for _ in processes]
+        release.wait()
+        for process in processes:
+            process.join()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--capacity", type=int, default=2048, help="Session slots per manager")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--entries", type=int, default=200, help="Cache entries per writer")
+    args = parser.parse_args()
+
+    slab_mb = args.capacity * 64 * 64 * 4 * 2 / 2 ** 20
+    print(f"session slabs: {slab_mb:.0f} MiB per manager\n")
+    print(f"{'workers':>7} {'mode':<8} {'sum RSS MiB':>12} {'sum PSS MiB':>12} {'private/worker MiB':>19}")
+    for count in args.workers:
+        for shared in (False, True):
+            samples = run_workers(count, shared, args.capacity)
+            if not all(samples):
+                print("per-process memory needs /proc/self/smaps_rollup (Linux)")
+                break
+            rss = sum(sample["rss"] for sample in samples) / 1024
+            pss = sum(sample["pss"] for sample in samples) / 1024
+            private = np.mean([sample["private"] for sample in samples]) / 1024
+            print(f"{count:>7} {'shared' if shared else 'private':<8} {rss:>12.0f} {pss:>12.0f} {private:>19.0f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        context = mp.get_context("spawn")
+        writers = [context.Process(target=cache_writer, args=(directory, writer, args.entries))
+                   for writer in range(args.writers)]
+        for process in writers:
+            process.start()
+        for process in writers:
+            process.join()
+        cache = SemanticCache("bench", directory=directory, audit_rate=0.0)
+        found = sum(cache.lookup(f"writer {writer} question {i} about surprise")["answer"] == f"answer {writer}-{i}"
+                    for writer in range(args.writers) for i in range(0, args.entries, 10))
+        checked = args.writers * len(range(0, args.entries, 10))
+        print(f"\nconcurrent cache writers: {len(cache.vectors)}/{args.writers * args.entries} entries, "
+              f"{found}/{checked} sampled lookups return their own answer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Benchmark surprise-thresholded sparse memory updates against dense updates.
+
+Sessions write a needle stream (recurring background patterns plus one novel
+needle each, see agents/memory_experiments.py) at each surprise threshold.
+Threshold 0 writes every token and is the baseline. Reports the fraction of
+tokens and session updates skipped, throughput, and recall of the needles
+and of the background patterns, each against the baseline. The learning rate
+defaults to the chunk length and momentum to 0.5, where dense updates store
+the needles (see threshold_sweep).
+
+    python benchmarks/bench_sparse_updates.py --thresholds 0 0.1 0.2 0.25 0.3 --sessions 64
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.memory_experiments import threshold_sweep
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.0, 0.1, 0.2, 0.25, 0.3])
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=100, help="Chunks written per session")
+    parser.add_argument("--tokens", type=int, default=8, help="Tokens per chunk")
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--lr", type=float, help="Memory learning rate (default: --tokens)")
+    parser.add_argument("--momentum", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = threshold_sweep(args.thresholds, args.sessions, args.rounds, args.tokens, args.dim, args.seed,
+                              args.repeats, args.lr, args.momentum)
+    print(f"{'threshold':>9} {'tok skip':>9} {'upd skip':>9} {'tok/s':>10} {'speedup':>8} "
+          f"{'needle':>7} {'delta':>7} {'pattern':>8} {'delta':>7}")
+    for r in results:
+        print(f"{r['threshold']:>9.2f} {r['tokens_skipped']:>9.3f} {r['updates_skipped']:>9.3f} "
+              f"{r['tokens_per_second']:>10,.0f} {r['speedup']:>7.2f}x {r['needle_recall']:>7.3f} "
+              f"{r['needle_recall_delta']:>+7.3f} {r['pattern_recall']:>8.3f} {r['pattern_recall_delta']:>+7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""Load test the agent layer with many concurrent simulated app sessions.
+
+Each session runs on its own thread, like a Streamlit session's script
+thread, and repeats what app.py does per click: run the selected agent's
+demonstration, collect collaborative insights from every other agent, then
+send one query through interact(). As in app.py, the agents are built once
+and shared by every session, each session has its own AgentSession
+(conversation memory and session id), and agent coroutines are submitted to
+the shared background loop inside in_session.
+
+    python benchmarks/load_test.py --mock --sessions 50 --iterations 3
+    python benchmarks/load_test.py --mock --latency lognormal:400,0.6 --rate-limit-rate 0.05 --json load.json
+    TITANS_MOCK_PROVIDER_URL=http://127.0.0.1:8900 python benchmarks/load_test.py --sessions 200
+
+--mock starts agents/mock_provider.py in-process. Without it (or
+TITANS_MOCK_PROVIDER_URL), queries go to the real providers.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.background import background_loop
+from agents.base_agent import AgentSession, in_session
+from agents.mock_provider import MockSettings, start_mock_server
+from agents.provider_client import DEFAULT_LIMITS
+from agents.registry import create_agents, load_agent_factories
+from agents.telemetry import LatencyHistogram, all_telemetry
+
+ACTIONS = ("demonstrate", "collaborate", "interact", "click")
+SCENARIOS = ("insights", "query", "mixed")
+
+QUERIES = (
+    "How does the surprise metric decide what to memorize?",
+    "Compare memory as context with memory as gate.",
+    "What does weight decay do to long-term memory?",
+    "Why does momentum help test-time memory updates?",
+    "How do Titans scale past two million tokens?",
+    "What is persistent memory in the Titans architecture?",
+)
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        # ru_maxrss is a high-water mark (KiB on Linux, bytes on macOS); close enough where /proc is missing.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def provider_calls() -> int:
+    return sum(t.provider_calls for t in all_telemetry().values())
+
+
+class LoadStats:
+    def __init__(self):
+        self.latency = {action: LatencyHistogram() for action in ACTIONS}
+        self.errors = {action: 0 for action in ACTIONS}
+        self.error_samples: List[str] = []
+        self._lock = threading.Lock()
+
+    def failed(self, action: str, reason: str) -> None:
+        with self._lock:
+            self.errors[action] += 1
+            if len(self.error_samples) < 5:
+                self.error_samples.append(f"{action}: {reason}")
+
+    def timed(self, action: str, fn, started: Optional[float] = None):
+        started = time.perf_counter() if started is None else started
+        try:
+            return fn()
+        except Exception as exc:
+            self.failed(action, f"{type(exc).__name__}: {exc}")
+            return None
+        finally:
+            with self._lock:
+                self.latency[action].record(time.perf_counter() - started)
+
+
+def run_session(session_id: int, args, agents: Dict[str, Any], stats: LoadStats) -> None:
+    rng = random.Random(args.seed + session_id)
+    runner = background_loop()
+    session = AgentSession()
+    names = list(agents)
+    if not names:
+        stats.failed("click", "no agents available")
+        return
+    for _ in range(args.iterations):
+        click_started = time.perf_counter()
+        selected = rng.choice(names)
+        scenario = args.scenario if args.scenario != "mixed" else rng.choice(("insights", "query"))
+
+        if scenario == "insights":
+            demo = stats.timed("demonstrate", lambda: runner.run(in_session(session, agents[selected].demonstrate())))
+            if demo is not None:
+                submitted = time.perf_counter()
+                futures = [runner.submit(in_session(session, other.collaborate(demo)))
+                           for other_name, other in agents.items() if other_name != selected]
+                for future in as_completed(futures):
+                    # Latency is time until this collaborator's expander can be filled in.
+                    stats.timed("collaborate", future.result, started=submitted)
+        else:
+            query = QUERIES[rng.randrange(min(args.distinct_queries, len(QUERIES)))]
+            stats.timed("interact", lambda: runner.run(in_session(session, agents[selected].interact(query))))
+
+        stats.latency["click"].record(time.perf_counter() - click_started)
+        if args.think_ms:
+            time.sleep(rng.expovariate(1000.0 / args.think_ms))
+
+
+def _set_provider_limits(rps: float) -> None:
+    for provider in DEFAULT_LIMITS:
+        prefix = f"TITANS_{provider.upper()}_"
+        os.environ[prefix + "RPS"] = str(rps)
+        os.environ[prefix + "BURST"] = str(max(1, int(rps)))
+        os.environ[prefix + "CONCURRENCY"] = str(max(1, int(rps)))
+
+
+def _mock_stats(url: str) -> Optional[Dict[str, Any]]:
+    import urllib.request
+    try:
+        with urllib.request.urlopen(f"{url}/stats", timeout=5) as response:
+            return json.load(response)
+    except Exception:
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent simulated sessions")
+    parser.add_argument("--iterations", type=int, default=3, help="Clicks per session")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mixed",
+                        help="insights = demonstrate + collaborate, query = interact, mixed = either per click")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean pause between clicks")
+    parser.add_argument("--distinct-queries", type=int, default=len(QUERIES),
+                        help="Draw queries from this many prompts; fewer means more coalescing")
+    parser.add_argument("--provider-rps", type=float,
+                        help="Override every provider's client-side rate and concurrency limit")
+    parser.add_argument("--mock", action="store_true", help="Start the mock providers in-process")
+    parser.add_argument("--latency", default="lognormal:300,0.5", help="Mock latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock HTTP 500 rate")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Mock HTTP 429 rate")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Also report Python heap growth (slows the run down)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    if args.mock:
+        server = start_mock_server(settings=MockSettings(
+            latency=args.latency, error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate, seed=args.seed
+        ))
+        os.environ["TITANS_MOCK_PROVIDER_URL"] = server.url
+    mock_url = os.getenv("TITANS_MOCK_PROVIDER_URL")
+    if not mock_url:
+        print("warning: TITANS_MOCK_PROVIDER_URL is not set; queries go to the real providers", file=sys.stderr)
+    if args.provider_rps:
+        _set_provider_limits(args.provider_rps)
+
+    factories, import_errors = load_agent_factories()
+    for name, reason in import_errors.items():
+        print(f"skip {name}: {reason}", file=sys.stderr)
+    agents, init_errors = create_agents(factories)
+    for name, reason in init_errors.items():
+        print(f"skip {name}: {reason}", file=sys.stderr)
+
+    # One warm-up session so imports and first-use caches don't count as per-session growth.
+    run_session(-1, argparse.Namespace(**{**vars(args), "iterations": 1}), agents, LoadStats())
+    gc.collect()
+    if args.tracemalloc:
+        tracemalloc.start()
+    rss_before = rss_bytes()
+    heap_before = tracemalloc.get_traced_memory()[0] if args.tracemalloc else 0
+    calls_before = provider_calls()
+    mock_before = _mock_stats(mock_url) if mock_url else None
+
+    stats = LoadStats()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions, thread_name_prefix="session") as pool:
+        for future in [pool.submit(run_session, i, args, agents, stats)
+                       for i in range(args.sessions)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    rss_growth = rss_bytes() - rss_before
+    heap_growth = tracemalloc.get_traced_memory()[0] - heap_before if args.tracemalloc else None
+    if args.tracemalloc:
+        tracemalloc.stop()
+    mock_after = _mock_stats(mock_url) if mock_url else None
+
+    clicks = stats.latency["click"].count
+    report = {
+        "sessions": args.sessions,
+        "iterations": args.iterations,
+        "scenario": args.scenario,
+        "elapsed_s": round(elapsed, 3),
+        "clicks_per_s": round(clicks / elapsed, 2) if elapsed else 0.0,
+        "actions": {
+            action: {
+                "count": histogram.count,
+                "errors": stats.errors[action],
+                "p50_ms": histogram.percentile_ms(50),
+                "p95_ms": histogram.percentile_ms(95),
+                "p99_ms": histogram.percentile_ms(99),
+                "max_ms": round(histogram.max_seconds * 1000, 3)
+            }
+            for action, histogram in stats.latency.items() if histogram.count or stats.errors[action]
+        },
+        "rss_growth_mb": round(rss_growth / 2**20, 2),
+        "rss_growth_per_session_kb": round(rss_growth / 1024 / args.sessions, 1),
+        "heap_growth_per_session_kb": round(heap_growth / 1024 / args.sessions, 1) if heap_growth is not None else None,
+        "provider_calls": provider_calls() - calls_before,
+        "provider_calls_by_agent": {name: t.provider_calls for name, t in all_telemetry().items()},
+        "error_samples": stats.error_samples
+    }
+    if mock_before is not None and mock_after is not None:
+        report["mock_requests"] = mock_after["total_requests"] - mock_before["total_requests"]
+        report["mock_rate_limited"] = sum(mock_after["rate_limited"].values()) - sum(mock_before["rate_limited"].values())
+        report["mock_max_in_flight"] = mock_after["max_in_flight"]
+
+    print(f"{args.sessions} sessions x {args.iterations} clicks ({args.scenario}) in {elapsed:.2f}s "
+          f"-> {report['clicks_per_s']} clicks/s")
+    print(f"{'action':<12} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for action, row in report["actions"].items():
+        print(f"{action:<12} {row['count']:>7} {row['errors']:>7} {row['p50_ms']:>9.1f} "
+              f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+    print(f"RSS growth: {report['rss_growth_mb']} MB ({report['rss_growth_per_session_kb']} KB/session)"
+          + (f", Python heap {report['heap_growth_per_session_kb']} KB/session" if heap_growth is not None else ""))
+    print(f"Provider calls: {report['provider_calls']}"
+          + (f" (mock saw {report['mock_requests']} requests, {report['mock_rate_limited']} rate limited, "
+             f"max {report['mock_max_in_flight']} in flight)" if "mock_requests" in report else ""))
+    for sample in stats.error_samples:
+        print(f"  error: {sample}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
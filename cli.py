@@ -0,0 +1,202 @@
+"""Headless batch runner for Titans agents.
+
+Examples:
+  python cli.py list
+  python cli.py demonstrate --agents all --output demos.jsonl
+  python cli.py interact --input queries.jsonl --parallelism 8 --output answers.jsonl
+  python cli.py collaborate --agents "OpenAI (Neural Memory)" --output insights.jsonl
+  python cli.py demonstrate --repeat 100 --output run.ttns   # binary envelope, see agents/envelope.py
+
+Input JSONL lines look like {"id": "q1", "query": "...", "agent": "optional display name"}.
+Lines without "agent" are sent to every selected agent. Conversation memory
+is off: every job is answered as a fresh question.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+from dotenv import load_dotenv
+
+from agents.conversation_memory import ConversationMemory
+from agents.envelope import save_result, to_jsonable
+from agents.paper_index import context_passages, get_paper_index
+from agents.registry import create_agents, load_agent_factories
+
+MODES = ("demonstrate", "interact", "collaborate")
+
+
+def _select_agents(agents: Dict[str, Any], names: str) -> Dict[str, Any]:
+    if names.strip().lower() == "all":
+        return agents
+    selected = {}
+    for name in (n.strip() for n in names.split(",") if n.strip()):
+        if name not in agents:
+            raise SystemExit(f"Unknown or unavailable agent: {name}")
+        selected[name] = agents[name]
+    return selected
+
+
+def _read_jsonl(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise SystemExit(f"Invalid JSON on input line {line_no}: {exc}")
+        if isinstance(record, str):
+            record = {"query": record}
+        elif not isinstance(record, dict):
+            raise SystemExit(f"Input line {line_no} must be a JSON object or string, got {type(record).__name__}")
+        record.setdefault("id", f"line-{line_no}")
+        yield record
+
+
+def _build_jobs(mode: str, agents: Dict[str, Any], records: List[Dict[str, Any]],
+                repeat: int) -> List[Dict[str, Any]]:
+    jobs = []
+    for iteration in range(repeat):
+        if mode == "interact":
+            for record in records:
+                if not record.get("query"):
+                    raise SystemExit(f"Input record {record['id']} has no \"query\"")
+                targets = [record["agent"]] if record.get("agent") else list(agents)
+                for name in targets:
+                    jobs.append({"id": record["id"], "agent": name, "query": record["query"],
+                                 "iteration": iteration})
+        else:
+            for name in agents:
+                jobs.append({"id": f"{mode}-{name}", "agent": name, "iteration": iteration})
+    return jobs
+
+
+async def _run_job(mode: str, job: Dict[str, Any], agents: Dict[str, Any],
+                   collaborators: Dict[str, Any]) -> Dict[str, Any]:
+    agent = agents.get(job["agent"])
+    started = time.perf_counter()
+    record = {"mode": mode, **job}
+    try:
+        if agent is None:
+            raise RuntimeError(f"Agent is unavailable: {job['agent']}")
+        if mode == "demonstrate":
+            record["result"] = await agent.demonstrate()
+        elif mode == "interact":
+            record["result"] = await agent.interact(job["query"])
+        else:
+            demo_result = await agent.demonstrate()
+            insights = []
+            for name, other in collaborators.items():
+                if name == job["agent"]:
+                    continue
+                try:
+                    insights.append({"from_agent": name, "insight": await other.collaborate(demo_result)})
+                except Exception as exc:
+                    insights.append({"from_agent": name, "error": str(exc)})
+            record["result"] = {"selected_agent": job["agent"], "insights": insights}
+        record["ok"] = True
+    except Exception as exc:
+        record["ok"] = False
+        record["error"] = f"{type(exc).__name__}: {exc}"
+    record["latency_s"] = round(time.perf_counter() - started, 4)
+    return record
+
+
+async def run_batch(mode: str, jobs: List[Dict[str, Any]], agents: Dict[str, Any],
+                    collaborators: Dict[str, Any], parallelism: int,
+                    output: Optional[TextIO], collected: Optional[List[Dict[str, Any]]] = None) -> Dict[str, int]:
+    """Run jobs with bounded concurrency, writing each result as soon as it finishes"""
+    semaphore = asyncio.Semaphore(max(1, parallelism))
+    counts = {"ok": 0, "failed": 0}
+
+    async def bounded(job):
+        async with semaphore:
+            record = await _run_job(mode, job, agents, collaborators)
+        if output is not None:
+            output.write(json.dumps(record, default=to_jsonable) + "\n")
+            output.flush()
+        if collected is not None:
+            collected.append(record)
+        counts["ok" if record["ok"] else "failed"] += 1
+
+    await asyncio.gather(*(bounded(job) for job in jobs))
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run Titans agents without a display.")
+    parser.add_argument("mode", choices=MODES + ("list",))
+    parser.add_argument("--agents", default="all",
+                        help='Comma separated display names, or "all" (default)')
+    parser.add_argument("--input", help="JSONL file of queries for interact mode ('-' for stdin)")
+    parser.add_argument("--output", default="-",
+                        help="JSONL results file (default: stdout); a .ttns file is written as a binary envelope")
+    parser.add_argument("--parallelism", type=int, default=4, help="Concurrent jobs (default: 4)")
+    parser.add_argument("--repeat", type=int, default=1, help="Run every job this many times")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Print per-agent telemetry to stderr when finished")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    factories, import_errors = load_agent_factories()
+    agents, init_errors = create_agents(factories)
+    # Jobs are independent and finish in any order, so no job's turns may reach another's prompt.
+    for agent in agents.values():
+        agent.conversation = ConversationMemory(token_budget=0)
+
+    if args.mode == "list":
+        for name in sorted(set(factories) | set(import_errors)):
+            reason = import_errors.get(name) or init_errors.get(name)
+            print(f"{name}: {'unavailable - ' + reason if reason else 'available'}")
+        return 0
+
+    for name, reason in {**import_errors, **init_errors}.items():
+        print(f"Skipping {name}: {reason}", file=sys.stderr)
+
+    selected = _select_agents(agents, args.agents)
+    if not selected:
+        print("No available agents selected.", file=sys.stderr)
+        return 1
+
+    records: List[Dict[str, Any]] = []
+    if args.mode == "interact":
+        if not args.input:
+            parser.error("interact mode needs --input")
+        if args.input == "-":
+            records = list(_read_jsonl(sys.stdin))
+        else:
+            with open(args.input, encoding="utf-8") as stream:
+                records = list(_read_jsonl(stream))
+
+    jobs = _build_jobs(args.mode, selected, records, max(1, args.repeat))
+    if context_passages() > 0:
+        get_paper_index()  # Build it up front, so every job's prompt carries passages.
+    binary = args.output.endswith(".ttns")
+    collected: Optional[List[Dict[str, Any]]] = [] if binary else None
+    if binary:
+        output = None
+    else:
+        output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    started = time.perf_counter()
+    try:
+        counts = asyncio.run(run_batch(args.mode, jobs, selected, agents, args.parallelism, output, collected))
+    finally:
+        if output is not None and output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - started
+    if binary:
+        save_result(args.output, {"mode": args.mode, "results": collected})
+
+    print(f"{counts['ok']} ok, {counts['failed']} failed in {elapsed:.2f}s "
+          f"({len(jobs) / elapsed if elapsed else 0:.2f} jobs/s)", file=sys.stderr)
+    if args.metrics:
+        for name, agent in selected.items():
+            print(json.dumps({"agent": name, "metrics": agent.get_metrics()}, default=str), file=sys.stderr)
+    return 0 if counts["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
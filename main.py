@@ -2,74 +2,25 @@ import asyncio
 import inspect
 import json
 import math
+import os
 import threading
 import time
 import traceback
 from datetime import datetime
 from pathlib import Path
-from tkinter import Tk, StringVar, END, Canvas
+from tkinter import Tk, Toplevel, Listbox, StringVar, BooleanVar, END, Canvas
 from tkinter import ttk
 from tkinter.scrolledtext import ScrolledText
 from typing import Any, Dict, Tuple
 
 from dotenv import load_dotenv
 
-
-def _load_agent_factories() -> Tuple[Dict[str, Any], Dict[str, str]]:
-  """Load agent classes lazily and capture import errors per provider."""
-  factories: Dict[str, Any] = {}
-  errors: Dict[str, str] = {}
-
-  try:
-    from agents.openai_agent import NeuralMemoryAgent
-
-    factories["OpenAI (Neural Memory)"] = NeuralMemoryAgent
-  except Exception as exc:
-    errors["OpenAI (Neural Memory)"] = str(exc)
-
-  try:
-    from agents.anthropic_agent import MemoryContextAgent
-
-    factories["Anthropic (Memory Context)"] = MemoryContextAgent
-  except Exception as exc:
-    errors["Anthropic (Memory Context)"] = str(exc)
-
-  try:
-    from agents.mistral_agent import MemoryGateAgent
-
-    factories["Mistral (Memory Gate)"] = MemoryGateAgent
-  except Exception as exc:
-    errors["Mistral (Memory Gate)"] = str(exc)
-
-  try:
-    from agents.groq_agent import MemoryLayerAgent
-
-    factories["Groq (Memory Layer)"] = MemoryLayerAgent
-  except Exception as exc:
-    errors["Groq (Memory Layer)"] = str(exc)
-
-  try:
-    from agents.gemini_agent import ExperimentalAgent
-
-    factories["Gemini (Experimental)"] = ExperimentalAgent
-  except Exception as exc:
-    errors["Gemini (Experimental)"] = str(exc)
-
-  try:
-    from agents.cohere_agent import InnovationsAgent
-
-    factories["Cohere (Innovations)"] = InnovationsAgent
-  except Exception as exc:
-    errors["Cohere (Innovations)"] = str(exc)
-
-  try:
-    from agents.emergence_agent import AnalysisAgent
-
-    factories["Emergence (Analysis)"] = AnalysisAgent
-  except Exception as exc:
-    errors["Emergence (Analysis)"] = str(exc)
-
-  return factories, errors
+from agents.envelope import to_jsonable
+from agents.paper_index import context_passages, warm_paper_index
+from agents.registry import create_agents, load_agent_factories
+from agents.session_log import SessionLog, recording_enabled, result_agent
+from agents.sweep import SWEEPS, ResultsCube, run_sweep, saved_sweeps
+from agents.tracing import recorder as trace_recorder, span
 
 
 class TitansDesktopApp:
@@ -80,7 +31,9 @@ class TitansDesktopApp:
     self.root.title("Titans Native Desktop")
     self.root.geometry("1100x760")
 
-    self.factories, self.import_errors = _load_agent_factories()
+    self.factories, self.import_errors = load_agent_factories()
+    if context_passages() > 0:
+      warm_paper_index()  # built in the background; the first queries go without passages until ready
     self.agents: Dict[str, Any] = {}
     self.agent_init_errors: Dict[str, str] = {}
     self.is_busy = False
@@ -93,6 +46,8 @@ class TitansDesktopApp:
     self.runtime_phase = 0.0
     self.runtime_after_id = None
     self.ui_state_path = Path(__file__).with_name("titans_ui_state.json")
+    self.trace_dir = Path(__file__).with_name("traces")
+    self.session_log = SessionLog() if recording_enabled() else None
     self.split_ratio = 0.5
 
     self._load_ui_state()
@@ -102,11 +57,7 @@ class TitansDesktopApp:
     self._refresh_agent_details()
 
   def _initialize_agents(self) -> None:
-    for display_name, factory in self.factories.items():
-      try:
-        self.agents[display_name] = factory()
-      except Exception as exc:
-        self.agent_init_errors[display_name] = str(exc)
+    self.agents, self.agent_init_errors = create_agents(self.factories)
 
   def _build_ui(self) -> None:
     main = ttk.Frame(self.root, padding=12)
@@ -154,6 +105,17 @@ class TitansDesktopApp:
     self.btn_metrics = ttk.Button(controls, text="Refresh Metrics", command=self._refresh_metrics)
     self.btn_metrics.grid(row=0, column=4, padx=4)
 
+    self.trace_enabled = BooleanVar(value=False)
+    ttk.Checkbutton(
+      controls, text="Record Trace", variable=self.trace_enabled, command=self._toggle_trace
+    ).grid(row=0, column=5, padx=4)
+
+    self.btn_replay = ttk.Button(controls, text="Replay Session", command=self._open_replay_dialog)
+    self.btn_replay.grid(row=0, column=6, padx=4)
+
+    self.btn_sweep = ttk.Button(controls, text="Parameter Sweep", command=self._open_sweep_dialog)
+    self.btn_sweep.grid(row=0, column=7, padx=4)
+
     self.status_var = StringVar(value="Ready")
     status = ttk.Label(main, textvariable=self.status_var)
     status.pack(anchor="w", pady=(0, 2))
@@ -167,8 +129,20 @@ class TitansDesktopApp:
     self.input_box = ScrolledText(main, height=4, wrap="word")
     self.input_box.pack(fill="x", pady=(4, 6))
 
-    self.btn_interact = ttk.Button(main, text="Send Query", command=self._run_interaction)
-    self.btn_interact.pack(anchor="w", pady=(0, 8))
+    query_controls = ttk.Frame(main)
+    query_controls.pack(fill="x", pady=(0, 8))
+
+    self.btn_interact = ttk.Button(query_controls, text="Send Query", command=self._run_interaction)
+    self.btn_interact.pack(side="left")
+
+    self.btn_race = ttk.Button(query_controls, text="Race Query", command=self._run_race)
+    self.btn_race.pack(side="left", padx=(8, 0))
+
+    # Hedging starts agents one by one after the previous agent's p95 latency.
+    self.race_hedge = BooleanVar(value=os.getenv("TITANS_RACE_HEDGE", "").lower() in {"1", "true", "p95"})
+    ttk.Checkbutton(query_controls, text="Hedge after p95", variable=self.race_hedge).pack(
+      side="left", padx=(8, 0)
+    )
 
     content = ttk.Panedwindow(main, orient="horizontal")
     content.pack(fill="both", expand=True)
@@ -283,7 +257,7 @@ class TitansDesktopApp:
     if isinstance(payload, str):
       self.output_box.insert(END, payload + "\n")
     else:
-      self.output_box.insert(END, json.dumps(payload, indent=2, default=str) + "\n")
+      self.output_box.insert(END, json.dumps(payload, indent=2, default=to_jsonable) + "\n")
     self.output_box.see(END)
 
   def _draw_runtime_visual(self) -> None:
@@ -451,6 +425,10 @@ class TitansDesktopApp:
     series: Dict[str, list] = {}
 
     def walk(node: Any, prefix: str = "") -> None:
+      if hasattr(node, "tolist") and hasattr(node, "dtype"):
+        # NumPy arrays and scalars from agent results.
+        node = node.tolist()
+
       if isinstance(node, (int, float)):
         key = prefix or "value"
         series.setdefault(key, []).append(float(node))
@@ -519,7 +497,8 @@ class TitansDesktopApp:
   def _set_busy(self, busy: bool, message: str = "") -> None:
     self.is_busy = busy
     state = "disabled" if busy else "normal"
-    for btn in [self.btn_demo, self.btn_insights, self.btn_metrics, self.btn_interact]:
+    for btn in [self.btn_demo, self.btn_insights, self.btn_metrics, self.btn_interact, self.btn_race, self.btn_replay,
+                self.btn_sweep]:
       btn.config(state=state)
     self.status_var.set(message if message else ("Working..." if busy else "Ready"))
 
@@ -536,7 +515,7 @@ class TitansDesktopApp:
         self.runtime_after_id = None
       self._draw_runtime_visual()
 
-  def _run_background(self, label: str, func, *args) -> None:
+  def _run_background(self, label: str, func, *args, on_done=None) -> None:
     if self.is_busy:
       return
 
@@ -545,8 +524,11 @@ class TitansDesktopApp:
     def worker():
       try:
         result = func(*args)
+        self._record_result(label, result)
         self.root.after(0, lambda: self._append_output(label, result))
         self.root.after(0, lambda: self._update_visual_from_result(label, result))
+        if on_done is not None:
+          self.root.after(0, lambda: on_done(result))
       except Exception as exc:
         self.root.after(
           0,
@@ -559,6 +541,165 @@ class TitansDesktopApp:
 
     threading.Thread(target=worker, daemon=True).start()
 
+  def _record_result(self, label: str, result: Any) -> None:
+    """Append a finished run to the session log; recording must never break the run."""
+    if self.session_log is None or label == "Metrics":
+      return
+    try:
+      self.session_log.append(label, result_agent(result), result)
+    except Exception as exc:
+      self.root.after(0, lambda: self.status_var.set(f"Session recording failed: {exc}"))
+
+  def _open_replay_dialog(self) -> None:
+    log = self.session_log or SessionLog()
+    sessions = log.sessions()
+    if not sessions:
+      self._append_output("Replay", f"No recorded sessions in {log.directory}.")
+      return
+
+    dialog = Toplevel(self.root)
+    dialog.title("Replay Session")
+    dialog.transient(self.root)
+    ttk.Label(dialog, text="Recorded sessions (newest first):").pack(anchor="w", padx=8, pady=(8, 4))
+
+    listbox = Listbox(dialog, width=90, height=min(15, len(sessions)))
+    listbox.pack(fill="both", expand=True, padx=8)
+    for summary in sessions:
+      started = datetime.fromtimestamp(summary["started"]).strftime("%Y-%m-%d %H:%M:%S")
+      agents = ", ".join(summary["agents"]) or "-"
+      listbox.insert(END, f"{started}  |  {summary['records']} results  |  {agents}")
+    listbox.selection_set(0)
+
+    def replay_selected():
+      selection = listbox.curselection()
+      if selection:
+        dialog.destroy()
+        self._replay_session(log, sessions[selection[0]]["session"])
+
+    ttk.Button(dialog, text="Replay", command=replay_selected).pack(anchor="e", padx=8, pady=8)
+    listbox.bind("<Double-Button-1>", lambda _e: replay_selected())
+
+  def _replay_session(self, log: SessionLog, session_id: str) -> None:
+    """Load a recorded session into the Output pane and visualizer without calling any provider."""
+    last = None
+    count = 0
+    for record in log.replay(session_id):
+      entry = record["entry"]
+      recorded_at = datetime.fromtimestamp(entry["timestamp"]).strftime("%H:%M:%S")
+      self._append_output(f"Replay {entry['label']} (recorded {recorded_at})", record["result"])
+      last = (entry["label"], record["result"])
+      count += 1
+    if last is not None:
+      self._update_visual_from_result(*last)
+    self.status_var.set(f"Replayed {count} results from session {session_id}")
+
+  def _open_sweep_dialog(self) -> None:
+    saved = set(saved_sweeps())
+    names = sorted(SWEEPS)
+
+    dialog = Toplevel(self.root)
+    dialog.title("Parameter Sweep")
+    dialog.transient(self.root)
+    ttk.Label(dialog, text="Sweeps (saved cubes open without recomputing):").pack(anchor="w", padx=8, pady=(8, 4))
+
+    listbox = Listbox(dialog, width=80, height=len(names))
+    listbox.pack(fill="both", expand=True, padx=8)
+    for name in names:
+      axes = " x ".join(f"{axis}[{len(values)}]" for axis, values in SWEEPS[name]["axes"].items())
+      listbox.insert(END, f"{name}  |  {SWEEPS[name]['agent']}  |  {axes}{'  |  saved' if name in saved else ''}")
+    listbox.selection_set(0)
+
+    def selected_name():
+      selection = listbox.curselection()
+      return names[selection[0]] if selection else None
+
+    def run_selected():
+      name = selected_name()
+      if name:
+        dialog.destroy()
+        self._run_sweep(name)
+
+    def open_selected():
+      name = selected_name()
+      if name in saved:
+        dialog.destroy()
+        self._open_sweep_slicer(ResultsCube.open(name))
+
+    buttons = ttk.Frame(dialog)
+    buttons.pack(anchor="e", padx=8, pady=8)
+    ttk.Button(buttons, text="Open Saved", command=open_selected).pack(side="left", padx=(0, 6))
+    ttk.Button(buttons, text="Run Sweep", command=run_selected).pack(side="left")
+    listbox.bind("<Double-Button-1>", lambda _e: open_selected() if selected_name() in saved else run_selected())
+
+  def _run_sweep(self, name: str) -> None:
+    def task():
+      cube = run_sweep(name)
+      return {
+        "sweep": name,
+        "agent": cube.meta.get("agent"),
+        "dims": dict(zip(cube.dims, cube.data.shape)),
+        "compute_seconds": cube.meta["compute_seconds"],
+      }
+
+    self._run_background("Sweep", task, on_done=lambda _summary: self._open_sweep_slicer(ResultsCube.open(name)))
+
+  def _open_sweep_slicer(self, cube: ResultsCube) -> None:
+    """Slice a results cube along any axis; other axes are pinned with sliders."""
+    window = Toplevel(self.root)
+    window.title(f"Sweep: {cube.name}")
+    window.transient(self.root)
+
+    form = ttk.Frame(window, padding=8)
+    form.pack(fill="both", expand=True)
+    metric_var = StringVar(value=cube.metrics[0])
+    along_var = StringVar(value=next(iter(cube.axes)))
+    ttk.Label(form, text="Metric:").grid(row=0, column=0, sticky="w")
+    ttk.Combobox(form, textvariable=metric_var, values=cube.metrics, state="readonly", width=28).grid(
+      row=0, column=1, columnspan=2, sticky="w", pady=2
+    )
+    ttk.Label(form, text="Plot along:").grid(row=1, column=0, sticky="w")
+    ttk.Combobox(form, textvariable=along_var, values=list(cube.axes), state="readonly", width=28).grid(
+      row=1, column=1, columnspan=2, sticky="w", pady=2
+    )
+
+    pinned = {axis: 0 for axis in cube.axes}
+    sliders = ttk.Frame(form)
+    sliders.grid(row=2, column=0, columnspan=3, sticky="ew", pady=(8, 0))
+
+    def redraw(*_args):
+      along = along_var.get()
+      x, y = cube.line(metric_var.get(), along, **pinned)
+      fixed = ", ".join(f"{axis}={cube.axes[axis][pinned[axis]]:g}" for axis in cube.axes if axis != along)
+      self._set_visual_data(f"{metric_var.get()} vs {along}" + (f" ({fixed})" if fixed else ""), y)
+      self.visual_subtitle_var.set(
+        f"{cube.name}: {along} from {x[0]:g} to {x[-1]:g} ({len(x)} points). Scrub to move along the axis."
+      )
+
+    def build_sliders(*_args):
+      for child in sliders.winfo_children():
+        child.destroy()
+      for row, axis in enumerate(a for a in cube.axes if a != along_var.get()):
+        values = cube.axes[axis]
+        label = StringVar(value=f"{axis} = {values[pinned[axis]]:g}")
+
+        def on_move(raw, axis=axis, label=label, values=values):
+          index = min(int(round(float(raw))), len(values) - 1)
+          if index != pinned[axis]:
+            pinned[axis] = index
+            label.set(f"{axis} = {values[index]:g}")
+            redraw()
+
+        ttk.Label(sliders, textvariable=label, width=30).grid(row=row, column=0, sticky="w")
+        scale = ttk.Scale(sliders, from_=0, to=max(1, len(values) - 1), orient="horizontal", length=220,
+                          command=on_move)
+        scale.set(pinned[axis])
+        scale.grid(row=row, column=1, sticky="ew", pady=2)
+      redraw()
+
+    metric_var.trace_add("write", redraw)
+    along_var.trace_add("write", build_sliders)
+    build_sliders()
+
   def _refresh_agent_details(self) -> None:
     name = self._get_selected_name()
     self.details_box.delete("1.0", END)
@@ -586,10 +727,30 @@ class TitansDesktopApp:
       try:
         metrics = agent.get_metrics()
         self.details_box.insert(END, "Current metrics:\n")
-        self.details_box.insert(END, json.dumps(metrics, indent=2, default=str))
+        self.details_box.insert(END, json.dumps(metrics, indent=2, default=to_jsonable))
       except Exception as exc:
         self.details_box.insert(END, f"Could not load metrics: {exc}")
 
+  def _toggle_trace(self) -> None:
+    """Start recording spans, or stop and save them as a Chrome / Perfetto trace."""
+    if self.trace_enabled.get():
+      trace_recorder.start()
+      self._append_output("Tracing", "Recording spans. Untick 'Record Trace' to save the session.")
+      return
+
+    events = trace_recorder.stop()
+    if not events:
+      self._append_output("Tracing", "Stopped. No spans were recorded.")
+      return
+    path = self.trace_dir / f"titans-trace-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    try:
+      trace_recorder.export(path, events)
+      self._append_output(
+        "Tracing", f"Saved {len(events)} spans to {path}\nOpen it at https://ui.perfetto.dev or chrome://tracing."
+      )
+    except Exception as exc:
+      self._append_output("Tracing failed", str(exc))
+
   def _get_available_agent(self):
     name = self._get_selected_name()
     if not name:
@@ -627,20 +788,48 @@ class TitansDesktopApp:
 
     self._run_background("Interaction", task)
 
+  def _race_agents(self) -> Dict[str, Any]:
+    """Agents taking part in race mode: TITANS_RACE_AGENTS (comma separated) or all available."""
+    configured = [name.strip() for name in os.getenv("TITANS_RACE_AGENTS", "").split(",") if name.strip()]
+    if not configured:
+      return dict(self.agents)
+    return {name: self.agents[name] for name in configured if name in self.agents}
+
+  def _run_race(self) -> None:
+    user_input = self.input_box.get("1.0", END).strip()
+    if not user_input:
+      self._append_output("Validation", "Enter a question before sending.")
+      return
+
+    # Read Tk state on the UI thread; the worker only sees plain values.
+    hedge = "p95" if self.race_hedge.get() else None
+
+    def task():
+      from agents.race import race_interact
+
+      contenders = self._race_agents()
+      if not contenders:
+        raise RuntimeError("No available agents for race mode.")
+      result = asyncio.run(race_interact(contenders, user_input, hedge=hedge))
+      return {"query": user_input, "contenders": list(contenders), **result}
+
+    self._run_background("Race", task)
+
   def _run_insights(self) -> None:
     def task():
       selected, selected_name = self._get_available_agent()
-      demo_result = self._invoke_agent_method(selected.demonstrate)
-
-      insights = []
-      for name, agent in self.agents.items():
-        if name == selected_name:
-          continue
-        try:
-          insight = self._invoke_agent_method(agent.collaborate, demo_result)
-          insights.append({"from_agent": name, "insight": insight})
-        except Exception as exc:
-          insights.append({"from_agent": name, "error": str(exc)})
+      with span("collaborative_insights", "app", selected_agent=selected_name):
+        demo_result = self._invoke_agent_method(selected.demonstrate)
+
+        insights = []
+        for name, agent in self.agents.items():
+          if name == selected_name:
+            continue
+          try:
+            insight = self._invoke_agent_method(agent.collaborate, demo_result)
+            insights.append({"from_agent": name, "insight": insight})
+          except Exception as exc:
+            insights.append({"from_agent": name, "error": str(exc)})
 
       return {"selected_agent": selected_name, "insights": insights}
 
@@ -660,7 +849,18 @@ class TitansDesktopApp:
         **{name: f"Init failure: {msg}" for name, msg in self.agent_init_errors.items()},
       }
 
+      # Measured p50/p95/p99 per operation, so tail latency is visible at a glance.
+      latency = {}
+      for name, metrics in available.items():
+        percentiles = {
+          key: value for key, value in metrics.items()
+          if key.endswith(("_p50_ms", "_p95_ms", "_p99_ms"))
+        }
+        if percentiles:
+          latency[name] = percentiles
+
       return {
+        "latency_percentiles_ms": latency,
         "available_agent_metrics": available,
         "unavailable_agents": unavailable,
       }
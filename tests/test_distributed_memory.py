@@ -0,0 +1,60 @@
+import queue
+
+import numpy as np
+import pytest
+
+from agents import distributed_memory
+from agents.distributed_memory import _collect, train_serial, train_sharded
+
+
+@pytest.fixture(scope="module")
+def stream():
+    rng = np.random.default_rng(0)
+    tokens = rng.normal(size=(2048, 32)).astype(np.float32)
+    return tokens / np.linalg.norm(tokens, axis=1, keepdims=True)
+
+
+class Process:
+    def __init__(self, exitcode):
+        self.exitcode = exitcode
+
+
+class Barrier:
+    aborted = False
+
+    def abort(self):
+        self.aborted = True
+
+
+def test_gradient_mode_matches_a_serial_replica(stream):
+    result = train_sharded(stream, 2, chunk=128, mode="gradients", key_dim=16, value_dim=16)
+    reference = train_serial(stream, chunk=256, key_dim=16, value_dim=16)
+    np.testing.assert_allclose(result["memory"], reference, atol=1e-5)
+    assert result["syncs"] == 8 and result["tokens_per_second"] > 0
+
+
+def test_worker_error_is_raised_with_its_traceback(stream):
+    # Every worker fails to derive its projections from a negative seed.
+    with pytest.raises(RuntimeError, match="(?s)worker \\d failed.*ValueError"):
+        train_sharded(stream, 2, chunk=128, key_dim=16, value_dim=16, seed=-1)
+
+
+def test_worker_that_dies_without_reporting_is_detected(monkeypatch):
+    monkeypatch.setattr(distributed_memory, "POLL_SECONDS", 0.01)
+    barrier = Barrier()
+    with pytest.raises(RuntimeError, match="worker 1 exited with code -9"):
+        _collect([Process(None), Process(-9)], barrier, queue.Queue())
+    assert barrier.aborted
+
+
+def test_workers_that_exit_cleanly_without_reporting_are_detected(monkeypatch):
+    monkeypatch.setattr(distributed_memory, "POLL_SECONDS", 0.01)
+    with pytest.raises(RuntimeError, match="without reporting"):
+        _collect([Process(0), Process(0)], Barrier(), queue.Queue())
+
+
+def test_rejects_bad_arguments(stream):
+    with pytest.raises(ValueError):
+        train_sharded(stream, 2, mode="sideways")
+    with pytest.raises(ValueError):
+        train_sharded(stream, 0)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from agents import envelope
+from agents.envelope import ALIGNMENT, load_result, pack_result, unpack_result
+
+
+def sample_result():
+    rng = np.random.default_rng(0)
+    return {
+        "title": "Demo",
+        "weights": rng.normal(size=(3, 5)).astype(np.float32),
+        "steps": np.arange(7, dtype=np.int64),
+        "scalar": np.float64(0.5),
+        "curve": [float(x) for x in range(40)],
+        "short": [1, 2, 3],
+        "nested": [{"mask": np.array([True, False, True])}, None, "text"],
+    }
+
+
+def check_round_trip(result):
+    np.testing.assert_array_equal(result["weights"], sample_result()["weights"])
+    assert result["weights"].dtype == np.float32 and result["weights"].shape == (3, 5)
+    np.testing.assert_array_equal(result["steps"], np.arange(7))
+    assert result["scalar"] == 0.5 and isinstance(result["scalar"], float)
+    np.testing.assert_array_equal(result["curve"], np.arange(40, dtype=np.float64))
+    assert result["short"] == [1, 2, 3]
+    np.testing.assert_array_equal(result["nested"][0]["mask"], [True, False, True])
+    assert result["nested"][1:] == [None, "text"]
+    assert result["title"] == "Demo"
+
+
+def test_round_trip():
+    check_round_trip(unpack_result(pack_result(sample_result())))
+
+
+def test_round_trip_with_json_header(monkeypatch):
+    monkeypatch.setattr(envelope, "msgpack", None)
+    monkeypatch.setattr(envelope, "orjson", None)
+    data = pack_result(sample_result())
+    assert data[5] == envelope.CODEC_JSON
+    check_round_trip(unpack_result(data))
+
+
+def test_arrays_are_aligned_zero_copy_views():
+    data = pack_result(sample_result())
+    base = np.frombuffer(data, dtype=np.uint8).ctypes.data
+    result = unpack_result(data)
+    for array in (result["weights"], result["steps"], result["curve"], result["nested"][0]["mask"]):
+        assert (array.ctypes.data - base) % ALIGNMENT == 0
+        assert not array.flags.writeable
+        assert not array.flags.owndata
+
+
+def test_non_contiguous_arrays_are_packed_contiguously():
+    matrix = np.arange(24, dtype=np.float32).reshape(4, 6)
+    result = unpack_result(pack_result({"columns": matrix[:, ::2]}))
+    np.testing.assert_array_equal(result["columns"], matrix[:, ::2])
+
+
+def test_load_result_memory_maps_the_file(tmp_path):
+    path = envelope.save_result(tmp_path / "nested" / "result.ttns", sample_result())
+    check_round_trip(load_result(path))
+
+
+def test_rejects_other_data():
+    with pytest.raises(ValueError, match="Not a Titans result envelope"):
+        unpack_result(b"JSON" + bytes(16))
+    data = pack_result({"a": 1})
+    data[4] = envelope.VERSION + 1
+    with pytest.raises(ValueError, match="Unsupported envelope version"):
+        unpack_result(data)
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from agents.memory_index import ExactIndex, IVFIndex
+
+
+def unit(rng, shape):
+    vectors = rng.normal(size=shape).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def clustered(rng, count, dim=32, centres=16, spread=0.3):
+    """Unit keys around a few centres, as embeddings of related memories are"""
+    means = unit(rng, (centres, dim))
+    keys = means[rng.integers(0, centres, count)] + spread * rng.normal(size=(count, dim))
+    return (keys / np.linalg.norm(keys, axis=1, keepdims=True)).astype(np.float32)
+
+
+def recall(found, expected):
+    return np.mean([len(set(f) & set(e)) / len(e) for f, e in zip(found, expected)])
+
+
+def test_exact_index_finds_inserted_keys_and_forgets_deleted_ones():
+    rng = np.random.default_rng(0)
+    keys = unit(rng, (500, 32))
+    index = ExactIndex(32, block_size=128)
+    ids = index.add(keys)
+    _, found = index.search(keys[:10], k=1)
+    np.testing.assert_array_equal(found[:, 0], ids[:10])
+
+    assert index.remove(ids[:5].tolist() + [10_000]) == 5
+    _, found = index.search(keys[:5], k=3)
+    assert not set(found.ravel()) & set(ids[:5].tolist())
+    assert len(index) == 495
+
+
+def test_ivf_index_trains_after_enough_inserts():
+    rng = np.random.default_rng(1)
+    index = IVFIndex(32, nlist=8, nprobe=2, train_size=200)
+    keys = clustered(rng, 400)
+    index.add(keys[:199])
+    assert not index.is_trained
+    _, found = index.search(keys[:5], k=1)
+    np.testing.assert_array_equal(found[:, 0], np.arange(5))  # exact scan while untrained
+    index.add(keys[199:])
+    assert index.is_trained and len(index) == 400
+
+
+def test_ivf_recall_against_exact_search():
+    rng = np.random.default_rng(2)
+    keys = clustered(rng, 4100)
+    keys, queries = keys[:4000], keys[4000:]
+    exact, ivf = ExactIndex(32), IVFIndex(32, nlist=32, nprobe=8, train_size=2000)
+    exact.add(keys)
+    ivf.add(keys)
+    expected = exact.search(queries, k=10)[1]
+    assert recall(ivf.search(queries, k=10)[1], expected) >= 0.9
+    # Probing every list is an exact search.
+    assert recall(ivf.search(queries, k=10, nprobe=32)[1], expected) == 1.0
+
+
+def test_ivf_insert_after_training_and_delete():
+    rng = np.random.default_rng(3)
+    keys = clustered(rng, 1200)
+    index = IVFIndex(32, nlist=16, nprobe=16, train_size=1000)
+    ids = index.add(keys[:1000])
+    late = index.add(keys[1000:])
+    np.testing.assert_array_equal(late, np.arange(1000, 1200))
+    _, found = index.search(keys[1000:1010], k=1)
+    np.testing.assert_array_equal(found[:, 0], late[:10])
+
+    removed = np.concatenate([ids[::3], late[::3]])
+    assert index.remove(removed.tolist()) == len(removed)
+    assert index.remove(removed[:5].tolist()) == 0
+    _, found = index.search(keys, k=5)
+    assert not set(found.ravel()) & set(removed.tolist())
+    assert len(index) == 1200 - len(removed)
+    # Keys that swapped positions on delete are still found under their own ids.
+    kept = np.setdiff1d(np.arange(1200), removed)
+    _, found = index.search(keys[kept], k=1)
+    np.testing.assert_array_equal(found[:, 0], kept)
+
+
+def test_ivf_rejects_duplicate_ids():
+    index = IVFIndex(4, nlist=2, train_size=4)
+    index.add(np.eye(4, dtype=np.float32), ids=[1, 2, 3, 4])
+    with pytest.raises(KeyError):
+        index.add(np.eye(4, dtype=np.float32)[:1], ids=[2])
+
+
+def test_search_pads_when_fewer_than_k_keys():
+    index = ExactIndex(4)
+    index.add(np.eye(4, dtype=np.float32)[:2])
+    scores, ids = index.search(np.eye(4, dtype=np.float32)[0], k=4)
+    assert ids.tolist() == [[0, 1, -1, -1]]
+    assert np.isneginf(scores[0, 2:]).all()
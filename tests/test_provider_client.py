@@ -0,0 +1,123 @@
+import asyncio
+import itertools
+import threading
+import time
+
+import pytest
+
+from agents.provider_client import ProviderClient, _retry_after
+
+_names = itertools.count()
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def make_client(monkeypatch, concurrency=4, **kwargs):
+    """Client for a fresh provider, so limits are not shared with other tests"""
+    provider = f"test-{next(_names)}"
+    prefix = f"TITANS_{provider.upper()}_"
+    monkeypatch.setenv(prefix + "RPS", "1000")
+    monkeypatch.setenv(prefix + "BURST", "1000")
+    monkeypatch.setenv(prefix + "CONCURRENCY", str(concurrency))
+    return ProviderClient(provider, base_delay=0.001, max_delay=0.01, **kwargs)
+
+
+def flaky(failures):
+    """Sync SDK function raising each exception in `failures`, then returning "ok" """
+    calls = []
+
+    def fn():
+        calls.append(time.monotonic())
+        if len(calls) <= len(failures):
+            raise failures[len(calls) - 1]
+        return "ok"
+    return fn, calls
+
+
+def test_retries_retryable_status_then_succeeds(monkeypatch):
+    client = make_client(monkeypatch)
+    fn, calls = flaky([StatusError(503), StatusError(500)])
+    assert asyncio.run(client.call(fn)) == "ok"
+    assert len(calls) == 3
+    assert client.get_metrics()["provider_retries"] == 2
+
+
+def test_does_not_retry_client_errors(monkeypatch):
+    client = make_client(monkeypatch)
+    fn, calls = flaky([StatusError(400)])
+    with pytest.raises(StatusError):
+        asyncio.run(client.call(fn))
+    assert len(calls) == 1
+    assert client.get_metrics()["provider_failures"] == 1
+
+
+def test_gives_up_after_max_retries(monkeypatch):
+    client = make_client(monkeypatch, max_retries=2)
+    fn, calls = flaky([StatusError(429)] * 5)
+    with pytest.raises(StatusError):
+        asyncio.run(client.call(fn))
+    assert len(calls) == 3
+
+
+def test_retry_after_pauses_the_whole_provider(monkeypatch):
+    client = make_client(monkeypatch)
+    fn, calls = flaky([StatusError(429, {"retry-after": "0.2"})])
+    assert asyncio.run(client.call(fn)) == "ok"
+    assert calls[1] - calls[0] >= 0.18
+    # Another caller of the same provider waits out the pause as well.
+    assert client.bucket.reserve() == 0.0
+    client.bucket.pause(0.2)
+    assert client.bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_retry_after_parses_seconds_and_dates():
+    assert _retry_after(StatusError(429, {"Retry-After": "3"})) == 3.0
+    assert _retry_after(StatusError(429, {"retry-after": "-1"})) == 0.0
+    assert _retry_after(StatusError(429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert _retry_after(StatusError(429, {"retry-after": "soon"})) is None
+    assert _retry_after(StatusError(429)) is None
+
+
+def test_slot_held_until_cancelled_sync_call_finishes(monkeypatch):
+    client = make_client(monkeypatch, concurrency=1)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    async def cancel_midway():
+        task = asyncio.ensure_future(client.call(blocking))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_midway())
+    # The worker thread is still running the call, so its slot is still taken.
+    assert not client.slots.acquire(blocking=False)
+    release.set()
+    deadline = time.monotonic() + 5
+    while not client.slots.acquire(blocking=False):
+        assert time.monotonic() < deadline, "slot was never released"
+        time.sleep(0.01)
+    client.slots.release()
+
+
+def test_slot_released_after_async_call_fails(monkeypatch):
+    client = make_client(monkeypatch, concurrency=1, max_retries=0)
+
+    async def failing():
+        raise StatusError(500)
+
+    with pytest.raises(StatusError):
+        asyncio.run(client.call(failing))
+    assert client.slots.acquire(blocking=False)
+    client.slots.release()
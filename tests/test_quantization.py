@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from agents.quantization import bytes_per_row, dequantize, memory_precision, quantize
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(0)
+    # Rows of very different magnitude, as memory channels have.
+    return (rng.normal(size=(8, 16, 64)) * np.logspace(-3, 2, 16)[None, :, None]).astype(np.float32)
+
+
+def test_int8_error_is_at_most_half_a_step_per_row(values):
+    codes, scales = quantize(values, "int8")
+    assert codes.dtype == np.int8 and scales.shape == values.shape[:-1]
+    error = np.abs(dequantize(codes, scales) - values)
+    step = np.abs(values).max(axis=-1, keepdims=True) / 127
+    assert (error <= 0.5 * step * (1 + 1e-5)).all()
+    # The largest value of each row is exact, up to float32 rounding.
+    peak = np.abs(values).argmax(axis=-1)[..., None]
+    np.testing.assert_allclose(np.take_along_axis(dequantize(codes, scales), peak, -1),
+                               np.take_along_axis(values, peak, -1), rtol=1e-6)
+
+
+def test_float16_error_is_within_half_precision(values):
+    codes, scales = quantize(values, "float16")
+    assert codes.dtype == np.float16 and (scales == 1).all()
+    # Relative to half precision's 11-bit mantissa, absolute below its normal range.
+    np.testing.assert_allclose(dequantize(codes, scales), values, rtol=2 ** -11, atol=2 ** -25)
+
+
+def test_float32_is_lossless(values):
+    codes, scales = quantize(values, "float32")
+    np.testing.assert_array_equal(dequantize(codes, scales), values)
+
+
+def test_int8_zero_rows_and_empty_rows():
+    codes, scales = quantize(np.zeros((2, 4)), "int8")
+    assert (codes == 0).all() and (scales == 1).all()
+    codes, scales = quantize(np.zeros((3, 0)), "int8")
+    assert codes.shape == (3, 0) and scales.shape == (3,)
+
+
+def test_bytes_per_row_counts_the_int8_scale():
+    assert bytes_per_row(64, "float32") == 256
+    assert bytes_per_row(64, "float16") == 128
+    assert bytes_per_row(64, "int8") == 68
+
+
+def test_memory_precision_rejects_unknown_values(monkeypatch):
+    monkeypatch.setenv("TITANS_MEMORY_PRECISION", "INT8")
+    assert memory_precision() == "int8"
+    monkeypatch.setenv("TITANS_MEMORY_PRECISION", "int4")
+    with pytest.raises(ValueError):
+        memory_precision()
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from agents import semantic_cache
+from agents.semantic_cache import SemanticCache, normalize_query
+
+
+class Clock:
+    """Stands in for the time module so entries can be aged without sleeping"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.perf_counter = time.perf_counter
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(semantic_cache, "time", clock)
+    return clock
+
+
+def make_cache(directory, **kwargs):
+    return SemanticCache("test agent model", directory=directory, audit_rate=0, **kwargs)
+
+
+def test_normalisation_keeps_question_words_for_keys():
+    assert normalize_query("What is MAC?") == "memory as context"
+    assert normalize_query("What is MAC?", keep_question_words=True) == "what memory as context"
+
+
+def test_paraphrase_hits_and_different_question_misses(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store("What is MAC?", "Memory as context prepends memory to attention.")
+    assert cache.lookup("what is memory as context")["answer"].startswith("Memory as context")
+    cache.store("Why does memory decay?", "Forgetting frees capacity.")
+    assert cache.lookup("How does memory decay?") is None
+
+
+def test_duplicate_store_replaces_the_entry_in_place(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store("What is MAC?", "old answer")
+    cache.store("what is MAC", "new answer")
+    assert len(cache.vectors) == 1 and len(cache.offsets) == 1
+    assert cache.lookup("What is MAC?")["answer"] == "new answer"
+
+
+def test_other_processes_see_replaced_entries(tmp_path):
+    writer, reader = make_cache(tmp_path), make_cache(tmp_path)
+    writer.store("What is MAC?", "old answer")
+    assert reader.lookup("What is MAC?")["answer"] == "old answer"
+    writer.store("What is MAC?", "new answer")
+    assert reader.lookup("What is MAC?")["answer"] == "new answer"
+    assert len(reader.vectors) == 1
+
+
+def test_expired_entries_miss_until_refreshed(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.store("What is MAC?", "old answer")
+    clock.now += 61
+    assert cache.lookup("What is MAC?") is None
+    cache.store("What is MAC?", "fresh answer")
+    assert len(cache.vectors) == 1
+    assert cache.lookup("What is MAC?")["answer"] == "fresh answer"
+
+
+def test_expired_best_match_falls_through_to_a_fresh_one(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl_seconds=60, threshold=0.5)
+    cache.store("What is memory as context?", "expired answer")
+    clock.now += 30
+    cache.store("What is memory as context in Titans?", "fresh answer")
+    clock.now += 31
+    hit = cache.lookup("What is memory as context?")
+    assert hit["answer"] == "fresh answer"
+    assert hit["similarity"] < 1.0
@@ -0,0 +1,37 @@
+import numpy as np
+
+from agents.session_log import SessionLog
+
+
+def test_sessions_started_together_get_distinct_ids_and_files(tmp_path):
+    logs = [SessionLog(tmp_path) for _ in range(20)]
+    assert len({log.session_id for log in logs}) == 20
+    for number, log in enumerate(logs):
+        log.append("Demonstration", "agent", {"number": number})
+    assert len(list(tmp_path.glob("*.tlog"))) == 20
+    for number, log in enumerate(logs):
+        records = list(SessionLog(tmp_path).replay(log.session_id))
+        assert [record["result"] for record in records] == [{"number": number}]
+
+
+def test_replay_returns_results_in_order(tmp_path):
+    log = SessionLog(tmp_path)
+    log.append("Demonstration", "a", {"values": np.arange(64, dtype=np.float32)})
+    log.append("Race", "b", {"winner": "b"})
+    log.append("Collaboration", "a", {"text": "done"})
+
+    records = list(SessionLog(tmp_path).replay(log.session_id))
+    assert [record["entry"]["seq"] for record in records] == [0, 1, 2]
+    np.testing.assert_array_equal(records[0]["result"]["values"], np.arange(64))
+    assert [record["entry"]["label"] for record in SessionLog(tmp_path).replay(log.session_id, agent="a")] == \
+        ["Demonstration", "Collaboration"]
+    (summary,) = SessionLog(tmp_path).sessions()
+    assert summary["records"] == 3 and summary["agents"] == ["a", "b"]
+
+
+def test_torn_index_line_is_skipped(tmp_path):
+    log = SessionLog(tmp_path)
+    log.append("Demonstration", "a", {"ok": True})
+    with open(log.index_path, "a", encoding="utf-8") as index:
+        index.write('{"session": "crashed", "se')
+    assert [record["result"] for record in log.replay(log.session_id)] == [{"ok": True}]
@@ -0,0 +1,110 @@
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from agents.shared_state import FileLock, SharedAppendArray, shared_array
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def run_python(code, *args):
+    return subprocess.Popen([sys.executable, "-c", code, *map(str, args)], cwd=ROOT,
+                            stdout=subprocess.PIPE, text=True)
+
+
+def test_file_lock_excludes_other_processes(tmp_path):
+    lock = FileLock(tmp_path / "state.lock")
+    with lock:
+        child = run_python(
+            "import sys, time\n"
+            "from agents.shared_state import FileLock\n"
+            "print('started', flush=True)\n"
+            "with FileLock(sys.argv[1]):\n"
+            "    print(time.time())\n",
+            lock.path)
+        assert child.stdout.readline().strip() == "started"
+        time.sleep(0.3)
+        released = time.time()
+    acquired = float(child.communicate(timeout=10)[0])
+    assert acquired >= released
+
+
+def test_file_lock_is_reentrant_in_a_thread_and_exclusive_across_threads(tmp_path):
+    lock = FileLock(tmp_path / "state.lock")
+    entered = []
+
+    def other():
+        with lock:
+            entered.append(time.monotonic())
+
+    with lock:
+        with lock:
+            thread = threading.Thread(target=other)
+            thread.start()
+            time.sleep(0.1)
+            assert not entered
+        assert not entered  # still held by the outer block
+        released = time.monotonic()
+    thread.join(5)
+    assert entered and entered[0] >= released
+
+
+def test_append_and_view_across_instances(tmp_path):
+    path = tmp_path / "rows.bin"
+    writer = SharedAppendArray(path, 3, initial_capacity=4)
+    assert writer.append(np.arange(6).reshape(2, 3)) == 0
+    early = writer.view()
+    # Growing past the initial capacity remaps the file; views taken earlier stay valid.
+    assert writer.append(np.ones((10, 3))) == 2
+    np.testing.assert_array_equal(early, [[0, 1, 2], [3, 4, 5]])
+
+    reader = SharedAppendArray(path, 3)
+    assert len(reader) == 12
+    np.testing.assert_array_equal(reader.view()[:2], early)
+    writer.append(np.full(3, 7.0))
+    assert len(reader) == 13 and reader.view()[-1].tolist() == [7.0, 7.0, 7.0]
+
+    reader.truncate(2)
+    assert len(writer) == 2
+
+
+def test_rejects_an_array_of_another_shape(tmp_path):
+    SharedAppendArray(tmp_path / "rows.bin", 3)
+    with pytest.raises(ValueError):
+        SharedAppendArray(tmp_path / "rows.bin", 4)
+    with pytest.raises(ValueError):
+        SharedAppendArray(tmp_path / "rows.bin", 3, dtype=np.int64)
+
+
+def test_concurrent_appends_from_several_processes(tmp_path):
+    path = tmp_path / "rows.bin"
+    SharedAppendArray(path, 2, dtype=np.int64, initial_capacity=8)
+    code = ("import sys\n"
+            "import numpy as np\n"
+            "from agents.shared_state import SharedAppendArray\n"
+            "rows = SharedAppendArray(sys.argv[1], 2, dtype=np.int64)\n"
+            "for i in range(200):\n"
+            "    rows.append([int(sys.argv[2]), i])\n")
+    children = [run_python(code, path, worker) for worker in range(3)]
+    for child in children:
+        child.communicate(timeout=60)
+        assert child.returncode == 0
+    rows = SharedAppendArray(path, 2, dtype=np.int64).view()
+    assert len(rows) == 600
+    for worker in range(3):
+        assert sorted(rows[rows[:, 0] == worker, 1].tolist()) == list(range(200))
+
+
+def test_shared_array_is_created_once_and_attached(tmp_path):
+    first = shared_array(tmp_path / "slab.npy", (2, 3))
+    first[1, 2] = 5.0
+    first.flush()
+    second = shared_array(tmp_path / "slab.npy", (2, 3))
+    assert second[1, 2] == 5.0
+    with pytest.raises(ValueError):
+        shared_array(tmp_path / "slab.npy", (3, 3))
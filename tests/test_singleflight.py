@@ -0,0 +1,111 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", call) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["answer"] * 5
+    assert len(calls) == 1
+    assert flight.get_metrics() == {"coalesced_requests": 4, "coalesced_ratio": 0.8}
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+
+    async def main():
+        return await asyncio.gather(*(flight.do(key, lambda key=key: asyncio.sleep(0.01, result=key))
+                                      for key in ("a", "b")))
+
+    assert asyncio.run(main()) == ["a", "b"]
+    assert flight.leaders == 2
+
+
+def test_leader_error_reaches_every_caller_and_is_not_cached():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("provider down")
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        return await flight.do("key", lambda: asyncio.sleep(0, result="recovered"))
+
+    assert asyncio.run(main()) == "recovered"
+
+
+def test_cancelled_waiter_leaves_the_flight_running():
+    flight = SingleFlight()
+
+    async def main():
+        release = asyncio.Event()
+
+        async def call():
+            await release.wait()
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do("key", call))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(flight.do("key", call)) for _ in range(2)]
+        await asyncio.sleep(0)
+        waiters[0].cancel()
+        release.set()
+        assert await leader == "done"
+        assert await waiters[1] == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await waiters[0]
+
+    asyncio.run(main())
+
+
+def test_cancelled_leader_hands_over_to_a_waiter():
+    flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do("key", call))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.do("key", call))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        # The waiter retries and leads a second call instead of failing with the leader.
+        assert await waiter == 2
+        assert leader.cancelled()
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_callers_on_different_loops_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "shared"
+
+    with ThreadPoolExecutor(3) as pool:
+        results = list(pool.map(lambda _: asyncio.run(flight.do("key", call)), range(3)))
+    assert results == ["shared"] * 3
+    assert len(calls) == 1